@@ -1,6 +1,35 @@
 from django.apps import AppConfig
+from django.db.backends.signals import connection_created
+from django.db.models.signals import post_delete, post_migrate, post_save
+
+
+def install_database_objects(sender, using, **kwargs):
+    """Instala objetos do banco que não são gerenciados pelas migrações."""
+    from django.db import connections
+    from .facets import install_facet_triggers
+    from .geo import install_geo_index
+    from .search import install_search_index
+    from .summaries import install_summary_triggers
+
+    install_search_index(connections[using])
+    install_facet_triggers(connections[using])
+    install_summary_triggers(connections[using])
+    install_geo_index(connections[using])
 
 
 class CommonConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'common'
+
+    def ready(self):
+        from .authentication import forget_on_change
+        from .catalog_cache import invalidate_on_change
+        from .database import configure_sqlite
+
+        connection_created.connect(configure_sqlite)
+        post_migrate.connect(install_database_objects, sender=self)
+        for model in (self.get_model('Book'), self.get_model('PickupPoint'), self.get_model('User')):
+            post_save.connect(invalidate_on_change, sender=model)
+            post_delete.connect(invalidate_on_change, sender=model)
+        post_save.connect(forget_on_change, sender=self.get_model('User'))
+        post_delete.connect(forget_on_change, sender=self.get_model('User'))
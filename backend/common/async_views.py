@@ -0,0 +1,187 @@
+from asgiref.sync import sync_to_async
+from django.db.models import Q
+from django.http import HttpResponse
+from django.views.decorators.http import require_GET
+from rest_framework import serializers
+from rest_framework.utils.urls import replace_query_param
+
+from . import catalog_cache
+from .eager_loading import eager_load, get_load_only
+from .facets import FACET_COLUMNS
+from .fast_serialization import serialize_many
+from .geo import points_within
+from .http_cache import async_conditional_get, catalog_book_state, catalog_state, pickup_points_state
+from .models import Book, CatalogFacet, PickupPoint
+from .pagination import KeysetPagination
+from .renderers import dumps
+from .serializers import BookSerializer, PickupPointSerializer
+from .sparse_fields import check_expand, parse_sparse_fields, prune_fields
+from .views import CATALOG_SHAPES, catalog_shape, catalog_side_tables, filter_catalog, location_params
+
+
+# Versões assíncronas das leituras públicas (catálogo, detalhe do livro e
+# pontos de coleta), com o ORM assíncrono (aiterator/aget). Servidas por um
+# servidor ASGI, uma conexão lenta não prende uma thread do worker enquanto
+# espera. As respostas têm o mesmo formato das rotas síncronas (inclusive
+# ?shape=, ?fields= e ?expand=), ETag e 304 para requisições condicionais,
+# e o catálogo usa o mesmo cache (catalog_cache) e as mesmas
+# regras de invalidação. Só a paginação difere: é por ?after=, sem link para
+# a página anterior.
+
+CURSOR_PARAM = 'after'
+
+
+def _json(data, status=200):
+    # Mesmo JSON (e codificador) das rotas síncronas
+    return HttpResponse(dumps(data), content_type='application/json', status=status)
+
+
+def _bad_request(exc):
+    return _json(exc.detail, status=400)
+
+
+def _page_size(params):
+    try:
+        page_size = int(params.get('page_size', KeysetPagination.page_size))
+    except ValueError:
+        raise serializers.ValidationError({"page_size": "Informe um número inteiro."})
+    return max(1, min(page_size, KeysetPagination.max_page_size))
+
+
+def _apply_cursor(queryset, params, ranked):
+    """
+    Paginação por keyset a partir de ?after=: o id do último item da página
+    anterior, ou "<relevância>:<id>" quando há busca textual.
+    """
+    cursor = params.get(CURSOR_PARAM)
+    if not cursor:
+        return queryset
+    try:
+        if ranked:
+            rank, last_id = cursor.split(':')
+            rank, last_id = float(rank), int(last_id)
+            return queryset.filter(Q(search_rank__gt=rank) | Q(search_rank=rank, id__gt=last_id))
+        return queryset.filter(id__gt=int(cursor))
+    except ValueError:
+        raise serializers.ValidationError({CURSOR_PARAM: "Cursor inválido."})
+
+
+def _cursor(instance, ranked):
+    return f"{instance.search_rank!r}:{instance.id}" if ranked else str(instance.id)
+
+
+async def _paginate(request, queryset, page_size, ranked=False):
+    """Busca a página (e um item a mais, para saber se há próxima) e o link seguinte."""
+    ordering = ('search_rank', 'id') if ranked else ('id',)
+    items = [item async for item in queryset.order_by(*ordering)[:page_size + 1].aiterator()]
+    next_url = None
+    if len(items) > page_size:
+        items = items[:page_size]
+        next_url = replace_query_param(request.build_absolute_uri(), CURSOR_PARAM, _cursor(items[-1], ranked))
+    return items, next_url
+
+
+async def _catalog_facets():
+    facets = {facet: {} for facet in FACET_COLUMNS}
+    # values_list() não funciona com aiterator() no Django 5.1 (a consulta
+    # roda fora de sync_to_async); iterar o queryset carrega tudo de uma vez
+    async for field, value, count in CatalogFacet.objects.filter(count__gt=0).values_list('field', 'value', 'count'):
+        facets.setdefault(field, {})[value] = count
+    return facets
+
+
+def _serializer(serializer_class, params):
+    """Serializer reduzido por ?fields= e ?expand=, como nas rotas síncronas."""
+    serializer = serializer_class()
+    tree = parse_sparse_fields(params)
+    if tree is not None:
+        check_expand(serializer, params)
+        prune_fields(serializer, tree)
+    return serializer
+
+
+def _load(queryset, serializer, params):
+    """Relações do serializer em uma consulta e, com ?fields=, só as colunas usadas."""
+    queryset = eager_load(queryset, serializer)
+    columns = get_load_only(serializer) if parse_sparse_fields(params) is not None else None
+    return queryset if columns is None else queryset.only(*columns)
+
+
+@require_GET
+@async_conditional_get(catalog_state)
+async def catalog_list(request):
+    """GET /api/async/catalog/: mesmos filtros e formatos de /api/catalog/, paginado por ?after=."""
+    cache_key = catalog_cache.list_key(request)
+    data = catalog_cache.fetch(cache_key)
+    if data is not None:
+        return _json(data)
+
+    params = request.GET
+    ranked = bool(params.get('q'))
+    try:
+        page_size = _page_size(params)
+        shape = catalog_shape(params)
+        serializer = _serializer(CATALOG_SHAPES[shape], params)
+        # Só o filtro por raio consulta o banco ao montar o queryset
+        queryset = await sync_to_async(filter_catalog)(Book.objects.filter(status='available'), params)
+        queryset = _apply_cursor(queryset, params, ranked)
+    except serializers.ValidationError as exc:
+        return _bad_request(exc)
+
+    books, next_url = await _paginate(request, _load(queryset, serializer, params), page_size, ranked)
+    data = {
+        'next': next_url,
+        'previous': None,
+        'results': serialize_many(serializer, books),
+    }
+    if shape == 'normalized':
+        data.update(await sync_to_async(catalog_side_tables)(data['results']))
+    data['facets'] = await _catalog_facets()
+    catalog_cache.store(cache_key, data)
+    return _json(data)
+
+
+@require_GET
+@async_conditional_get(catalog_book_state)
+async def catalog_detail(request, pk):
+    """GET /api/async/catalog/{id}/"""
+    cache_key = catalog_cache.detail_key(request, pk)
+    data = catalog_cache.fetch(cache_key)
+    if data is not None:
+        return _json(data)
+
+    try:
+        serializer = _serializer(BookSerializer, request.GET)
+    except serializers.ValidationError as exc:
+        return _bad_request(exc)
+    try:
+        book = await _load(Book.objects.filter(status='available'), serializer, request.GET).aget(pk=pk)
+    except Book.DoesNotExist:
+        return _json({"detail": "Não encontrado."}, status=404)
+    data = serializer.to_representation(book)
+    catalog_cache.store(cache_key, data)
+    return _json(data)
+
+
+@require_GET
+@async_conditional_get(pickup_points_state)
+async def pickup_point_list(request):
+    """GET /api/async/pickup-points/, com o mesmo filtro por raio (?lat=&lng=&radius_km=)."""
+    queryset = PickupPoint.objects.all()
+    try:
+        page_size = _page_size(request.GET)
+        serializer = _serializer(PickupPointSerializer, request.GET)
+        location = location_params(request.GET)
+        queryset = _apply_cursor(queryset, request.GET, ranked=False)
+    except serializers.ValidationError as exc:
+        return _bad_request(exc)
+    if location:
+        matches = await sync_to_async(points_within)(*location)
+        queryset = queryset.filter(id__in=[point_id for _, point_id in matches])
+
+    points, next_url = await _paginate(request, _load(queryset, serializer, request.GET), page_size)
+    return _json({
+        'next': next_url,
+        'previous': None,
+        'results': serialize_many(serializer, points),
+    })
@@ -0,0 +1,96 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils.functional import cached_property
+from rest_framework_simplejwt.authentication import JWTStatelessUserAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.models import TokenUser as BaseTokenUser
+
+from .models import User
+
+
+ACTIVE_CACHE_KEY = 'auth:active:{}'
+
+
+class TokenUser(BaseTokenUser):
+    """
+    Usuário montado a partir das claims do token (id, name, is_staff), sem
+    consultar o banco. O registro completo só é carregado, uma única vez, se
+    algum código acessar um atributo que não está no token.
+    """
+
+    @cached_property
+    def user(self):
+        return User.objects.get(pk=self.id)
+
+    def _claim(self, name):
+        # Tokens emitidos antes das claims extras caem no registro do banco
+        if name in self.token:
+            return self.token[name]
+        return getattr(self.user, name)
+
+    @cached_property
+    def name(self):
+        return self._claim('name')
+
+    @cached_property
+    def is_staff(self):
+        return self._claim('is_staff')
+
+    def __str__(self):
+        return self.name
+
+    def __getattr__(self, attr):
+        if attr.startswith('_') or attr in ('user', 'token'):
+            raise AttributeError(attr)
+        if attr in self.token:
+            return self.token[attr]
+        return getattr(self.user, attr)
+
+
+def account_status(user_id):
+    """
+    (ativo, is_staff) da conta, guardados em cache por
+    settings.AUTH_ACTIVE_CACHE_TTL segundos. O is_staff vem daqui, e não do
+    token, para que uma mudança de permissão valha antes de o token expirar.
+    """
+    key = ACTIVE_CACHE_KEY.format(user_id)
+    status = cache.get(key)
+    if status is None:
+        is_staff = User.objects.filter(pk=user_id, is_active=True).values_list('is_staff', flat=True).first()
+        status = (is_staff is not None, bool(is_staff))
+        cache.set(key, status, getattr(settings, 'AUTH_ACTIVE_CACHE_TTL', 60))
+    return status
+
+
+def forget_user(user_id):
+    """Descarta o status em cache, após o commit (ex.: conta desativada)."""
+    transaction.on_commit(lambda: cache.delete(ACTIVE_CACHE_KEY.format(user_id)))
+
+
+def forget_on_change(sender, instance, **kwargs):
+    """
+    Receptor de post_save/post_delete de User: ativação e permissões alteradas
+    pelo admin ou pelo shell valem na próxima requisição. update() não dispara
+    sinais e deve chamar forget_user (como faz workflow.deactivate_user).
+    """
+    update_fields = kwargs.get('update_fields')
+    if update_fields is not None and set(update_fields) <= {'last_login'}:
+        return
+    forget_user(instance.pk)
+
+
+class StatelessJWTAuthentication(JWTStatelessUserAuthentication):
+    """
+    Autenticação JWT que não busca o usuário no banco a cada requisição: o
+    request.user é um TokenUser montado das claims. Contas desativadas são
+    barradas, e o is_staff é conferido, pelo status da conta em cache.
+    """
+
+    def get_user(self, validated_token):
+        user = super().get_user(validated_token)
+        active, is_staff = account_status(user.id)
+        if not active:
+            raise AuthenticationFailed("Usuário inativo ou inexistente.", code='user_inactive')
+        user.is_staff = is_staff
+        return user
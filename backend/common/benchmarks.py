@@ -0,0 +1,540 @@
+import asyncio
+import importlib.util
+import io
+import os
+import platform
+import random
+import socket
+import subprocess
+import sys
+import threading
+import time
+from collections import defaultdict
+from urllib.parse import quote
+
+import django
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+from django.core.cache import caches
+from django.db import connection, connections
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from .eager_loading import eager_load
+from .fast_serialization import serialize_many
+from .models import Book, BookRequest, PickupPoint, User
+from .renderers import FastJSONParser, dumps, orjson_enabled
+from .serializers import BookRequestSerializer, BookSerializer, SimplifiedBookRequestSerializer
+
+
+BENCHMARK_PASSWORD = 'benchmark123'
+
+WORDS = (
+    'amor', 'aventura', 'bruxa', 'cidade', 'dragão', 'escola', 'estrela', 'floresta',
+    'guerra', 'história', 'ilha', 'jardim', 'lenda', 'mar', 'montanha', 'noite',
+    'oceano', 'princesa', 'rio', 'segredo', 'sombra', 'tempo', 'verão', 'viagem',
+)
+
+
+class BenchmarkError(Exception):
+    pass
+
+
+class _QueryCounter:
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+def percentile(values, q):
+    values = sorted(values)
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+class Recorder:
+    """Latência e quantidade de consultas de cada chamada, por endpoint."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.samples = defaultdict(list)
+
+    def call(self, client, method, url, label, data=None, expected=(200,)):
+        counter = _QueryCounter()
+        with connection.execute_wrapper(counter):
+            start = time.perf_counter()
+            response = getattr(client, method)(url, data, format='json')
+            elapsed = time.perf_counter() - start
+        if response.status_code not in expected:
+            raise BenchmarkError(f"{label}: HTTP {response.status_code} {response.content[:300]!r}")
+        with self.lock:
+            self.samples[label].append((elapsed, counter.count))
+        return response
+
+    def summary(self):
+        report = {}
+        for label, samples in sorted(self.samples.items()):
+            latencies = [latency for latency, _ in samples]
+            queries = [count for _, count in samples]
+            total = sum(latencies)
+            report[label] = {
+                'count': len(samples),
+                'throughput_rps': round(len(samples) / total, 1) if total else 0.0,
+                'p50_ms': round(percentile(latencies, 0.5) * 1000, 3),
+                'p99_ms': round(percentile(latencies, 0.99) * 1000, 3),
+                'queries_mean': round(sum(queries) / len(queries), 2),
+                'queries_max': max(queries),
+            }
+        return report
+
+
+def seed_data(rng, users, pickup_points, books):
+    """Doadores, pontos de coleta e livros disponíveis, inseridos em lote."""
+    password = make_password(BENCHMARK_PASSWORD)
+    User.objects.bulk_create([
+        User(name=f"Doador {i}", email=f"doador{i}@benchmark.local", password=password,
+             birth_date='1990-01-01', phone='11999999999')
+        for i in range(users)
+    ])
+    PickupPoint.objects.bulk_create([
+        PickupPoint(name=f"Ponto {i}", street="Rua", number=str(i), city="Cidade", state="SP", zip="01001000")
+        for i in range(pickup_points)
+    ])
+    donor_ids = list(User.objects.values_list('id', flat=True))
+    pickup_point_ids = list(PickupPoint.objects.values_list('id', flat=True))
+    categories = [value for value, _ in Book.CATEGORY_CHOICES]
+    classifications = [value for value, _ in Book.AGE_CHOICES]
+    Book.objects.bulk_create([
+        Book(
+            title=' '.join(rng.sample(WORDS, 3)).capitalize(),
+            author=f"Autor {rng.randrange(100)}",
+            description=' '.join(rng.choices(WORDS, k=12)),
+            category=rng.choice(categories),
+            classification=rng.choice(classifications),
+            user_id=rng.choice(donor_ids),
+            pickup_point_id=rng.choice(pickup_point_ids),
+        )
+        for _ in range(books)
+    ], batch_size=1000)
+
+
+def _login(recorder, email):
+    client = APIClient()
+    response = recorder.call(
+        client, 'post', '/api/login/', 'POST /api/login/',
+        {'email': email, 'password': BENCHMARK_PASSWORD},
+    )
+    client.credentials(HTTP_AUTHORIZATION=f"Bearer {response.data['access']}")
+    return client
+
+
+def run_workflow(recorder, rng, requesters):
+    """
+    Cadastro -> login -> catálogo -> solicitação -> aprovação -> retirada,
+    repetido para cada novo solicitante, com as leituras que o frontend faz
+    entre os passos.
+    """
+    donor_clients = {}
+    for i in range(requesters):
+        anonymous = APIClient()
+        email = f"leitor{i}@benchmark.local"
+        recorder.call(anonymous, 'post', '/api/users/', 'POST /api/users/', {
+            'name': f"Leitor {i}", 'email': email, 'password': BENCHMARK_PASSWORD,
+            'birth_date': '1990-01-01', 'phone': '11988887777',
+            'street': 'Rua', 'number': '10', 'city': 'Cidade', 'zip': '01001000',
+        }, expected=(201,))
+        client = _login(recorder, email)
+
+        recorder.call(anonymous, 'get', '/api/catalog/', 'GET /api/catalog/')
+        recorder.call(anonymous, 'get', f'/api/catalog/?q={rng.choice(WORDS)}', 'GET /api/catalog/?q=')
+        category = rng.choice(Book.CATEGORY_CHOICES)[0]
+        page = recorder.call(anonymous, 'get', f'/api/catalog/?category={category}', 'GET /api/catalog/?category=')
+        if not page.data['results']:
+            page = recorder.call(anonymous, 'get', '/api/catalog/', 'GET /api/catalog/')
+        if not page.data['results']:
+            raise BenchmarkError("O catálogo ficou sem livros disponíveis; aumente --books.")
+        book = rng.choice(page.data['results'])
+        recorder.call(anonymous, 'get', f"/api/catalog/{book['id']}/", 'GET /api/catalog/{id}/')
+
+        book_request = recorder.call(
+            client, 'post', '/api/book_requests/', 'POST /api/book_requests/',
+            {'book_id': book['id']}, expected=(201,),
+        ).data
+        recorder.call(client, 'get', '/api/book_requests/', 'GET /api/book_requests/')
+
+        donor_id = book['user_id']
+        if donor_id not in donor_clients:
+            donor_clients[donor_id] = _login(recorder, User.objects.get(pk=donor_id).email)
+        donor = donor_clients[donor_id]
+        recorder.call(donor, 'get', '/api/donor-requests/?status=pending', 'GET /api/donor-requests/')
+        recorder.call(
+            donor, 'patch', f"/api/donor-requests/{book_request['id']}/approve/",
+            'PATCH /api/donor-requests/{id}/approve/',
+        )
+        recorder.call(
+            client, 'patch', f"/api/book_requests/{book_request['id']}/confirm-pickup/",
+            'PATCH /api/book_requests/{id}/confirm-pickup/',
+        )
+        recorder.call(client, 'get', '/api/users/me/summary/', 'GET /api/users/me/summary/')
+        recorder.call(donor, 'get', '/api/my-books/', 'GET /api/my-books/')
+
+
+def run_deactivation(recorder, books):
+    """Exclusão (desativação) de uma conta com muitos livros e pedidos em aberto."""
+    user = User.objects.create(
+        name="Conta a desativar", email="desativar@benchmark.local",
+        password=make_password(BENCHMARK_PASSWORD),
+    )
+    pickup_point_id = PickupPoint.objects.values_list('id', flat=True).first()
+    Book.objects.bulk_create([
+        Book(title=f"Livro {i}", author="Autor", description="", category='fantasy',
+             classification='all_ages', user=user, pickup_point_id=pickup_point_id)
+        for i in range(books)
+    ], batch_size=1000)
+
+    client = _login(recorder, user.email)
+    # Alguns pedidos feitos pelo usuário, que voltam ao catálogo ao desativá-lo
+    for book_id in Book.objects.filter(status='available').exclude(user=user).values_list('id', flat=True)[:20]:
+        recorder.call(client, 'post', '/api/book_requests/', 'POST /api/book_requests/', {'book_id': book_id}, expected=(201,))
+
+    recorder.call(
+        client, 'delete', f'/api/users/{user.id}/?confirm=true',
+        'DELETE /api/users/{id}/?confirm=true', expected=(204,),
+    )
+    return {'books': books, **recorder.summary()['DELETE /api/users/{id}/?confirm=true']}
+
+
+def run_concurrency(readers, duration):
+    """
+    Leituras do catálogo em várias threads enquanto outra thread cadastra
+    livros. Mede leituras e escritas por segundo e a latência das leituras.
+    """
+    email = User.objects.filter(books__isnull=False).values_list('email', flat=True).first()
+    pickup_point_id = PickupPoint.objects.values_list('id', flat=True).first()
+    stop = threading.Event()
+    recorder = Recorder()
+    errors = []
+
+    def reader(seed):
+        rng = random.Random(seed)
+        client = APIClient()
+        try:
+            while not stop.is_set():
+                recorder.call(client, 'get', f'/api/catalog/?q={rng.choice(WORDS)}', 'read')
+        except Exception as exc:
+            errors.append(repr(exc))
+        finally:
+            connections.close_all()
+
+    def writer():
+        try:
+            client = _login(Recorder(), email)
+            while not stop.is_set():
+                recorder.call(client, 'post', '/api/my-books/', 'write', {
+                    'title': 'Livro novo', 'author': 'Autor', 'description': 'Cadastrado durante a leitura',
+                    'category': 'fantasy', 'classification': 'all_ages', 'pickup_point_id': pickup_point_id,
+                }, expected=(201,))
+        except Exception as exc:
+            errors.append(repr(exc))
+        finally:
+            connections.close_all()
+
+    threads = [threading.Thread(target=reader, args=(seed,)) for seed in range(readers)]
+    threads.append(threading.Thread(target=writer))
+    for thread in threads:
+        thread.start()
+    time.sleep(duration)
+    stop.set()
+    for thread in threads:
+        thread.join()
+
+    summary = recorder.summary()
+    reads, writes = summary.get('read', {}), summary.get('write', {})
+    return {
+        'readers': readers,
+        'duration_s': duration,
+        'reads_per_s': round(reads.get('count', 0) / duration, 1),
+        'writes_per_s': round(writes.get('count', 0) / duration, 1),
+        'read_p50_ms': reads.get('p50_ms', 0.0),
+        'read_p99_ms': reads.get('p99_ms', 0.0),
+        'write_p99_ms': writes.get('p99_ms', 0.0),
+        'errors': errors[:10],
+    }
+
+
+async def _http_get(reader, writer, path):
+    """GET numa conexão keep-alive já aberta; devolve o status HTTP."""
+    writer.write(f"GET {quote(path, safe='/?=&')} HTTP/1.1\r\nHost: localhost\r\n\r\n".encode())
+    await writer.drain()
+    status = int((await reader.readline()).split()[1])
+    headers = {}
+    while (line := await reader.readline()) not in (b'\r\n', b''):
+        name, _, value = line.decode('latin-1').partition(':')
+        headers[name.strip().lower()] = value.strip()
+    if headers.get('transfer-encoding') == 'chunked':
+        while size := int((await reader.readline()).strip(), 16):
+            await reader.readexactly(size + 2)
+        await reader.readline()
+    else:
+        await reader.readexactly(int(headers.get('content-length', 0)))
+    return status
+
+
+def _thread_count(pid):
+    try:
+        with open(f'/proc/{pid}/status') as f:
+            return next(int(line.split()[1]) for line in f if line.startswith('Threads:'))
+    except (OSError, StopIteration):
+        return None
+
+
+async def _load(port, paths, connections, requests_per_connection, seed, server_pid):
+    """
+    `connections` conexões simultâneas, cada uma com requisições em sequência.
+    Acompanha também o número de threads do servidor durante a carga.
+    """
+    latencies, errors, threads = [], [], []
+
+    async def client(index):
+        rng = random.Random(seed + index)
+        try:
+            reader, writer = await asyncio.open_connection('127.0.0.1', port)
+        except OSError as exc:
+            errors.append(repr(exc))
+            return
+        try:
+            for _ in range(requests_per_connection):
+                start = time.perf_counter()
+                status = await _http_get(reader, writer, rng.choice(paths))
+                latencies.append(time.perf_counter() - start)
+                if status != 200:
+                    errors.append(f"HTTP {status}")
+        except (OSError, asyncio.IncompleteReadError, ValueError, IndexError) as exc:
+            errors.append(repr(exc))
+        finally:
+            writer.close()
+
+    async def watch_threads():
+        while True:
+            threads.append(_thread_count(server_pid) or 0)
+            await asyncio.sleep(0.05)
+
+    watcher = asyncio.create_task(watch_threads())
+    started = time.perf_counter()
+    await asyncio.gather(*(client(index) for index in range(connections)))
+    elapsed = time.perf_counter() - started
+    watcher.cancel()
+    return latencies, errors, elapsed, max(threads, default=0)
+
+
+def _start_asgi_server(sock, connections):
+    """uvicorn (um worker) em outro processo, servindo o banco atual pelo socket já aberto."""
+    env = {
+        **os.environ,
+        'DJANGO_SETTINGS_MODULE': os.environ.get('DJANGO_SETTINGS_MODULE', 'config.settings'),
+        'DATABASE_PATH': connection.settings_dict['NAME'],
+        'METRICS_SAMPLE_RATE': '0',
+    }
+    server = subprocess.Popen(
+        [
+            sys.executable, '-m', 'uvicorn', 'config.asgi:application', '--fd', str(sock.fileno()),
+            '--lifespan', 'off', '--log-level', 'error', '--backlog', str(max(2048, connections)),
+        ],
+        cwd=settings.BASE_DIR, env=env, pass_fds=[sock.fileno()],
+    )
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise BenchmarkError("O servidor ASGI não iniciou.")
+        try:
+            with socket.create_connection(sock.getsockname(), timeout=1):
+                return server
+        except OSError:
+            time.sleep(0.1)
+    server.terminate()
+    raise BenchmarkError("O servidor ASGI não respondeu a tempo.")
+
+
+def run_asgi_comparison(connections=500, requests_per_connection=4, seed=0):
+    """
+    Dispara as mesmas leituras públicas contra as rotas síncronas (viewsets do
+    DRF, que o Django executa em threads) e as assíncronas (/api/async/...),
+    com `connections` conexões simultâneas num servidor ASGI de um worker.
+    Cada variante usa um servidor novo, com o cache vazio.
+    """
+    if importlib.util.find_spec('uvicorn') is None:
+        return {'skipped': "uvicorn não está instalado."}
+
+    book_ids = list(Book.objects.filter(status='available').values_list('id', flat=True)[:200])
+    categories = [value for value, _ in Book.CATEGORY_CHOICES]
+    rng = random.Random(seed)
+    # Filtros e livros variados, para não servir tudo do cache
+    reads = [f'catalog/?category={category}' for category in categories]
+    reads += [f'catalog/?q={word}' for word in rng.sample(WORDS, 8)]
+    reads += [f'catalog/{book_id}/' for book_id in book_ids]
+    reads += ['pickup-points/'] * 4
+    variants = {
+        'sync': [f'/api/{path}' for path in reads],
+        'async': [f'/api/async/{path}' for path in reads],
+    }
+
+    report = {'connections': connections, 'requests_per_connection': requests_per_connection}
+    for name, paths in variants.items():
+        with socket.socket() as sock:
+            sock.bind(('127.0.0.1', 0))
+            sock.listen(max(2048, connections))
+            server = _start_asgi_server(sock, connections)
+            try:
+                latencies, errors, elapsed, threads = asyncio.run(
+                    _load(sock.getsockname()[1], paths, connections, requests_per_connection, seed, server.pid)
+                )
+            finally:
+                server.terminate()
+                server.wait()
+        report[name] = {
+            'requests': len(latencies),
+            'throughput_rps': round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+            'p50_ms': round(percentile(latencies, 0.5) * 1000, 3),
+            'p99_ms': round(percentile(latencies, 0.99) * 1000, 3),
+            'errors': len(errors),
+            'error_samples': sorted(set(errors))[:5],
+            'server_threads_peak': threads,
+        }
+    return report
+
+
+def run_serializer_comparison(limit=1000, repeat=5):
+    """
+    Serializa os mesmos objetos pelo DRF e pelo plano compilado
+    (fast_serialization): o JSON precisa ser idêntico, byte a byte. Mede o
+    tempo de cada caminho, sem contar a consulta.
+    """
+    renderer = JSONRenderer()
+    results = {}
+    for serializer_class, queryset in (
+        (BookSerializer, Book.objects.all()),
+        (BookRequestSerializer, BookRequest.objects.all()),
+        (SimplifiedBookRequestSerializer, BookRequest.objects.all()),
+    ):
+        instances = list(eager_load(queryset, serializer_class).order_by('id')[:limit])
+        expected = renderer.render(serializer_class(instances, many=True).data)
+        if renderer.render(serialize_many(serializer_class(), instances)) != expected:
+            raise BenchmarkError(f"{serializer_class.__name__}: a serialização compilada diverge do DRF.")
+
+        timings = {}
+        for name, serialize in (
+            ('drf', lambda: serializer_class(instances, many=True).data),
+            ('compiled', lambda: serialize_many(serializer_class(), instances)),
+        ):
+            started = time.perf_counter()
+            for _ in range(repeat):
+                serialize()
+            timings[name] = (time.perf_counter() - started) / repeat * 1000
+        results[serializer_class.__name__] = {
+            'objects': len(instances),
+            'drf_ms': round(timings['drf'], 2),
+            'compiled_ms': round(timings['compiled'], 2),
+            'speedup': round(timings['drf'] / timings['compiled'], 1) if timings['compiled'] else None,
+        }
+    return results
+
+
+def run_json_comparison(books=10000, repeat=5):
+    """
+    Codifica e decodifica uma página de `books` livros serializados (os livros
+    do banco repetidos até completar) pelo json do DRF e por
+    common/renderers.py. Os bytes precisam ser idênticos.
+    """
+    instances = list(eager_load(Book.objects.all(), BookSerializer).order_by('id')[:books])
+    if not instances:
+        return {}
+    results = serialize_many(BookSerializer(), instances)
+    payload = {'next': None, 'previous': None, 'results': (results * (books // len(results) + 1))[:books]}
+
+    expected = JSONRenderer().render(payload)
+    content = dumps(payload)
+    if content != expected:
+        raise BenchmarkError("O JSON do FastJSONRenderer diverge do JSONRenderer do DRF.")
+
+    def timed(function):
+        started = time.perf_counter()
+        for _ in range(repeat):
+            function()
+        return round((time.perf_counter() - started) / repeat * 1000, 2)
+
+    drf_parser, parser = JSONParser(), FastJSONParser()
+    return {
+        'books': books,
+        'bytes': len(content),
+        'orjson': orjson_enabled(),
+        'render_drf_ms': timed(lambda: JSONRenderer().render(payload)),
+        'render_fast_ms': timed(lambda: dumps(payload)),
+        'parse_drf_ms': timed(lambda: drf_parser.parse(io.BytesIO(content))),
+        'parse_fast_ms': timed(lambda: parser.parse(io.BytesIO(content))),
+    }
+
+
+def run_benchmark(seed=0, users=20, pickup_points=5, books=500, requesters=20,
+                  deactivate_books=10000, readers=4, duration=3.0, asgi_connections=0,
+                  asgi_requests=4):
+    """Executa todos os cenários no banco atual e devolve o relatório."""
+    rng = random.Random(seed)
+    for cache in caches.all():
+        cache.clear()
+
+    started = time.perf_counter()
+    seed_data(rng, users, pickup_points, books)
+    seed_seconds = time.perf_counter() - started
+
+    workflow = Recorder()
+    run_workflow(workflow, rng, requesters)
+    report = {
+        'meta': {
+            'seed': seed, 'users': users, 'pickup_points': pickup_points, 'books': books,
+            'requesters': requesters, 'python': platform.python_version(),
+            'django': django.get_version(), 'sqlite': connection.Database.sqlite_version,
+            'seed_seconds': round(seed_seconds, 3),
+        },
+        'endpoints': workflow.summary(),
+        'scenarios': {
+            'serializers': run_serializer_comparison(),
+            'json_rendering': run_json_comparison(),
+        },
+    }
+    if readers and duration:
+        report['scenarios']['concurrent_catalog'] = run_concurrency(readers, duration)
+    if asgi_connections:
+        report['scenarios']['asgi_sync_vs_async'] = run_asgi_comparison(asgi_connections, asgi_requests, seed)
+    if deactivate_books:
+        report['scenarios']['deactivate_user'] = run_deactivation(Recorder(), deactivate_books)
+    return report
+
+
+def compare_reports(current, baseline, tolerance=0.5):
+    """
+    Compara com um relatório anterior. Qualquer aumento no número de
+    consultas é regressão; latência só conta se o p50 piorar mais que
+    `tolerance` (fração) e mais que 1 ms, para não acusar ruído.
+    """
+    regressions = []
+    for label, old in baseline.get('endpoints', {}).items():
+        new = current['endpoints'].get(label)
+        if new is None:
+            continue
+        for field in ('queries_mean', 'queries_max'):
+            if new[field] > old[field]:
+                regressions.append(f"{label}: {field} {old[field]} -> {new[field]}")
+        if new['p50_ms'] > old['p50_ms'] * (1 + tolerance) and new['p50_ms'] - old['p50_ms'] > 1:
+            regressions.append(f"{label}: p50 {old['p50_ms']} ms -> {new['p50_ms']} ms")
+
+    # Uma única execução: só o número de consultas é estável o bastante
+    old = baseline.get('scenarios', {}).get('deactivate_user')
+    new = current['scenarios'].get('deactivate_user')
+    if old and new and old['books'] == new['books'] and new['queries_max'] > old['queries_max']:
+        regressions.append(f"deactivate_user: consultas {old['queries_max']} -> {new['queries_max']}")
+    return regressions
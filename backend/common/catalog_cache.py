@@ -0,0 +1,124 @@
+import hashlib
+import threading
+import time
+
+from django.core.cache import caches
+from django.core.cache.backends.base import InvalidCacheBackendError
+from django.db import transaction
+
+
+CACHE_ALIAS = 'catalog'
+
+# O cache é o LocMemCache de cada processo: a invalidação só alcança o
+# processo que fez a escrita. Os demais workers (e as escritas feitas por
+# comandos como import_books e seed, que rodam em outro processo) só
+# enxergam a mudança quando as entradas expiram (CATALOG_CACHE_TIMEOUT).
+#
+# As chaves incluem uma versão: a do catálogo inteiro para as páginas da
+# listagem e a de cada livro para os detalhes. Invalidar é só trocar a versão;
+# as entradas antigas deixam de ser lidas e saem do cache pelo LRU ou pelo TTL.
+CATALOG_VERSION_KEY = 'catalog:version'
+BOOK_VERSION_KEY = 'catalog:book-version:{}'
+
+_stats_lock = threading.Lock()
+_stats = {'hits': 0, 'misses': 0, 'invalidations': 0}
+
+
+def _cache():
+    try:
+        return caches[CACHE_ALIAS]
+    except InvalidCacheBackendError:
+        return caches['default']
+
+
+def _version(key):
+    cache = _cache()
+    version = cache.get(key)
+    if version is None:
+        # Uma versão baseada no relógio nunca colide com versões anteriores,
+        # mesmo que a chave tenha sido descartada pelo LRU.
+        version = time.time_ns()
+        if not cache.add(key, version, timeout=None):
+            version = cache.get(key, version)
+    return version
+
+
+def _count(stat):
+    with _stats_lock:
+        _stats[stat] += 1
+
+
+def _request_fingerprint(request):
+    key = f"{request.get_full_path()}|{request.META.get('HTTP_ACCEPT', '')}"
+    return hashlib.md5(key.encode()).hexdigest()
+
+
+def list_key(request):
+    return f"catalog:list:{_version(CATALOG_VERSION_KEY)}:{_request_fingerprint(request)}"
+
+
+def detail_key(request, pk):
+    return f"catalog:book:{pk}:{_version(BOOK_VERSION_KEY.format(pk))}:{_request_fingerprint(request)}"
+
+
+def state_key(name):
+    return f"catalog:state:{name}:{_version(CATALOG_VERSION_KEY)}"
+
+
+def book_state_key(pk):
+    return f"catalog:book-state:{pk}:{_version(BOOK_VERSION_KEY.format(pk))}"
+
+
+def fetch(key):
+    """Busca um payload no cache, contabilizando acertos e falhas."""
+    data = _cache().get(key)
+    _count('misses' if data is None else 'hits')
+    return data
+
+
+def store(key, data):
+    _cache().set(key, data)
+
+
+def invalidate_books(*book_ids):
+    """
+    Invalida as páginas do catálogo e os detalhes dos livros informados
+    (sem ids, apenas as páginas). Dentro de uma transação, a invalidação só acontece após o commit.
+    """
+    def invalidate():
+        cache = _cache()
+        keys = [CATALOG_VERSION_KEY] + [BOOK_VERSION_KEY.format(pk) for pk in book_ids]
+        cache.set_many({key: time.time_ns() for key in keys}, timeout=None)
+        _count('invalidations')
+
+    transaction.on_commit(invalidate)
+
+
+def invalidate_on_change(sender, instance, **kwargs):
+    """
+    Receptor de post_save/post_delete de Book, PickupPoint e User: cobre as
+    escritas feitas pelo admin, pelo shell e pelos serializers. update(),
+    bulk_create() e SQL direto não disparam sinais e invalidam explicitamente.
+    """
+    from .models import Book, PickupPoint, User
+
+    if sender is Book:
+        invalidate_books(instance.pk)
+    elif sender is PickupPoint:
+        # O ponto de coleta vai aninhado nos detalhes dos seus livros
+        invalidate_books(*Book.objects.filter(pickup_point_id=instance.pk).values_list('id', flat=True))
+    elif sender is User:
+        # O nome e o e-mail do doador vão nos livros; o último login não, e um
+        # usuário recém-criado ainda não tem livros
+        update_fields = kwargs.get('update_fields')
+        if kwargs.get('created') or (update_fields is not None and set(update_fields) <= {'last_login'}):
+            return
+        book_ids = list(Book.objects.filter(user_id=instance.pk).values_list('id', flat=True))
+        if book_ids:
+            invalidate_books(*book_ids)
+
+
+def stats():
+    """Contadores de acertos, falhas e invalidações deste processo."""
+    with _stats_lock:
+        return dict(_stats)
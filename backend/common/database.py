@@ -0,0 +1,53 @@
+from django.conf import settings
+from django.db import connections
+
+
+# PRAGMAs que alteram o arquivo do banco; não se aplicam a conexões somente leitura
+WRITE_PRAGMAS = ('journal_mode',)
+
+
+def is_read_only(connection):
+    """Conexões abertas com `?mode=ro` (réplica de leitura) não podem escrever."""
+    return 'mode=ro' in str(connection.settings_dict.get('NAME', ''))
+
+
+def configure_sqlite(sender, connection, **kwargs):
+    """
+    Handler de `connection_created`: aplica os PRAGMAs de settings.SQLITE_PRAGMAS
+    a cada nova conexão SQLite (journal em WAL, synchronous, mmap, cache e
+    tempo de espera por locks). Com CONN_MAX_AGE, isso acontece uma vez por
+    conexão persistente, e não a cada requisição.
+    """
+    if connection.vendor != 'sqlite':
+        return
+
+    read_only = is_read_only(connection)
+    with connection.cursor() as cursor:
+        for pragma, value in getattr(settings, 'SQLITE_PRAGMAS', {}).items():
+            if value is None or (read_only and pragma in WRITE_PRAGMAS):
+                continue
+            cursor.execute(f"PRAGMA {pragma} = {value}")
+
+
+class ReadReplicaRouter:
+    """
+    Envia as leituras para a conexão somente leitura (`READ_REPLICA_ALIAS`) e
+    as escritas para 'default'. Dentro de um transaction.atomic as leituras
+    ficam em 'default', para enxergarem o que a própria transação escreveu.
+    """
+    replica_alias = 'replica'
+
+    def db_for_read(self, model, **hints):
+        if connections['default'].in_atomic_block:
+            return 'default'
+        return self.replica_alias
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # As duas conexões apontam para o mesmo arquivo
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        return db == 'default'
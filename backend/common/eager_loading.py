@@ -0,0 +1,180 @@
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework import serializers
+
+
+# Planos já calculados, por classe de serializer
+_plan_cache = {}
+
+
+def _relation_lookups(model, attrs):
+    """
+    Converte um caminho de atributos (ex.: ['book', 'user', 'name']) em lookups
+    de relações. Devolve (select_related, prefetch_related).
+    """
+    path = []
+    prefetch = False
+    for attr in attrs:
+        try:
+            field = model._meta.get_field(attr)
+        except FieldDoesNotExist:
+            break
+        if not field.is_relation:
+            break
+        path.append(attr)
+        # FK e OneToOne (diretos ou reversos) podem ser resolvidos com JOIN;
+        # relações "para muitos" exigem prefetch a partir deste ponto.
+        if field.many_to_many or field.one_to_many:
+            prefetch = True
+        model = field.related_model
+
+    if not path:
+        return set(), set()
+    lookup = '__'.join(path)
+    if prefetch:
+        return set(), {lookup}
+    return {lookup}, set()
+
+
+def _walk_fields(serializer, model, prefix):
+    select, prefetch = set(), set()
+
+    for field in serializer.fields.values():
+        if field.write_only or field.source == '*':
+            continue
+
+        attrs = prefix + field.source_attrs
+
+        if isinstance(field, serializers.ListSerializer):
+            field = field.child
+        if isinstance(field, serializers.BaseSerializer):
+            # Serializer aninhado: carrega a relação e percorre os campos dele
+            rel_select, rel_prefetch = _relation_lookups(model, attrs)
+            select |= rel_select
+            prefetch |= rel_prefetch
+            nested_select, nested_prefetch = _walk_fields(field, model, attrs)
+            select |= nested_select
+            prefetch |= nested_prefetch
+            continue
+
+        if isinstance(field, serializers.PrimaryKeyRelatedField) and len(attrs) == 1:
+            # O DRF usa apenas o valor da coluna "<campo>_id", sem JOIN
+            continue
+        if not isinstance(field, serializers.RelatedField):
+            # Campo simples: só a parte relacional do caminho precisa de JOIN
+            attrs = attrs[:-1]
+
+        rel_select, rel_prefetch = _relation_lookups(model, attrs)
+        select |= rel_select
+        prefetch |= rel_prefetch
+
+    # Relações usadas por SerializerMethodField não são visíveis pelos campos,
+    # então cada serializer pode declará-las em Meta.eager_related (e elas só
+    # são carregadas se algum desses campos continua no serializer).
+    meta = getattr(serializer, 'Meta', None)
+    computed = any(_is_computed(field) for field in serializer.fields.values() if not field.write_only)
+    for lookup in getattr(meta, 'eager_related', ()) if computed else ():
+        rel_select, rel_prefetch = _relation_lookups(model, prefix + lookup.split('__'))
+        select |= rel_select
+        prefetch |= rel_prefetch
+
+    return select, prefetch
+
+
+def _plan(serializer):
+    select, prefetch = _walk_fields(serializer, serializer.Meta.model, [])
+    # "book__user" já implica "book"; evita lookups redundantes
+    select = {
+        lookup for lookup in select
+        if not any(other.startswith(lookup + '__') for other in select)
+    }
+    return sorted(select), sorted(prefetch)
+
+
+def get_eager_plan(serializer):
+    """
+    Deriva o plano de select_related/prefetch_related a partir dos campos
+    declarados no serializer. Recebe a classe (o plano fica em cache) ou uma
+    instância com campos removidos, como as dos ?fields= (ver sparse_fields).
+    """
+    if not isinstance(serializer, type):
+        return _plan(serializer)
+    if serializer not in _plan_cache:
+        _plan_cache[serializer] = _plan(serializer())
+    return _plan_cache[serializer]
+
+
+def _is_computed(field):
+    return field.source == '*' or isinstance(field, serializers.SerializerMethodField)
+
+
+def _column_path(model, attrs):
+    """
+    O caminho passa só por campos do modelo e relações "para um"? Devolve o
+    modelo relacionado ao final (None se o último atributo for uma coluna),
+    ou False se o caminho não puder ser restringido com only().
+    """
+    for attr in attrs:
+        if model is None:
+            return False
+        try:
+            field = model._meta.get_field(attr)
+        except FieldDoesNotExist:
+            return False
+        if field.many_to_many or field.one_to_many:
+            return False
+        model = field.related_model if field.is_relation else None
+    return model
+
+
+def get_load_only(serializer, model=None):
+    """
+    Lookups das colunas lidas pelos campos do serializer, para only(). Devolve
+    None quando é preciso a linha inteira: campos calculados
+    (SerializerMethodField, source='*') podem ler qualquer coluna. Num
+    serializer aninhado, isso carrega só a linha inteira da relação.
+    """
+    model = model or serializer.Meta.model
+    columns = set()
+    for field in serializer.fields.values():
+        if field.write_only:
+            continue
+        if _is_computed(field) or isinstance(field, serializers.ListSerializer):
+            return None
+        related_model = _column_path(model, field.source_attrs)
+        if related_model is False:
+            return None
+        path = '__'.join(field.source_attrs)
+        nested = None
+        if isinstance(field, serializers.BaseSerializer) and related_model is not None:
+            nested = get_load_only(field, related_model)
+        if nested:
+            columns |= {f'{path}__{column}' for column in nested}
+        else:
+            # Coluna simples, ou a linha inteira da relação (serializer
+            # aninhado com campos calculados, StringRelatedField, ...)
+            columns.add(path)
+    return columns
+
+
+def eager_load(queryset, serializer):
+    """Aplica ao queryset o plano de carregamento do serializer (classe ou instância)."""
+    select, prefetch = get_eager_plan(serializer)
+    if select:
+        queryset = queryset.select_related(*select)
+    if prefetch:
+        queryset = queryset.prefetch_related(*prefetch)
+    return queryset
+
+
+class EagerLoadingMixin:
+    """
+    Mixin para viewsets que carrega as relações usadas pelo serializer em uma
+    única consulta, evitando N+1 em listagens e detalhes.
+    """
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        return eager_load(queryset, self.get_eager_serializer())
+
+    def get_eager_serializer(self):
+        # Classe ou instância cujo plano é aplicado (ver SparseFieldsMixin)
+        return self.get_serializer_class()
@@ -0,0 +1,84 @@
+import csv
+import json
+from datetime import datetime, time
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+from .models import Book, BookRequest, User
+
+
+DEFAULT_CHUNK_SIZE = 2000
+
+EXPORT_FORMATS = ('ndjson', 'csv')
+
+# Tabela exportada -> (queryset, colunas). As linhas saem de values(), sem
+# instanciar modelos, e são lidas do banco em blocos com iterator().
+EXPORTS = {
+    'books': (
+        Book.objects.all(),
+        ['id', 'title', 'author', 'description', 'category', 'classification', 'status',
+         'user_id', 'pickup_point_id', 'book_request_id', 'updated_at'],
+    ),
+    'book-requests': (
+        BookRequest.objects.all(),
+        ['id', 'book_id', 'user_id', 'status', 'updated_at'],
+    ),
+    'users': (
+        User.objects.all(),
+        ['id', 'name', 'email', 'birth_date', 'phone', 'is_active', 'is_staff', 'last_login', 'updated_at'],
+    ),
+}
+
+
+def parse_since(value):
+    """Converte uma data ou data e hora ISO 8601 em datetime com fuso."""
+    try:
+        since = parse_datetime(value)
+        if since is None:
+            day = parse_date(value)
+            if day is None:
+                return None
+            since = datetime.combine(day, time.min)
+    except ValueError:
+        return None
+    if timezone.is_naive(since):
+        since = timezone.make_aware(since)
+    return since
+
+
+def export_rows(name, since=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Itera sobre as linhas da exportação em ordem de id. Com `since`, apenas
+    as linhas modificadas a partir dessa data (exportação incremental).
+    """
+    queryset, fields = EXPORTS[name]
+    if since is not None:
+        queryset = queryset.filter(updated_at__gte=since)
+    return queryset.values(*fields).order_by('id').iterator(chunk_size=chunk_size)
+
+
+def ndjson_lines(rows):
+    for row in rows:
+        yield json.dumps(row, cls=DjangoJSONEncoder, ensure_ascii=False) + '\n'
+
+
+class _Echo:
+    """Buffer que apenas devolve o que recebe, para o csv.writer gerar linhas."""
+    def write(self, value):
+        return value
+
+
+def csv_lines(rows, fields):
+    writer = csv.writer(_Echo())
+    yield writer.writerow(fields)
+    for row in rows:
+        yield writer.writerow([row[field] for field in fields])
+
+
+def export_lines(name, fmt, since=None, chunk_size=DEFAULT_CHUNK_SIZE):
+    rows = export_rows(name, since=since, chunk_size=chunk_size)
+    if fmt == 'csv':
+        return csv_lines(rows, EXPORTS[name][1])
+    return ndjson_lines(rows)
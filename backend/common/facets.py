@@ -0,0 +1,99 @@
+from collections import defaultdict
+
+from django.db import connection, transaction
+from django.db.models import Count
+
+from .models import Book, CatalogFacet
+
+
+# Faceta exposta na API -> coluna da tabela de livros
+FACET_COLUMNS = {
+    'category': 'category',
+    'classification': 'classification',
+    'pickup_point': 'pickup_point_id',
+}
+
+# Os contadores são mantidos por gatilhos, de modo que qualquer escrita na
+# tabela de livros (workflow, serializers, update(), bulk_create,
+# admin...) atualiza as contagens na mesma transação. Assim como o índice de
+# busca, os gatilhos são reinstalados após cada migrate.
+_TRIGGER_NAMES = ('common_catalogfacet_ai', 'common_catalogfacet_ad', 'common_catalogfacet_au')
+
+
+def _increment(row):
+    return '\n'.join(
+        f"INSERT INTO {{facet}}(field, value, count) SELECT '{facet}', CAST({row}.{column} AS TEXT), 1 "
+        f"WHERE {row}.status = 'available' "
+        f"ON CONFLICT(field, value) DO UPDATE SET count = count + 1;"
+        for facet, column in FACET_COLUMNS.items()
+    )
+
+
+def _decrement(row):
+    return '\n'.join(
+        f"UPDATE {{facet}} SET count = count - 1 "
+        f"WHERE {row}.status = 'available' AND field = '{facet}' AND value = CAST({row}.{column} AS TEXT);"
+        for facet, column in FACET_COLUMNS.items()
+    )
+
+
+def _triggers():
+    columns = ', '.join(['status', *FACET_COLUMNS.values()])
+    triggers = (
+        f"CREATE TRIGGER IF NOT EXISTS {_TRIGGER_NAMES[0]} AFTER INSERT ON {{book}} BEGIN\n"
+        f"{_increment('new')}\nEND",
+        f"CREATE TRIGGER IF NOT EXISTS {_TRIGGER_NAMES[1]} AFTER DELETE ON {{book}} BEGIN\n"
+        f"{_decrement('old')}\nEND",
+        f"CREATE TRIGGER IF NOT EXISTS {_TRIGGER_NAMES[2]} AFTER UPDATE OF {columns} ON {{book}} "
+        f"WHEN old.status = 'available' OR new.status = 'available' BEGIN\n"
+        f"{_decrement('old')}\n{_increment('new')}\nEND",
+    )
+    return [
+        sql.format(book=Book._meta.db_table, facet=CatalogFacet._meta.db_table)
+        for sql in triggers
+    ]
+
+
+def install_facet_triggers(conn=None):
+    """
+    Cria os gatilhos dos contadores, caso não existam. Se algum precisou ser
+    (re)criado, as contagens são recalculadas.
+    """
+    conn = conn or connection
+    if conn.vendor != 'sqlite':
+        return
+
+    with conn.cursor() as cursor:
+        cursor.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'trigger' AND name IN (%s, %s, %s)",
+            list(_TRIGGER_NAMES),
+        )
+        if len(cursor.fetchall()) == len(_TRIGGER_NAMES):
+            return
+        for sql in _triggers():
+            cursor.execute(sql)
+    rebuild_facet_counts(using=conn.alias)
+
+
+def rebuild_facet_counts(using='default'):
+    """Recalcula todas as contagens a partir dos livros disponíveis."""
+    available = Book.objects.using(using).filter(status='available')
+    with transaction.atomic(using=using):
+        facets = [
+            CatalogFacet(field=facet, value=str(row[column]), count=row['total'])
+            for facet, column in FACET_COLUMNS.items()
+            for row in available.values(column).annotate(total=Count('id')).order_by()
+        ]
+        CatalogFacet.objects.using(using).all().delete()
+        CatalogFacet.objects.using(using).bulk_create(facets)
+
+
+def catalog_facets():
+    """
+    Contagens de livros disponíveis por faceta, ex.:
+    {'category': {'fantasy': 1203, ...}, 'classification': {...}, 'pickup_point': {'1': 40}}
+    """
+    facets = defaultdict(dict)
+    for field, value, count in CatalogFacet.objects.filter(count__gt=0).values_list('field', 'value', 'count'):
+        facets[field][value] = count
+    return {facet: facets.get(facet, {}) for facet in FACET_COLUMNS}
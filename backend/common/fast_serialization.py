@@ -0,0 +1,172 @@
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime
+from operator import attrgetter
+
+from django.core.exceptions import FieldDoesNotExist, ObjectDoesNotExist
+from django.db.models.manager import BaseManager
+from rest_framework import ISO_8601, serializers
+from rest_framework.fields import SkipField
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+
+
+# Leitura das listagens mais acessadas sem a pilha de to_representation do
+# DRF por objeto: os campos do serializer são percorridos uma única vez e
+# viram uma lista de (nome, leitura do atributo, conversão). A saída é a
+# mesma do serializer original; o que o plano não sabe tratar (campos com
+# source customizado, relações por pk, serializers com to_representation
+# próprio) continua passando pelo DRF.
+
+# Campos cujo to_representation do DRF é só a conversão de tipo
+_PLAIN_CONVERTERS = {
+    serializers.CharField: str,
+    serializers.EmailField: str,
+    serializers.IntegerField: int,
+    serializers.FloatField: float,
+    serializers.StringRelatedField: str,
+}
+
+
+def _is_model_path(model, attrs):
+    """O caminho de atributos só passa por campos do modelo (sem métodos ou propriedades)?"""
+    for attr in attrs:
+        if model is None:
+            return False
+        try:
+            field = model._meta.get_field(attr)
+        except FieldDoesNotExist:
+            return False
+        model = field.related_model if field.is_relation else None
+    return True
+
+
+def _getter(field, model):
+    """
+    Função que lê do objeto o valor de origem do campo. Caminhos por campos
+    do modelo viram um attrgetter; o resto usa o get_attribute do DRF.
+    """
+    if field.source == '*':
+        return lambda instance: instance
+    if isinstance(field, serializers.RelatedField) and not isinstance(field, serializers.StringRelatedField):
+        # Relações por pk usam a otimização PKOnlyObject do DRF
+        return field.get_attribute
+    if model is None or not _is_model_path(model, field.source_attrs):
+        return field.get_attribute
+    return attrgetter('.'.join(field.source_attrs))
+
+
+def _datetime_converter(field):
+    """DateTimeField em ISO 8601, com o fuso da requisição resolvido uma única vez."""
+    output_format = getattr(field, 'format', api_settings.DATETIME_FORMAT)
+    field_timezone = field.timezone if hasattr(field, 'timezone') else field.default_timezone()
+    if output_format is None or output_format.lower() != ISO_8601 or field_timezone is None:
+        return field.to_representation
+
+    def convert(value):
+        if not isinstance(value, datetime) or value.utcoffset() is None:
+            return field.to_representation(value)
+        try:
+            value = value.astimezone(field_timezone).isoformat()
+        except OverflowError:
+            return field.to_representation(value)
+        return value[:-6] + 'Z' if value.endswith('+00:00') else value
+    return convert
+
+
+def _converter(field):
+    """Função que converte o valor lido para a representação do campo."""
+    if isinstance(field, serializers.ListSerializer):
+        if type(field).to_representation is not serializers.ListSerializer.to_representation:
+            return field.to_representation
+        child = compile_serializer(field.child)
+
+        def convert_many(data):
+            items = data.all() if isinstance(data, BaseManager) else data
+            return [child(item) for item in items]
+        return convert_many
+    if isinstance(field, serializers.Serializer):
+        return compile_serializer(field)
+    if isinstance(field, serializers.SerializerMethodField):
+        return getattr(field.parent, field.method_name)
+    if type(field) is serializers.DateTimeField:
+        return _datetime_converter(field)
+    return _PLAIN_CONVERTERS.get(type(field), field.to_representation)
+
+
+def compile_serializer(serializer):
+    """
+    Devolve uma função objeto -> dict equivalente a serializer.to_representation.
+    O serializer deve estar instanciado com o contexto da requisição (os
+    SerializerMethodField são chamados nele).
+    """
+    if type(serializer).to_representation is not serializers.Serializer.to_representation:
+        return serializer.to_representation
+
+    model = getattr(getattr(serializer, 'Meta', None), 'model', None)
+    steps = [
+        (field.field_name, _getter(field, model), _converter(field), field)
+        for field in serializer._readable_fields
+    ]
+
+    def represent(instance):
+        data = {}
+        for name, get, convert, field in steps:
+            try:
+                value = get(instance)
+            except SkipField:
+                continue
+            except (AttributeError, ObjectDoesNotExist):
+                # Relação nula ou inexistente no caminho: o DRF decide entre
+                # o default, None ou omitir o campo
+                try:
+                    value = field.get_attribute(instance)
+                except SkipField:
+                    continue
+            data[name] = None if value is None else convert(value)
+        return data
+    return represent
+
+
+# Tempo de serialização da requisição em andamento, medido pelo
+# PerformanceMetricsMiddleware (ver measure_serialization)
+_serialization_timer = ContextVar('serialization_timer', default=None)
+
+
+@contextmanager
+def measure_serialization():
+    """
+    Soma em timer[0] o tempo gasto em serialize_many dentro do bloco
+    (inclusive nas threads de sync_to_async, que herdam o contexto).
+    """
+    timer = [0.0]
+    token = _serialization_timer.set(timer)
+    try:
+        yield timer
+    finally:
+        _serialization_timer.reset(token)
+
+
+def serialize_many(serializer, instances):
+    start = time.perf_counter()
+    represent = compile_serializer(serializer)
+    data = [represent(instance) for instance in instances]
+    timer = _serialization_timer.get()
+    if timer is not None:
+        timer[0] += time.perf_counter() - start
+    return data
+
+
+class FastListMixin:
+    """
+    Mixin para viewsets cuja listagem é serializada pelo plano compilado de
+    get_serializer(), com a mesma resposta (e paginação) do ListModelMixin.
+    """
+    def list(self, request, *args, **kwargs):
+        queryset = self.filter_queryset(self.get_queryset())
+        page = self.paginate_queryset(queryset)
+        data = serialize_many(self.get_serializer(), queryset if page is None else page)
+        if page is None:
+            return Response(data)
+        return self.get_paginated_response(data)
@@ -0,0 +1,163 @@
+import math
+
+from django.db import connection, connections
+
+from .models import PickupPoint
+
+
+RTREE_TABLE = f'{PickupPoint._meta.db_table}_rtree'
+
+EARTH_RADIUS_KM = 6371.0088
+
+# Busca dos mais próximos: começa com este raio e dobra até achar pontos
+# suficientes (ou cobrir o planeta inteiro)
+INITIAL_RADIUS_KM = 5.0
+MAX_RADIUS_KM = math.pi * EARTH_RADIUS_KM
+
+# Cada ponto de coleta com coordenadas vira um "retângulo" degenerado
+# (min = max) na R*Tree. Os gatilhos mantêm o índice em dia em qualquer
+# escrita na tabela e são reinstalados após cada migrate, como os da busca.
+_TRIGGERS = {
+    f'{RTREE_TABLE}_ai': """
+        CREATE TRIGGER IF NOT EXISTS {rtree}_ai AFTER INSERT ON {table}
+        WHEN new.latitude IS NOT NULL AND new.longitude IS NOT NULL BEGIN
+            INSERT INTO {rtree}(id, min_lat, max_lat, min_lng, max_lng)
+            VALUES (new.id, new.latitude, new.latitude, new.longitude, new.longitude);
+        END
+    """,
+    f'{RTREE_TABLE}_ad': """
+        CREATE TRIGGER IF NOT EXISTS {rtree}_ad AFTER DELETE ON {table} BEGIN
+            DELETE FROM {rtree} WHERE id = old.id;
+        END
+    """,
+    f'{RTREE_TABLE}_au': """
+        CREATE TRIGGER IF NOT EXISTS {rtree}_au AFTER UPDATE OF latitude, longitude ON {table} BEGIN
+            DELETE FROM {rtree} WHERE id = old.id;
+            INSERT INTO {rtree}(id, min_lat, max_lat, min_lng, max_lng)
+            SELECT new.id, new.latitude, new.latitude, new.longitude, new.longitude
+            WHERE new.latitude IS NOT NULL AND new.longitude IS NOT NULL;
+        END
+    """,
+}
+
+
+def is_geo_index_supported(conn=None):
+    return (conn or connection).vendor == 'sqlite'
+
+
+def _format(sql):
+    return sql.format(rtree=RTREE_TABLE, table=PickupPoint._meta.db_table)
+
+
+def install_geo_index(conn=None):
+    """
+    Cria a R*Tree e os gatilhos, caso não existam. Se algo precisou ser
+    (re)criado, o índice é reconstruído a partir dos pontos de coleta.
+    """
+    conn = conn or connection
+    if not is_geo_index_supported(conn):
+        return
+
+    with conn.cursor() as cursor:
+        cursor.execute(
+            "SELECT name FROM sqlite_master WHERE name = %s OR (type = 'trigger' AND name IN (%s, %s, %s))",
+            [RTREE_TABLE, *_TRIGGERS],
+        )
+        existing = {row[0] for row in cursor.fetchall()}
+        if existing == {RTREE_TABLE, *_TRIGGERS}:
+            return
+
+        cursor.execute(_format(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS {rtree} USING rtree(id, min_lat, max_lat, min_lng, max_lng)"
+        ))
+        for trigger in _TRIGGERS.values():
+            cursor.execute(_format(trigger))
+    rebuild_geo_index(conn)
+
+
+def rebuild_geo_index(conn=None):
+    """Reconstrói o índice inteiro a partir da tabela de pontos de coleta."""
+    conn = conn or connection
+    with conn.cursor() as cursor:
+        cursor.execute(_format("DELETE FROM {rtree}"))
+        cursor.execute(_format(
+            "INSERT INTO {rtree}(id, min_lat, max_lat, min_lng, max_lng) "
+            "SELECT id, latitude, latitude, longitude, longitude FROM {table} "
+            "WHERE latitude IS NOT NULL AND longitude IS NOT NULL"
+        ))
+
+
+def haversine_km(lat1, lng1, lat2, lng2):
+    """Distância em km sobre a superfície da Terra entre dois pontos."""
+    lat1, lng1, lat2, lng2 = map(math.radians, (lat1, lng1, lat2, lng2))
+    a = (
+        math.sin((lat2 - lat1) / 2) ** 2
+        + math.cos(lat1) * math.cos(lat2) * math.sin((lng2 - lng1) / 2) ** 2
+    )
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+def bounding_box(lat, lng, radius_km):
+    """
+    Retângulo (min_lat, max_lat, min_lng, max_lng) que contém o círculo. Perto
+    dos polos ou do antimeridiano, usa todas as longitudes.
+    """
+    delta_lat = math.degrees(radius_km / EARTH_RADIUS_KM)
+    min_lat, max_lat = lat - delta_lat, lat + delta_lat
+    if min_lat <= -90 or max_lat >= 90:
+        return max(min_lat, -90.0), min(max_lat, 90.0), -180.0, 180.0
+
+    delta_lng = math.degrees(math.asin(min(1.0, math.sin(radius_km / EARTH_RADIUS_KM) / math.cos(math.radians(lat)))))
+    min_lng, max_lng = lng - delta_lng, lng + delta_lng
+    if min_lng < -180 or max_lng > 180:
+        return min_lat, max_lat, -180.0, 180.0
+    return min_lat, max_lat, min_lng, max_lng
+
+
+def _candidates(lat, lng, radius_km, using):
+    """Pontos (id, lat, lng) dentro do retângulo que envolve o raio."""
+    min_lat, max_lat, min_lng, max_lng = bounding_box(lat, lng, radius_km)
+    conn = connections[using]
+    if not is_geo_index_supported(conn):
+        # Sem R*Tree (outros bancos), filtra pelas colunas
+        return PickupPoint.objects.using(using).filter(
+            latitude__range=(min_lat, max_lat), longitude__range=(min_lng, max_lng),
+        ).values_list('id', 'latitude', 'longitude')
+
+    with conn.cursor() as cursor:
+        cursor.execute(_format(
+            "SELECT p.id, p.latitude, p.longitude FROM {rtree} r JOIN {table} p ON p.id = r.id "
+            "WHERE r.max_lat >= %s AND r.min_lat <= %s AND r.max_lng >= %s AND r.min_lng <= %s"
+        ), [min_lat, max_lat, min_lng, max_lng])
+        return cursor.fetchall()
+
+
+def points_within(lat, lng, radius_km, using='default'):
+    """
+    Pontos de coleta a até `radius_km` km, como [(distância, id), ...] do mais
+    próximo ao mais distante. A R*Tree reduz a busca ao retângulo em volta do
+    círculo; a distância exata é calculada só para esses candidatos.
+    """
+    matches = []
+    for point_id, point_lat, point_lng in _candidates(lat, lng, radius_km, using):
+        distance = haversine_km(lat, lng, point_lat, point_lng)
+        if distance <= radius_km:
+            matches.append((distance, point_id))
+    matches.sort()
+    return matches
+
+
+def nearest_points(lat, lng, limit, max_radius_km=None, using='default'):
+    """
+    Os `limit` pontos de coleta mais próximos (a até `max_radius_km` km, se
+    informado), como [(distância, id), ...]. O raio de busca dobra a cada
+    tentativa, então o custo depende de quantos pontos existem na vizinhança,
+    e não do total de pontos cadastrados.
+    """
+    max_radius_km = min(max_radius_km or MAX_RADIUS_KM, MAX_RADIUS_KM)
+    radius_km = min(INITIAL_RADIUS_KM, max_radius_km)
+    while True:
+        matches = points_within(lat, lng, radius_km, using)
+        if len(matches) >= limit or radius_km >= max_radius_km:
+            return matches[:limit]
+        radius_km = min(radius_km * 2, max_radius_km)
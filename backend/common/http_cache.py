@@ -0,0 +1,139 @@
+import hashlib
+from calendar import timegm
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db.models import Count, Max, Sum
+from django.utils.cache import get_conditional_response, patch_cache_control, patch_vary_headers
+from django.utils.http import http_date, quote_etag
+
+from . import catalog_cache
+from .models import Book, CatalogFacet, PickupPoint
+
+
+def _max_datetime(*values):
+    values = [value for value in values if value is not None]
+    return max(values) if values else None
+
+
+def _cached_state(key, compute):
+    state = catalog_cache.fetch(key)
+    if state is None:
+        state = compute()
+        if state[0] is not None:
+            catalog_cache.store(key, state)
+    return state
+
+
+def _catalog_state():
+    total = CatalogFacet.objects.filter(field='category').aggregate(total=Sum('count'))['total']
+    # Os livros levam o nome e o e-mail do doador: a edição do usuário também
+    # muda a versão
+    books = Book.objects.filter(status='available').aggregate(
+        last=Max('updated_at'), donor=Max('user__updated_at'),
+    )
+    pickup_modified = PickupPoint.objects.aggregate(last=Max('updated_at'))['last']
+    last_modified = _max_datetime(books['last'], books['donor'], pickup_modified)
+    return f"{total}:{last_modified}", last_modified
+
+
+def catalog_state(request, *args, **kwargs):
+    """
+    Versão do catálogo: total de livros disponíveis (lido da tabela de
+    facetas) e a última modificação entre livros disponíveis, seus doadores e
+    pontos de coleta.
+    Fica no cache do catálogo até a próxima invalidação.
+    """
+    return _cached_state(catalog_cache.state_key('list'), _catalog_state)
+
+
+def _catalog_book_state(pk):
+    row = Book.objects.filter(pk=pk, status='available').values_list(
+        'updated_at', 'pickup_point__updated_at', 'user__updated_at'
+    ).first()
+    if row is None:
+        return None, None
+    last_modified = _max_datetime(*row)
+    return f"{pk}:{last_modified}", last_modified
+
+
+def catalog_book_state(request, pk=None, *args, **kwargs):
+    """Versão de um livro do catálogo, ou None se ele não estiver disponível."""
+    return _cached_state(catalog_cache.book_state_key(pk), lambda: _catalog_book_state(pk))
+
+
+def pickup_points_state(request, *args, **kwargs):
+    """Versão da lista de pontos de coleta: quantidade e última modificação."""
+    state = PickupPoint.objects.aggregate(total=Count('id'), last=Max('updated_at'))
+    return f"{state['total']}:{state['last']}", state['last']
+
+
+def _validators(request, version, last_modified):
+    """ETag (da versão, da URL completa e do cabeçalho Accept) e timestamp do Last-Modified."""
+    key = f"{version}|{request.get_full_path()}|{request.META.get('HTTP_ACCEPT', '')}"
+    etag = quote_etag(hashlib.md5(key.encode()).hexdigest())
+    timestamp = timegm(last_modified.utctimetuple()) if last_modified else None
+    return etag, timestamp
+
+
+def _patch_headers(response, etag, timestamp):
+    if response.status_code in (200, 304):
+        response.headers.setdefault('ETag', etag)
+        if timestamp is not None:
+            response.headers.setdefault('Last-Modified', http_date(timestamp))
+        patch_cache_control(
+            response, public=True, must_revalidate=True,
+            max_age=getattr(settings, 'HTTP_CACHE_MAX_AGE', 0),
+        )
+        patch_vary_headers(response, ['Accept'])
+    return response
+
+
+def conditional_get(state_func):
+    """
+    Decorador para ações de leitura de viewsets que responde com
+    304 Not Modified quando o cliente já tem a versão atual (If-None-Match /
+    If-Modified-Since), sem consultar os dados nem serializar a resposta.
+
+    `state_func(request, *args, **kwargs)` devolve (versão, última modificação);
+    a ETag é derivada da versão, da URL completa e do cabeçalho Accept.
+    """
+    def decorator(view_method):
+        @wraps(view_method)
+        def wrapper(self, request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD'):
+                return view_method(self, request, *args, **kwargs)
+
+            version, last_modified = state_func(request, *args, **kwargs)
+            if version is None:
+                return view_method(self, request, *args, **kwargs)
+
+            etag, timestamp = _validators(request, version, last_modified)
+            response = get_conditional_response(request, etag=etag, last_modified=timestamp)
+            if response is None:
+                response = view_method(self, request, *args, **kwargs)
+            return _patch_headers(response, etag, timestamp)
+        return wrapper
+    return decorator
+
+
+def async_conditional_get(state_func):
+    """conditional_get para views assíncronas (funções), com o estado lido via sync_to_async."""
+    def decorator(view):
+        @wraps(view)
+        async def wrapper(request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD'):
+                return await view(request, *args, **kwargs)
+
+            version, last_modified = await sync_to_async(state_func)(request, *args, **kwargs)
+            if version is None:
+                return await view(request, *args, **kwargs)
+
+            etag, timestamp = _validators(request, version, last_modified)
+            response = get_conditional_response(request, etag=etag, last_modified=timestamp)
+            if response is None:
+                response = await view(request, *args, **kwargs)
+            return _patch_headers(response, etag, timestamp)
+        return wrapper
+    return decorator
@@ -0,0 +1,136 @@
+import codecs
+import csv
+import json
+from itertools import islice
+
+from rest_framework import serializers
+
+from . import catalog_cache
+from .models import Book, PickupPoint
+from .serializers import BookSerializer
+
+
+DEFAULT_BATCH_SIZE = 500
+MAX_BATCH_SIZE = 5000
+
+IMPORT_FORMATS = ('csv', 'ndjson')
+
+
+class BookImportSerializer(BookSerializer):
+    """
+    Mesmas regras do BookSerializer, mas o ponto de coleta é validado contra
+    os ids carregados de uma vez para o lote (context['pickup_point_ids']), em
+    vez de uma consulta por linha.
+    """
+    pickup_point_id = serializers.IntegerField(write_only=True)
+
+    def validate_pickup_point_id(self, value):
+        if value not in self.context['pickup_point_ids']:
+            raise serializers.ValidationError("Ponto de coleta não encontrado.")
+        return value
+
+
+def _decode_lines(stream):
+    # Decodifica linha a linha (e não em blocos, como o TextIOWrapper), para
+    # que as linhas anteriores a um trecho inválido sejam aproveitadas
+    for number, line in enumerate(stream):
+        yield (line.removeprefix(codecs.BOM_UTF8) if number == 0 else line).decode('utf-8')
+
+
+def parse_csv(stream):
+    """
+    Lê um CSV (com cabeçalho) linha a linha a partir de um arquivo binário.
+    Um trecho ilegível (UTF-8 inválido, campo grande demais...) vira
+    ValueError e encerra a leitura, já que as linhas seguintes não são
+    confiáveis.
+    """
+    reader = csv.DictReader(_decode_lines(stream))
+    try:
+        yield from reader
+    except (UnicodeDecodeError, csv.Error) as exc:
+        yield ValueError(f"CSV inválido após a linha {reader.line_num} do arquivo ({exc}); o restante não foi lido.")
+
+
+def parse_ndjson(stream):
+    """Lê um objeto JSON por linha; linhas inválidas (inclusive fora do UTF-8) viram ValueError."""
+    for number, line in enumerate(stream):
+        if number == 0:
+            line = line.removeprefix(codecs.BOM_UTF8)
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line.decode('utf-8'))
+        except UnicodeDecodeError:
+            row = ValueError("A linha não está em UTF-8.")
+        except (ValueError, RecursionError) as exc:
+            row = ValueError(f"JSON inválido: {exc}")
+        else:
+            if not isinstance(row, dict):
+                row = ValueError("Cada linha deve conter um objeto JSON.")
+        yield row
+
+
+def parse_upload(stream, fmt):
+    if fmt == 'csv':
+        return parse_csv(stream)
+    return parse_ndjson(stream)
+
+
+def _as_id(value):
+    # Listas, objetos e números fora do INTEGER do banco viram erro de
+    # validação da linha, e não da consulta
+    if isinstance(value, (int, str)) and str(value).isdecimal() and int(value) < 2 ** 63:
+        return int(value)
+    return None
+
+
+def _validate_batch(rows, first_row_number):
+    pickup_point_ids = {_as_id(row.get('pickup_point_id')) for row in rows if isinstance(row, dict)}
+    pickup_point_ids.discard(None)
+    context = {
+        'pickup_point_ids': set(
+            PickupPoint.objects.filter(id__in=pickup_point_ids).values_list('id', flat=True)
+        ),
+    }
+
+    valid, errors = [], []
+    for number, row in enumerate(rows, start=first_row_number):
+        if isinstance(row, Exception):
+            errors.append({'row': number, 'errors': {'non_field_errors': [str(row)]}})
+            continue
+        serializer = BookImportSerializer(data=row, context=context)
+        if serializer.is_valid():
+            valid.append(serializer.validated_data)
+        else:
+            errors.append({'row': number, 'errors': serializer.errors})
+    return valid, errors
+
+
+def import_books(rows, user_id, batch_size=DEFAULT_BATCH_SIZE):
+    """
+    Valida e insere livros em lotes com bulk_create. Linhas inválidas são
+    reportadas em `errors` (numeradas a partir de 1) sem interromper o lote.
+    """
+    batch_size = max(1, min(batch_size, MAX_BATCH_SIZE))
+    rows = iter(rows)
+    created, errors, row_number = 0, [], 1
+
+    while True:
+        batch = list(islice(rows, batch_size))
+        if not batch:
+            break
+
+        valid, batch_errors = _validate_batch(batch, row_number)
+        errors.extend(batch_errors)
+        row_number += len(batch)
+
+        books = []
+        for data in valid:
+            data.pop('status', None)
+            books.append(Book(**data, user_id=user_id, status='available'))
+        Book.objects.bulk_create(books, batch_size=batch_size)
+        created += len(books)
+
+    if created:
+        catalog_cache.invalidate_books()
+    return {'created': created, 'errors': errors}
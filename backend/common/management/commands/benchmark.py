@@ -0,0 +1,97 @@
+import json
+import os
+import tempfile
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import override_settings, setup_test_environment, teardown_test_environment
+
+from common.benchmarks import BenchmarkError, compare_reports, run_benchmark
+
+
+class Command(BaseCommand):
+    help = (
+        "Executa o fluxo completo de doação pela API em um banco temporário e mede "
+        "latência, vazão e consultas por endpoint. Use --compare para comparar com "
+        "um relatório anterior (ex.: benchmarks/baseline.json)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--seed', type=int, default=0, help="Semente dos dados gerados.")
+        parser.add_argument('--users', type=int, default=20, help="Doadores cadastrados antes do teste.")
+        parser.add_argument('--pickup-points', type=int, default=5)
+        parser.add_argument('--books', type=int, default=500)
+        parser.add_argument('--requesters', type=int, default=20, help="Usuários que percorrem o fluxo completo.")
+        parser.add_argument('--deactivate-books', type=int, default=10000,
+                            help="Livros da conta desativada no cenário de exclusão (0 desliga).")
+        parser.add_argument('--readers', type=int, default=4,
+                            help="Threads lendo o catálogo durante as escritas (0 desliga).")
+        parser.add_argument('--duration', type=float, default=3.0, help="Segundos do cenário concorrente.")
+        parser.add_argument('--asgi-connections', type=int, default=0,
+                            help="Conexões simultâneas na comparação síncrono x assíncrono sob ASGI "
+                                 "(padrão 0: desligada; ex.: 500).")
+        parser.add_argument('--asgi-requests', type=int, default=4, help="Requisições por conexão nessa comparação.")
+        parser.add_argument('--real-password-hasher', action='store_true',
+                            help="Usa o hasher de senhas configurado (lento de propósito) em vez do MD5.")
+        parser.add_argument('--output', help="Grava o relatório em um arquivo JSON.")
+        parser.add_argument('--compare', help="Relatório de referência; regressões encerram com erro.")
+        parser.add_argument('--tolerance', type=float, default=0.5,
+                            help="Piora de latência tolerada na comparação (fração do p50).")
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            raise CommandError("O benchmark usa um banco SQLite temporário.")
+
+        hashers = {}
+        if not options['real_password_hasher']:
+            # O custo do PBKDF2 dominaria cadastro e login
+            hashers['PASSWORD_HASHERS'] = ['django.contrib.auth.hashers.MD5PasswordHasher']
+
+        with tempfile.TemporaryDirectory() as directory, override_settings(**hashers):
+            # Banco em arquivo (e não em memória), para valer o modo WAL
+            connection.settings_dict['TEST']['NAME'] = os.path.join(directory, 'benchmark.sqlite3')
+            setup_test_environment()
+            old_name = connection.creation.create_test_db(verbosity=0)
+            try:
+                report = run_benchmark(
+                    seed=options['seed'], users=options['users'], pickup_points=options['pickup_points'],
+                    books=options['books'], requesters=options['requesters'],
+                    deactivate_books=options['deactivate_books'], readers=options['readers'],
+                    duration=options['duration'], asgi_connections=options['asgi_connections'],
+                    asgi_requests=options['asgi_requests'],
+                )
+            except BenchmarkError as exc:
+                raise CommandError(str(exc))
+            finally:
+                connection.creation.destroy_test_db(old_name, verbosity=0)
+                teardown_test_environment()
+
+        self.print_report(report)
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                json.dump(report, f, indent=2, ensure_ascii=False)
+            self.stdout.write(self.style.SUCCESS(f"Relatório gravado em {options['output']}."))
+
+        if options['compare']:
+            with open(options['compare']) as f:
+                baseline = json.load(f)
+            regressions = compare_reports(report, baseline, options['tolerance'])
+            if regressions:
+                for regression in regressions:
+                    self.stdout.write(self.style.ERROR(f"  {regression}"))
+                raise CommandError(f"{len(regressions)} regressões em relação a {options['compare']}.")
+            self.stdout.write(self.style.SUCCESS(f"Sem regressões em relação a {options['compare']}."))
+
+    def print_report(self, report):
+        self.stdout.write(self.style.MIGRATE_HEADING(
+            f"{'endpoint':<48} {'n':>4} {'req/s':>8} {'p50 ms':>8} {'p99 ms':>8} {'consultas':>9}"
+        ))
+        for label, stats in report['endpoints'].items():
+            self.stdout.write(
+                f"{label:<48} {stats['count']:>4} {stats['throughput_rps']:>8} {stats['p50_ms']:>8.2f} "
+                f"{stats['p99_ms']:>8.2f} {stats['queries_max']:>9}"
+            )
+        for name, stats in report['scenarios'].items():
+            self.stdout.write(self.style.MIGRATE_HEADING(name))
+            for key, value in stats.items():
+                self.stdout.write(f"  {key}: {value}")
@@ -0,0 +1,56 @@
+import json
+
+from django.core.management.base import BaseCommand
+
+from common.models import Book, BookRequest
+
+
+def hot_queries():
+    """Consultas mais frequentes da API, com valores de exemplo nos filtros."""
+    return {
+        'catalogo': Book.objects.filter(status='available').order_by('id')[:21],
+        'catalogo_pagina_seguinte': Book.objects.filter(status='available', id__gt=1000).order_by('id')[:21],
+        'meus_livros': Book.objects.filter(user_id=1).order_by('id')[:21],
+        'exclusao_livros_disponiveis': Book.objects.filter(user_id=1, status='available'),
+        'pedido_pendente_do_livro': BookRequest.objects.filter(book_id=1, status='pending'),
+        'pedidos_abertos_do_solicitante': BookRequest.objects.filter(
+            user_id=1, status__in=['pending', 'awaiting_pickup']
+        ),
+        'pedidos_recebidos_pelo_doador': BookRequest.objects.filter(book__user_id=1).order_by('id')[:21],
+    }
+
+
+class Command(BaseCommand):
+    help = (
+        "Mostra o EXPLAIN QUERY PLAN das consultas mais frequentes. "
+        "Use --output antes de uma migração e --compare depois para ver o que mudou."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--output', help="Grava os planos em um arquivo JSON.")
+        parser.add_argument('--compare', help="Compara com planos gravados anteriormente com --output.")
+
+    def handle(self, *args, **options):
+        plans = {name: queryset.explain() for name, queryset in hot_queries().items()}
+
+        previous = {}
+        if options['compare']:
+            with open(options['compare']) as f:
+                previous = json.load(f)
+
+        for name, plan in plans.items():
+            self.stdout.write(self.style.MIGRATE_HEADING(name))
+            if name in previous and previous[name] != plan:
+                self.stdout.write(self.style.WARNING("  antes:"))
+                for line in previous[name].splitlines():
+                    self.stdout.write(f"    {line}")
+                self.stdout.write(self.style.SUCCESS("  depois:"))
+            for line in plan.splitlines():
+                if ' SCAN ' in f' {line} ' and 'USING' not in line:
+                    line += "  <- varredura completa da tabela"
+                self.stdout.write(f"    {line}")
+
+        if options['output']:
+            with open(options['output'], 'w') as f:
+                json.dump(plans, f, indent=2, ensure_ascii=False)
+            self.stdout.write(self.style.SUCCESS(f"Planos gravados em {options['output']}."))
@@ -0,0 +1,32 @@
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from common.exports import DEFAULT_CHUNK_SIZE, EXPORT_FORMATS, EXPORTS, export_lines, parse_since
+
+
+class Command(BaseCommand):
+    help = "Exporta livros, solicitações ou usuários em NDJSON ou CSV, em streaming."
+
+    def add_arguments(self, parser):
+        parser.add_argument('name', choices=list(EXPORTS))
+        parser.add_argument('--output-format', choices=EXPORT_FORMATS, default='ndjson')
+        parser.add_argument('--since', help="Exporta apenas o que mudou a partir desta data (ISO 8601).")
+        parser.add_argument('--output', help="Arquivo de saída (padrão: saída padrão).")
+        parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        since = None
+        if options['since']:
+            since = parse_since(options['since'])
+            if since is None:
+                raise CommandError("Data inválida em --since.")
+
+        lines = export_lines(
+            options['name'], options['output_format'], since=since, chunk_size=options['chunk_size']
+        )
+        if options['output']:
+            with open(options['output'], 'w', encoding='utf-8', newline='') as f:
+                f.writelines(lines)
+        else:
+            sys.stdout.writelines(lines)
@@ -0,0 +1,36 @@
+import json
+import os
+
+from django.core.management.base import BaseCommand, CommandError
+
+from common.importers import DEFAULT_BATCH_SIZE, IMPORT_FORMATS, import_books, parse_upload
+from common.models import User
+
+
+class Command(BaseCommand):
+    help = "Importa livros de um arquivo CSV ou NDJSON em nome de um usuário doador."
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="Arquivo .csv ou .ndjson com os livros.")
+        parser.add_argument('--user', required=True, help="E-mail do usuário doador.")
+        parser.add_argument('--format', choices=IMPORT_FORMATS, help="Formato do arquivo (padrão: pela extensão).")
+        parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        try:
+            user = User.objects.get(email=options['user'], is_active=True)
+        except User.DoesNotExist:
+            raise CommandError(f"Usuário {options['user']} não encontrado.")
+
+        fmt = options['format'] or os.path.splitext(options['path'])[1].lstrip('.').lower()
+        if fmt not in IMPORT_FORMATS:
+            raise CommandError("Formato não suportado. Use CSV ou NDJSON.")
+
+        with open(options['path'], 'rb') as f:
+            report = import_books(parse_upload(f, fmt), user.id, batch_size=options['batch_size'])
+
+        for error in report['errors']:
+            self.stderr.write(f"Linha {error['row']}: {json.dumps(error['errors'], ensure_ascii=False)}")
+        self.stdout.write(self.style.SUCCESS(
+            f"{report['created']} livros importados, {len(report['errors'])} linhas com erro."
+        ))
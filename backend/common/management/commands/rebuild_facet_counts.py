@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from common.facets import catalog_facets, rebuild_facet_counts
+
+
+class Command(BaseCommand):
+    help = "Recalcula do zero as contagens por faceta do catálogo."
+
+    def handle(self, *args, **options):
+        rebuild_facet_counts()
+        for facet, counts in catalog_facets().items():
+            self.stdout.write(f"{facet}: {sum(counts.values())} livros em {len(counts)} valores")
+        self.stdout.write(self.style.SUCCESS("Contagens recalculadas."))
@@ -0,0 +1,17 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from common.models import Book
+from common.search import install_search_index, is_search_index_supported, rebuild_search_index
+
+
+class Command(BaseCommand):
+    help = "Reconstrói do zero o índice de busca textual do catálogo."
+
+    def handle(self, *args, **options):
+        if not is_search_index_supported(connection):
+            raise CommandError("O índice de busca textual só está disponível no SQLite.")
+
+        install_search_index(connection)
+        rebuild_search_index(connection)
+        self.stdout.write(self.style.SUCCESS(f"Índice reconstruído com {Book.objects.count()} livros."))
@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+
+from common.summaries import rebuild_user_summaries
+
+
+class Command(BaseCommand):
+    help = "Recalcula os contadores do resumo de cada usuário e corrige os divergentes."
+
+    def handle(self, *args, **options):
+        repaired = rebuild_user_summaries()
+        self.stdout.write(f"{repaired} resumos divergentes corrigidos")
+        self.stdout.write(self.style.SUCCESS("Resumos recalculados."))
@@ -0,0 +1,26 @@
+# Generated by Django 5.1.7 on 2026-10-18 03:09
+
+import common.models
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('common', '0011_remove_bookrequest_delivery_option'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BookSearchIndex',
+            fields=[
+                ('book', models.OneToOneField(db_column='rowid', db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, primary_key=True, related_name='search_index', serialize=False, to='common.book')),
+                ('document', common.models.FullTextField(db_column='common_book_fts')),
+            ],
+            options={
+                'db_table': 'common_book_fts',
+                'managed': False,
+            },
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 5.1.7 on 2026-10-18 03:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('common', '0013_hot_path_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CatalogFacet',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('field', models.CharField(max_length=30)),
+                ('value', models.CharField(max_length=100)),
+                ('count', models.IntegerField(default=0)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='book',
+            index=models.Index(condition=models.Q(('status', 'available')), fields=['category', 'id'], name='book_available_category_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='book',
+            index=models.Index(condition=models.Q(('status', 'available')), fields=['classification', 'id'], name='book_available_class_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='book',
+            index=models.Index(condition=models.Q(('status', 'available')), fields=['pickup_point', 'id'], name='book_available_pickup_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='catalogfacet',
+            constraint=models.UniqueConstraint(fields=('field', 'value'), name='catalogfacet_field_value_uniq'),
+        ),
+    ]
@@ -0,0 +1,30 @@
+# Generated by Django 5.1.7 on 2026-10-18 03:20
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('common', '0016_export_timestamps'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserSummary',
+            fields=[
+                ('user', models.OneToOneField(db_constraint=False, on_delete=django.db.models.deletion.DO_NOTHING, primary_key=True, related_name='summary', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('books_available', models.IntegerField(db_default=0, default=0)),
+                ('books_requested', models.IntegerField(db_default=0, default=0)),
+                ('books_unavailable', models.IntegerField(db_default=0, default=0)),
+                ('incoming_pending', models.IntegerField(db_default=0, default=0)),
+                ('incoming_awaiting_pickup', models.IntegerField(db_default=0, default=0)),
+                ('books_donated', models.IntegerField(db_default=0, default=0)),
+                ('outgoing_pending', models.IntegerField(db_default=0, default=0)),
+                ('outgoing_awaiting_pickup', models.IntegerField(db_default=0, default=0)),
+                ('books_received', models.IntegerField(db_default=0, default=0)),
+            ],
+        ),
+    ]
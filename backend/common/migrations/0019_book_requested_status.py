@@ -0,0 +1,18 @@
+# Generated by Django 5.1.7 on 2026-10-18 04:38
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('common', '0018_pickup_point_location'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='book',
+            name='status',
+            field=models.CharField(choices=[('available', 'Available'), ('requested', 'Requested'), ('unavailable', 'Unavailable')], default='available', max_length=20),
+        ),
+    ]
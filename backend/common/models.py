@@ -1,3 +1,4 @@
+from django.core.validators import MaxValueValidator, MinValueValidator
 from django.db import models
 from django.contrib.auth.models import AbstractBaseUser, BaseUserManager, PermissionsMixin
 
@@ -35,6 +36,7 @@ class User(AbstractBaseUser, PermissionsMixin):
     
     is_active = models.BooleanField(default=True)
     is_staff = models.BooleanField(default=False)
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
     
     objects = UserManager()
 
@@ -66,6 +68,10 @@ class PickupPoint(models.Model):
     city = models.CharField(max_length=100)
     state = models.CharField(max_length=2)
     zip = models.CharField(max_length=10)
+    # Coordenadas em graus decimais (WGS 84), indexadas numa R*Tree (common/geo.py)
+    latitude = models.FloatField(null=True, blank=True, validators=[MinValueValidator(-90), MaxValueValidator(90)])
+    longitude = models.FloatField(null=True, blank=True, validators=[MinValueValidator(-180), MaxValueValidator(180)])
+    updated_at = models.DateTimeField(auto_now=True)
 
     def __str__(self):
         return f"{self.name} - {self.street}, {self.number} - {self.city}/{self.state}"
@@ -74,6 +80,8 @@ class PickupPoint(models.Model):
 class Book(models.Model):
     STATUS_CHOICES = (
         ('available', 'Available'),
+        # Reservado por uma solicitação pendente (ver common/workflow.py)
+        ('requested', 'Requested'),
         ('unavailable', 'Unavailable'),
     )
 
@@ -107,6 +115,23 @@ class Book(models.Model):
     user = models.ForeignKey(User, related_name='books', on_delete=models.CASCADE)
     book_request = models.OneToOneField('BookRequest', on_delete=models.SET_NULL, null=True, blank=True, related_name='book_requested')
     pickup_point = models.ForeignKey('PickupPoint', on_delete=models.PROTECT)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            # Catálogo: apenas livros disponíveis, paginados por id
+            models.Index(fields=['id'], condition=models.Q(status='available'), name='book_available_idx'),
+            # "Meus livros" e exclusão de conta (livros do usuário por status)
+            models.Index(fields=['user', 'status'], name='book_user_status_idx'),
+            # Filtros do catálogo
+            models.Index(fields=['category', 'id'], condition=models.Q(status='available'), name='book_available_category_idx'),
+            models.Index(fields=['classification', 'id'], condition=models.Q(status='available'), name='book_available_class_idx'),
+            models.Index(fields=['pickup_point', 'id'], condition=models.Q(status='available'), name='book_available_pickup_idx'),
+            # Última modificação do catálogo (ETag/Last-Modified)
+            models.Index(fields=['updated_at'], condition=models.Q(status='available'), name='book_available_updated_idx'),
+            # Exportação incremental (?since=)
+            models.Index(fields=['updated_at'], name='book_updated_idx'),
+        ]
 
     def __str__(self):
         return self.title
@@ -127,7 +152,96 @@ class BookRequest(models.Model):
         choices=STATUS_CHOICES,
         default='pending',
     )
+    updated_at = models.DateTimeField(auto_now=True, db_index=True)
+
+    class Meta:
+        indexes = [
+            # Verificação de pedido pendente para o livro
+            models.Index(fields=['book', 'status'], name='bookrequest_book_status_idx'),
+            # Pedidos em aberto do solicitante
+            models.Index(fields=['user', 'status'], name='bookrequest_user_status_idx'),
+        ]
 
     def __str__(self):
         return f"Request for {self.book.title} by {self.user.name}"
-    
\ No newline at end of file
+    
+
+
+# Contagem de livros disponíveis por faceta do catálogo
+class CatalogFacet(models.Model):
+    """
+    Contadores mantidos por gatilhos no banco (ver common/facets.py): cada
+    linha guarda quantos livros disponíveis existem para um valor de faceta.
+    """
+    field = models.CharField(max_length=30)
+    value = models.CharField(max_length=100)
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['field', 'value'], name='catalogfacet_field_value_uniq'),
+        ]
+
+    def __str__(self):
+        return f"{self.field}={self.value}: {self.count}"
+
+
+# Resumo do painel do usuário
+class UserSummary(models.Model):
+    """
+    Contadores por usuário mantidos por gatilhos no banco (ver
+    common/summaries.py): livros cadastrados por status, solicitações recebidas
+    (como doador) e feitas (como solicitante). Lidos com uma busca pela chave
+    primária, sem agregar livros e solicitações a cada acesso.
+    """
+    user = models.OneToOneField(
+        User, on_delete=models.DO_NOTHING, primary_key=True,
+        db_constraint=False, related_name='summary',
+    )
+    # Livros do usuário por status
+    books_available = models.IntegerField(default=0, db_default=0)
+    books_requested = models.IntegerField(default=0, db_default=0)
+    books_unavailable = models.IntegerField(default=0, db_default=0)
+    # Solicitações recebidas nos livros do usuário
+    incoming_pending = models.IntegerField(default=0, db_default=0)
+    incoming_awaiting_pickup = models.IntegerField(default=0, db_default=0)
+    books_donated = models.IntegerField(default=0, db_default=0)
+    # Solicitações feitas pelo usuário
+    outgoing_pending = models.IntegerField(default=0, db_default=0)
+    outgoing_awaiting_pickup = models.IntegerField(default=0, db_default=0)
+    books_received = models.IntegerField(default=0, db_default=0)
+
+    def __str__(self):
+        return f"Summary for user {self.user_id}"
+
+# Busca textual
+class FullTextMatch(models.Lookup):
+    lookup_name = 'match'
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f'{lhs} MATCH {rhs}', lhs_params + rhs_params
+
+
+class FullTextField(models.TextField):
+    """Coluna oculta de uma tabela FTS5, usada como alvo do operador MATCH."""
+
+
+FullTextField.register_lookup(FullTextMatch)
+
+
+class BookSearchIndex(models.Model):
+    """
+    Tabela virtual FTS5 com o índice de título, autor e descrição dos livros.
+    Não é gerenciada pelas migrações: é criada e mantida por common/search.py.
+    """
+    book = models.OneToOneField(
+        Book, on_delete=models.DO_NOTHING, primary_key=True, db_column='rowid',
+        db_constraint=False, related_name='search_index',
+    )
+    document = FullTextField(db_column='common_book_fts')
+
+    class Meta:
+        managed = False
+        db_table = 'common_book_fts'
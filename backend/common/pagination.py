@@ -0,0 +1,114 @@
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import CursorPagination
+
+
+class KeysetPagination(CursorPagination):
+    """
+    Paginação por cursor (keyset): cada página é buscada com
+    "WHERE (a, id) > (<a>, <id>) ORDER BY a, id LIMIT n", sem OFFSET, então a
+    página N custa o mesmo que a primeira.
+
+    Cada viewset pode ajustar a ordenação com o atributo `pagination_ordering`
+    (ex.: ('category', 'id')) e o tamanho padrão com `page_size`. O cursor
+    guarda os valores de todos os campos da ordenação do último item, que
+    devem ser colunas (ou anotações) não nulas; o último campo deve ser único
+    (em geral, 'id') para que o cursor identifique um único item.
+    """
+    ordering = ('id',)
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+    def get_ordering(self, request, queryset, view):
+        ordering = getattr(view, 'pagination_ordering', None) or self.ordering
+        if isinstance(ordering, str):
+            return (ordering,)
+        return tuple(ordering)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.page_size = getattr(view, 'page_size', None) or self.page_size
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.cursor = self.decode_cursor(request)
+        reverse = self.cursor is not None and self.cursor.reverse
+        current_position = self.cursor.position if self.cursor is not None else None
+
+        if reverse:
+            queryset = queryset.order_by(*[
+                name[1:] if name.startswith('-') else f'-{name}' for name in self.ordering
+            ])
+        else:
+            queryset = queryset.order_by(*self.ordering)
+        if current_position is not None:
+            queryset = queryset.filter(self._after(current_position, reverse))
+
+        # Um item a mais indica se há página seguinte (ou anterior, ao voltar)
+        results = list(queryset[:self.page_size + 1])
+        self.page = results[:self.page_size]
+        following_position = None
+        if len(results) > len(self.page):
+            following_position = self._get_position_from_instance(results[-1], self.ordering)
+
+        if reverse:
+            self.page.reverse()
+            self.has_next = True
+            self.next_position = current_position
+            self.has_previous = following_position is not None
+            self.previous_position = following_position
+        else:
+            self.has_next = following_position is not None
+            self.next_position = following_position
+            self.has_previous = current_position is not None
+            self.previous_position = current_position
+
+        if (self.has_previous or self.has_next) and self.template is not None:
+            self.display_page_controls = True
+        return self.page
+
+    def _after(self, position, reverse):
+        """
+        Itens depois da posição na ordem da página: a comparação de tuplas
+        (a, b, id) > (x, y, z), expandida em
+        a > x OR (a = x AND b > y) OR (a = x AND b = y AND id > z),
+        com < nos campos em ordem decrescente.
+        """
+        condition = Q()
+        equal = Q()
+        for name, value in zip(self.ordering, position):
+            descending = name.startswith('-') != reverse
+            name = name.lstrip('-')
+            condition |= equal & Q(**{f"{name}__{'lt' if descending else 'gt'}": value})
+            equal &= Q(**{name: value})
+        return condition
+
+    def decode_cursor(self, request):
+        cursor = super().decode_cursor(request)
+        if cursor is None or cursor.position is None:
+            return cursor
+        try:
+            position = json.loads(cursor.position)
+        except ValueError:
+            raise NotFound(self.invalid_cursor_message)
+        if not isinstance(position, list) or len(position) != len(self.ordering):
+            raise NotFound(self.invalid_cursor_message)
+        return cursor._replace(offset=0, position=position)
+
+    def encode_cursor(self, cursor):
+        if cursor.position is not None and not isinstance(cursor.position, str):
+            cursor = cursor._replace(position=json.dumps(cursor.position, cls=DjangoJSONEncoder))
+        return super().encode_cursor(cursor)
+
+    def _get_position_from_instance(self, instance, ordering):
+        position = []
+        for name in ordering:
+            name = name.lstrip('-')
+            position.append(instance[name] if isinstance(instance, dict) else getattr(instance, name))
+        return position
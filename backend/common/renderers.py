@@ -0,0 +1,81 @@
+import codecs
+import io
+
+from django.conf import settings
+from rest_framework import renderers
+from rest_framework.parsers import JSONParser
+from rest_framework.utils import encoders
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson é opcional
+    orjson = None
+
+
+# JSON com o orjson, quando instalado: codifica direto para bytes, em C, e
+# é várias vezes mais rápido que o json da biblioteca padrão nas respostas
+# grandes do catálogo. Sem ele (ou com USE_ORJSON = False), o renderer e o
+# parser se comportam exatamente como os do DRF.
+#
+# A saída é a mesma do JSONRenderer do DRF: compacta, em UTF-8, com datas e
+# tipos que o orjson não conhece (Decimal, textos traduzíveis, ...)
+# convertidos pelo encoder do próprio DRF. Única diferença: NaN e infinito
+# viram null em vez de erro. O que o orjson não aceita (ex.: inteiros maiores
+# que 64 bits, na resposta ou no corpo da requisição) passa pelo json.
+
+# Datas e dataclasses passam pelo encoder do DRF (que usa "Z" para UTC, por
+# exemplo), e chaves não textuais viram texto, como no json
+ORJSON_OPTIONS = (
+    orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS
+) if orjson is not None else None
+
+
+def orjson_enabled():
+    return orjson is not None and getattr(settings, 'USE_ORJSON', True)
+
+
+def _default(obj, _encoder=encoders.JSONEncoder()):
+    return _encoder.default(obj)
+
+
+def dumps(data):
+    """Codifica `data` em bytes JSON no mesmo formato do JSONRenderer do DRF."""
+    if orjson_enabled():
+        try:
+            content = orjson.dumps(data, default=_default, option=ORJSON_OPTIONS)
+        except orjson.JSONEncodeError:
+            # Ex.: inteiros maiores que 64 bits, que o json aceita
+            pass
+        else:
+            # Como o DRF, escapa os separadores de linha do JavaScript
+            # (U+2028/U+2029). Procurar só o primeiro byte usa memchr e é bem
+            # mais rápido que procurar as sequências inteiras
+            if b'\xe2' in content:
+                content = content.replace(b'\xe2\x80\xa8', b'\\u2028').replace(b'\xe2\x80\xa9', b'\\u2029')
+            return content
+    return renderers.JSONRenderer().render(data)
+
+
+class FastJSONRenderer(renderers.JSONRenderer):
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b''
+        # JSON indentado (?indent / Accept com indent=) fica com o renderer do DRF
+        if self.get_indent(accepted_media_type or '', renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+        return dumps(data)
+
+
+class FastJSONParser(JSONParser):
+    def parse(self, stream, media_type=None, parser_context=None):
+        encoding = (parser_context or {}).get('encoding', settings.DEFAULT_CHARSET)
+        if not orjson_enabled() or codecs.lookup(encoding).name != 'utf-8':
+            return super().parse(stream, media_type, parser_context)
+        content = stream.read()
+        try:
+            return orjson.loads(content)
+        except orjson.JSONDecodeError:
+            # O orjson recusa o que o json aceita (inteiros maiores que 64
+            # bits, surrogates isolados em escapes \u...); o parser do DRF
+            # decide, e também dá a mensagem de erro do JSON inválido
+            return super().parse(io.BytesIO(content), media_type, parser_context)
@@ -0,0 +1,123 @@
+import re
+
+from django.db import connection
+from django.db.models import FloatField, Q, Value
+from django.db.models.expressions import RawSQL
+
+from .models import Book, BookSearchIndex
+
+
+FTS_TABLE = BookSearchIndex._meta.db_table
+
+# Colunas indexadas do livro
+FTS_COLUMNS = ('title', 'author', 'description')
+
+# Pesos do bm25 por coluna: casar no título vale mais que na descrição
+FTS_WEIGHTS = (10.0, 5.0, 1.0)
+
+# Os gatilhos mantêm o índice sincronizado em qualquer escrita na tabela de
+# livros (save, update(), bulk_create, admin...). Como o SQLite recria a tabela
+# em algumas migrações (o que apaga os gatilhos), eles são reinstalados após
+# cada migrate por install_search_index().
+_TRIGGERS = {
+    f'{FTS_TABLE}_ai': """
+        CREATE TRIGGER IF NOT EXISTS {fts}_ai AFTER INSERT ON {book} BEGIN
+            INSERT INTO {fts}(rowid, {cols}) VALUES (new.id, {new_cols});
+        END
+    """,
+    f'{FTS_TABLE}_ad': """
+        CREATE TRIGGER IF NOT EXISTS {fts}_ad AFTER DELETE ON {book} BEGIN
+            INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', old.id, {old_cols});
+        END
+    """,
+    f'{FTS_TABLE}_au': """
+        CREATE TRIGGER IF NOT EXISTS {fts}_au AFTER UPDATE OF {cols} ON {book} BEGIN
+            INSERT INTO {fts}({fts}, rowid, {cols}) VALUES ('delete', old.id, {old_cols});
+            INSERT INTO {fts}(rowid, {cols}) VALUES (new.id, {new_cols});
+        END
+    """,
+}
+
+
+def is_search_index_supported(conn=None):
+    return (conn or connection).vendor == 'sqlite'
+
+
+def _format(sql):
+    return sql.format(
+        fts=FTS_TABLE,
+        book=Book._meta.db_table,
+        cols=', '.join(FTS_COLUMNS),
+        new_cols=', '.join(f'new.{col}' for col in FTS_COLUMNS),
+        old_cols=', '.join(f'old.{col}' for col in FTS_COLUMNS),
+    )
+
+
+def install_search_index(conn=None):
+    """
+    Cria a tabela FTS5 e os gatilhos, caso não existam. Se algo precisou ser
+    (re)criado, o índice é reconstruído a partir da tabela de livros.
+    """
+    conn = conn or connection
+    if not is_search_index_supported(conn):
+        return
+
+    with conn.cursor() as cursor:
+        cursor.execute(
+            "SELECT name FROM sqlite_master WHERE name = %s OR (type = 'trigger' AND name IN (%s, %s, %s))",
+            [FTS_TABLE, *_TRIGGERS],
+        )
+        existing = {row[0] for row in cursor.fetchall()}
+        if existing == {FTS_TABLE, *_TRIGGERS}:
+            return
+
+        cursor.execute(_format(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS {fts} USING fts5("
+            "{cols}, content='{book}', content_rowid='id', "
+            "tokenize='unicode61 remove_diacritics 2')"
+        ))
+        for trigger in _TRIGGERS.values():
+            cursor.execute(_format(trigger))
+    rebuild_search_index(conn)
+
+
+def rebuild_search_index(conn=None):
+    """Reconstrói o índice inteiro a partir da tabela de livros."""
+    conn = conn or connection
+    with conn.cursor() as cursor:
+        cursor.execute(f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')")
+
+
+def build_match_query(text):
+    """
+    Converte o texto digitado pelo usuário em uma consulta FTS5 segura: cada
+    palavra vira um termo entre aspas com busca por prefixo, todas obrigatórias.
+    """
+    terms = re.findall(r'\w+', text)
+    return ' '.join(f'"{term}"*' for term in terms)
+
+
+def search_books(queryset, text):
+    """
+    Filtra o queryset pelos livros que casam com o texto e anota a relevância
+    em `search_rank` (quanto menor, mais relevante).
+    """
+    match = build_match_query(text)
+    if not match:
+        # Sem nenhuma palavra (ex.: "!!"), nada casa; a anotação continua
+        # existindo para a ordenação por relevância
+        return queryset.none().annotate(search_rank=Value(0.0, output_field=FloatField()))
+
+    if not is_search_index_supported():
+        # Sem FTS5 (outros bancos), cai para uma busca simples
+        condition = Q()
+        for term in re.findall(r'\w+', text):
+            condition &= Q(title__icontains=term) | Q(author__icontains=term) | Q(description__icontains=term)
+        return queryset.filter(condition).annotate(
+            search_rank=RawSQL('0', (), output_field=FloatField())
+        )
+
+    weights = ', '.join(str(weight) for weight in FTS_WEIGHTS)
+    return queryset.filter(search_index__document__match=match).annotate(
+        search_rank=RawSQL(f'bm25("{FTS_TABLE}", {weights})', (), output_field=FloatField())
+    )
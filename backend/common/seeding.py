@@ -0,0 +1,238 @@
+import random
+from datetime import date, timedelta
+from itertools import accumulate
+
+from django.contrib.auth.hashers import make_password
+from django.db import connections, transaction
+from django.utils import timezone
+
+from . import catalog_cache
+from .models import Address, Book, BookRequest, PickupPoint, User
+
+
+DEFAULT_PASSWORD = 'senha123'
+
+FIRST_NAMES = (
+    'Ana', 'Bruno', 'Carla', 'Daniel', 'Eduarda', 'Felipe', 'Gabriela', 'Heitor', 'Isabela',
+    'João', 'Larissa', 'Lucas', 'Mariana', 'Mateus', 'Natália', 'Pedro', 'Rafaela', 'Renata',
+    'Samuel', 'Tatiane', 'Vinícius', 'Yasmin',
+)
+LAST_NAMES = (
+    'Almeida', 'Barbosa', 'Carvalho', 'Costa', 'Ferreira', 'Gomes', 'Lima', 'Martins',
+    'Oliveira', 'Pereira', 'Ribeiro', 'Rodrigues', 'Santos', 'Silva', 'Souza',
+)
+CITIES = (
+    ('São Paulo', 'SP'), ('Campinas', 'SP'), ('Bauru', 'SP'), ('Rio de Janeiro', 'RJ'),
+    ('Belo Horizonte', 'MG'), ('Curitiba', 'PR'), ('Porto Alegre', 'RS'), ('Salvador', 'BA'),
+    ('Recife', 'PE'), ('Fortaleza', 'CE'), ('Goiânia', 'GO'), ('Belém', 'PA'),
+)
+# Centro aproximado de cada cidade; os pontos de coleta ficam espalhados em volta
+CITY_COORDINATES = {
+    'São Paulo': (-23.55, -46.63), 'Campinas': (-22.91, -47.06), 'Bauru': (-22.31, -49.06),
+    'Rio de Janeiro': (-22.91, -43.17), 'Belo Horizonte': (-19.92, -43.94), 'Curitiba': (-25.43, -49.27),
+    'Porto Alegre': (-30.03, -51.23), 'Salvador': (-12.97, -38.50), 'Recife': (-8.05, -34.88),
+    'Fortaleza': (-3.73, -38.52), 'Goiânia': (-16.68, -49.25), 'Belém': (-1.46, -48.50),
+}
+WORDS = (
+    'amor', 'aventura', 'bruxa', 'caminho', 'cidade', 'coração', 'dragão', 'escola', 'estrela',
+    'floresta', 'guerra', 'história', 'ilha', 'jardim', 'lenda', 'luz', 'mar', 'memória',
+    'montanha', 'noite', 'oceano', 'princesa', 'reino', 'rio', 'segredo', 'sombra', 'tempo',
+    'terra', 'verão', 'viagem', 'vento', 'vida',
+)
+
+# Distribuições aproximadas de um acervo de doações
+CATEGORY_WEIGHTS = {
+    'romance': 25, 'fantasy': 22, 'non_fiction': 18, 'adventure': 15,
+    'science_fiction': 12, 'horror': 8,
+}
+AGE_WEIGHTS = {
+    'all_ages': 35, '10_and_up': 20, '13_and_up': 20, '16_and_up': 12, '18_and_up': 13,
+}
+# Destino de cada livro: sem pedidos, com um pedido cancelado no histórico
+# ou com um pedido em cada etapa do fluxo -> (status do livro, status do pedido)
+BOOK_FATES = {
+    'available': (60, 'available', None),
+    'cancelled': (12, 'available', 'cancelled'),
+    'pending': (4, 'requested', 'pending'),
+    'awaiting_pickup': (2, 'unavailable', 'awaiting_pickup'),
+    'delivered': (22, 'unavailable', 'delivered'),
+}
+TEXT_POOL_SIZE = 20000
+
+
+def _batches(total, batch_size):
+    for start in range(0, total, batch_size):
+        yield start, min(batch_size, total - start)
+
+
+def drop_triggers(using='default'):
+    """
+    Remove os gatilhos da busca, das facetas, dos resumos e do índice
+    geográfico. Numa carga grande é bem mais rápido reconstruir tudo de uma
+    vez no final do que atualizar a cada linha inserida.
+    """
+    from . import facets, geo, search, summaries
+
+    # Só os gatilhos que install_database_objects recria no final
+    names = (*search._TRIGGERS, *facets._TRIGGER_NAMES, *summaries._TRIGGER_NAMES, *geo._TRIGGERS)
+    with connections[using].cursor() as cursor:
+        for name in names:
+            cursor.execute(f'DROP TRIGGER IF EXISTS "{name}"')
+
+
+def _next_id(model, using):
+    return (model.objects.using(using).order_by('-pk').values_list('pk', flat=True).first() or 0) + 1
+
+
+def _insert_rows(model, fields, rows, using='default'):
+    """
+    INSERT direto com executemany, para as tabelas grandes. O bulk_create
+    prepara cada valor campo a campo e instancia um modelo por linha, o que
+    domina o tempo de uma carga de milhões de linhas; aqui os valores já vêm
+    no formato do banco.
+    """
+    connection = connections[using]
+    quote = connection.ops.quote_name
+    columns = ', '.join(quote(model._meta.get_field(name).column) for name in fields)
+    placeholders = ', '.join(['%s'] * len(fields))
+    with connection.cursor() as cursor:
+        cursor.executemany(
+            f"INSERT INTO {quote(model._meta.db_table)} ({columns}) VALUES ({placeholders})", rows
+        )
+
+
+def seed_users(rng, count, password_hash, batch_size, using='default'):
+    # Ids e e-mails a partir do maior id atual, para poder rodar o comando de novo
+    first_id = _next_id(User, using)
+    now = connections[using].ops.adapt_datetimefield_value(timezone.now())
+    birth_start = date(1950, 1, 1)
+    cities = [city for city, _ in CITIES]
+    for start, size in _batches(count, batch_size):
+        ids = range(first_id + start, first_id + start + size)
+        _insert_rows(User, (
+            'id', 'name', 'email', 'password', 'birth_date', 'phone',
+            'is_active', 'is_staff', 'is_superuser', 'updated_at',
+        ), [
+            (
+                user_id, f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}", f"usuario{user_id}@exemplo.com",
+                password_hash, (birth_start + timedelta(days=rng.randrange(20000))).isoformat(),
+                f"{rng.randint(11, 99)}9{rng.randrange(10 ** 8):08d}", True, False, False, now,
+            )
+            for user_id in ids
+        ], using)
+        _insert_rows(Address, ('user', 'street', 'number', 'city', 'zip'), [
+            (
+                user_id, f"Rua {rng.choice(LAST_NAMES)}", str(rng.randint(1, 3000)),
+                rng.choice(cities), f"{rng.randrange(10 ** 8):08d}",
+            )
+            for user_id in ids
+        ], using)
+
+
+def seed_pickup_points(rng, count, using='default'):
+    points = []
+    for i in range(count):
+        city, state = rng.choice(CITIES)
+        lat, lng = CITY_COORDINATES[city]
+        points.append(PickupPoint(
+            name=f"Ponto de Coleta {i + 1}", street=f"Avenida {rng.choice(LAST_NAMES)}",
+            number=str(rng.randint(1, 3000)), city=city, state=state, zip=f"{rng.randrange(10 ** 8):08d}",
+            latitude=round(lat + rng.uniform(-0.15, 0.15), 6), longitude=round(lng + rng.uniform(-0.15, 0.15), 6),
+        ))
+    PickupPoint.objects.using(using).bulk_create(points, batch_size=1000)
+
+
+def seed_books(rng, count, batch_size, using='default'):
+    """
+    Livros e as solicitações correspondentes ao destino sorteado para cada um.
+    Poucos doadores concentram muitos livros (distribuição de cauda longa).
+    """
+    user_ids = list(User.objects.using(using).filter(is_active=True).values_list('id', flat=True))
+    pickup_point_ids = list(PickupPoint.objects.using(using).values_list('id', flat=True))
+    if len(user_ids) < 2 or not pickup_point_ids:
+        raise ValueError("São necessários ao menos dois usuários e um ponto de coleta.")
+
+    donor_weights = list(accumulate(1 / (rank + 1) ** 0.8 for rank in range(len(user_ids))))
+    rng.shuffle(user_ids)
+    categories, category_weights = zip(*CATEGORY_WEIGHTS.items())
+    ages, age_weights = zip(*AGE_WEIGHTS.items())
+    fates = list(BOOK_FATES)
+    fate_weights = [weight for weight, _, _ in BOOK_FATES.values()]
+    # Textos sorteados uma vez e combinados livro a livro: variedade suficiente
+    # para a busca sem gerar frases aleatórias a cada linha
+    titles = [' '.join(rng.sample(WORDS, rng.randint(2, 4))).capitalize() for _ in range(TEXT_POOL_SIZE)]
+    authors = [f"{first} {last}" for first in FIRST_NAMES for last in LAST_NAMES]
+    descriptions = [' '.join(rng.choices(WORDS, k=rng.randint(8, 30))) for _ in range(TEXT_POOL_SIZE)]
+
+    now = connections[using].ops.adapt_datetimefield_value(timezone.now())
+    next_book_id = _next_id(Book, using)
+    next_request_id = _next_id(BookRequest, using)
+    created_requests = 0
+    for _, size in _batches(count, batch_size):
+        books, requests = [], []
+        for owner, fate, category, age, title, author, description, pickup_point_id in zip(
+            rng.choices(user_ids, cum_weights=donor_weights, k=size),
+            rng.choices(fates, weights=fate_weights, k=size),
+            rng.choices(categories, weights=category_weights, k=size),
+            rng.choices(ages, weights=age_weights, k=size),
+            rng.choices(titles, k=size),
+            rng.choices(authors, k=size),
+            rng.choices(descriptions, k=size),
+            rng.choices(pickup_point_ids, k=size),
+        ):
+            _, book_status, request_status = BOOK_FATES[fate]
+            book_request_id = None
+            if request_status is not None:
+                index = rng.randrange(len(user_ids))
+                if user_ids[index] == owner:
+                    index = (index + 1) % len(user_ids)
+                requests.append((next_request_id, next_book_id, user_ids[index], request_status, now))
+                # Livros com pedido em aberto apontam para ele, como no fluxo da API
+                if request_status in ('pending', 'awaiting_pickup'):
+                    book_request_id = next_request_id
+                next_request_id += 1
+            books.append((
+                next_book_id, title, author, description, category, age,
+                book_status, owner, book_request_id, pickup_point_id, now,
+            ))
+            next_book_id += 1
+
+        # As chaves estrangeiras são verificadas só no commit, então a ordem
+        # entre livros e pedidos não importa
+        _insert_rows(Book, (
+            'id', 'title', 'author', 'description', 'category', 'classification',
+            'status', 'user', 'book_request', 'pickup_point', 'updated_at',
+        ), books, using)
+        _insert_rows(BookRequest, ('id', 'book', 'user', 'status', 'updated_at'), requests, using)
+        created_requests += len(requests)
+    return created_requests
+
+
+def seed(users=1000, pickup_points=50, books=10000, seed=0, batch_size=5000,
+         password=DEFAULT_PASSWORD, using='default', log=None):
+    """
+    Gera dados sintéticos com inserções em lote. A senha é calculada uma
+    única vez e compartilhada por todos os usuários; a semente torna a carga
+    reproduzível. Devolve a quantidade de linhas criadas por tabela.
+    """
+    from .apps import install_database_objects
+
+    log = log or (lambda message: None)
+    rng = random.Random(seed)
+    password_hash = make_password(password)
+
+    with transaction.atomic(using=using):
+        if connections[using].vendor == 'sqlite':
+            drop_triggers(using)
+        log(f"Criando {users} usuários...")
+        seed_users(rng, users, password_hash, batch_size, using)
+        log(f"Criando {pickup_points} pontos de coleta...")
+        seed_pickup_points(rng, pickup_points, using)
+        log(f"Criando {books} livros e as solicitações...")
+        requests = seed_books(rng, books, batch_size, using)
+        log("Reconstruindo índices de busca e geográfico, facetas e resumos...")
+        install_database_objects(sender=None, using=using)
+        # As inserções em SQL direto não disparam os sinais do cache
+        catalog_cache.invalidate_books()
+
+    return {'users': users, 'pickup_points': pickup_points, 'books': books, 'book_requests': requests}
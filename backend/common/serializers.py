@@ -1,7 +1,7 @@
 from rest_framework import serializers
 from datetime import datetime
 from django.utils.translation import gettext as _
-from .models import User, Book, BookRequest, Address, PickupPoint
+from .models import User, Book, BookRequest, Address, PickupPoint, UserSummary
 from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
 from rest_framework.exceptions import ValidationError
 
@@ -18,17 +18,21 @@ class UserSerializer(serializers.ModelSerializer):
         extra_kwargs = {
             'password': {'write_only': True},
         }
+        # Relação lida em get_address
+        eager_related = ['address']
 
     def get_address(self, obj):
-        address = Address.objects.filter(user=obj).first()
-        if address:
-            return {
-                'street': address.street,
-                'number': address.number,
-                'city': address.city,
-                'zip': address.zip,
-            }
-        return None
+        # Lido da relação já carregada (select_related via Meta.eager_related)
+        try:
+            address = obj.address
+        except Address.DoesNotExist:
+            return None
+        return {
+            'street': address.street,
+            'number': address.number,
+            'city': address.city,
+            'zip': address.zip,
+        }
 
     # Validação da senha - pelo menos 6 caracteres
     def validate_password(self, value):
@@ -112,13 +116,16 @@ class UserSerializer(serializers.ModelSerializer):
             'zip': validated_data.pop('zip', None),
         }
 
-        # Atualizar os campos do usuário
+        # Atualizar apenas as colunas enviadas
         password = validated_data.pop('password', None)
         for attr, value in validated_data.items():
             setattr(instance, attr, value)
+        update_fields = list(validated_data)
         if password:
             instance.set_password(password)
-        instance.save()
+            update_fields.append('password')
+        if update_fields:
+            instance.save(update_fields=[*update_fields, 'updated_at'])
 
         # Atualizar os campos do endereço, se fornecidos
         if any(address_data.values()):
@@ -127,18 +134,39 @@ class UserSerializer(serializers.ModelSerializer):
         return instance
 
     def update_address(self, instance, address_data):
-        # Obter ou criar o endereço associado ao usuário
-        address, _ = Address.objects.get_or_create(user=instance)
-        for attr, value in address_data.items():
-            if value is not None:  # Atualizar apenas os campos fornecidos
-                setattr(address, attr, value)
-        address.save()
+        changed = {attr: value for attr, value in address_data.items() if value is not None}
+        try:
+            address = instance.address
+        except Address.DoesNotExist:
+            # Usuário sem endereço: cria com os campos fornecidos
+            Address.objects.create(user=instance, **changed)
+            return
+        # Atualizar apenas os campos fornecidos
+        for attr, value in changed.items():
+            setattr(address, attr, value)
+        address.save(update_fields=list(changed))
+
+#Login: o token leva nome e is_staff, lidos pela autenticação sem consultar o banco
+class UserTokenObtainPairSerializer(TokenObtainPairSerializer):
+    @classmethod
+    def get_token(cls, user):
+        token = super().get_token(user)
+        token['name'] = user.name
+        token['is_staff'] = user.is_staff
+        return token
+
+#Resumo do painel do usuário
+class UserSummarySerializer(serializers.ModelSerializer):
+    class Meta:
+        model = UserSummary
+        exclude = ['user']
 
 #Ponto de Coleta
 class PickupPointSerializer(serializers.ModelSerializer):
     class Meta:
         model = PickupPoint
-        fields = '__all__'
+        # updated_at é interno (versões das ETags), fora das respostas
+        fields = ['id', 'name', 'street', 'number', 'city', 'state', 'zip', 'latitude', 'longitude']
 
 #Solicitação de Livro
 class BookDonorSerializer(serializers.ModelSerializer):
@@ -164,16 +192,18 @@ class BookRequestSerializer(serializers.ModelSerializer):
         fields = ['id', 'book', 'book_id', 'requester_name', 'pickup_point', 'status']
         read_only_fields = ['user', 'id', 'book', 'requester_name', 'status']
 
+    def get_fields(self):
+        fields = super().get_fields()
+        if self.instance is not None:
+            # O livro é escolhido só na criação da solicitação
+            fields['book_id'].read_only = True
+        return fields
+
     def create(self, validated_data):
         validated_data['book'] = validated_data.pop('book_id')
-        validated_data['user'] = self.context['request'].user
+        validated_data['user_id'] = self.context['request'].user.id
         return super().create(validated_data)
 
-    def to_representation(self, instance):
-        rep = super().to_representation(instance)
-        rep.pop('book_id', None)
-        return rep
-
 class SimplifiedBookRequestSerializer(serializers.ModelSerializer):
     requester_name = serializers.CharField(source='user.name', read_only=True)
 
@@ -198,6 +228,8 @@ class BookSerializer(serializers.ModelSerializer):
             'id', 'title', 'author', 'description', 'category', 'classification',
             'pickup_point', 'pickup_point_id', 'status', 'user', 'user_id', 'user_email', 'book_request'
         ]
+        # Relações lidas em get_book_request
+        eager_related = ['book_request__user']
 
     def get_book_request(self, obj):
         # Retorna informações da solicitação associada, se houver
@@ -209,3 +241,21 @@ class BookSerializer(serializers.ModelSerializer):
                 'status': book_request.status
             }
         return None
+
+class CatalogBookSerializer(BookSerializer):
+    """
+    Livro no formato normalizado do catálogo (?shape=normalized): o ponto de
+    coleta e o doador vão só como id, e a listagem os envia uma única vez
+    em tabelas à parte (ver CatalogViewSet).
+    """
+    pickup_point = None
+    user = None
+    user_email = None
+    pickup_point_id = serializers.IntegerField(read_only=True)
+    user_id = serializers.IntegerField(read_only=True)
+
+    class Meta(BookSerializer.Meta):
+        fields = [
+            'id', 'title', 'author', 'description', 'category', 'classification',
+            'pickup_point_id', 'status', 'user_id', 'book_request'
+        ]
@@ -0,0 +1,132 @@
+from rest_framework import serializers
+
+from .eager_loading import get_load_only
+
+
+# Campos sob demanda nas leituras (?fields= e ?expand=). Os campos não
+# pedidos saem do serializer antes da serialização, e o mesmo serializer
+# reduzido define as relações carregadas (select_related) e as colunas lidas
+# do banco (only()).
+#
+#   ?fields=id,title,author                 só esses campos
+#   ?fields=id,pickup_point.city            subcampos de objetos aninhados
+#   ?fields=id,title&expand=pickup_point    objeto aninhado completo
+#
+# Sem ?fields=, a resposta é a completa de sempre (e ?expand= não muda nada).
+
+FIELDS_PARAM = 'fields'
+EXPAND_PARAM = 'expand'
+
+
+def _split(value):
+    return [path for path in (part.strip() for part in value.split(',')) if path]
+
+
+def _add_path(tree, path):
+    """Acrescenta "a.b.c" à árvore de campos; None marca um campo inteiro."""
+    *parents, name = path.split('.')
+    for parent in parents:
+        if tree.get(parent, {}) is None:
+            return
+        tree = tree.setdefault(parent, {})
+    tree[name] = None
+
+
+def parse_sparse_fields(params):
+    """
+    Árvore de campos pedidos em ?fields= e ?expand= (ex.:
+    {'id': None, 'pickup_point': {'city': None}}), ou None se ?fields= não
+    foi informado.
+    """
+    fields = params.get(FIELDS_PARAM)
+    if not fields:
+        return None
+    tree = {}
+    for path in _split(fields) + _split(params.get(EXPAND_PARAM, '')):
+        _add_path(tree, path)
+    return tree
+
+
+def _nested(field):
+    field = field.child if isinstance(field, serializers.ListSerializer) else field
+    return field if isinstance(field, serializers.BaseSerializer) else None
+
+
+def prune_fields(serializer, tree, prefix=''):
+    """Remove do serializer (e dos aninhados) os campos de leitura fora da árvore."""
+    readable = [name for name, field in serializer.fields.items() if not field.write_only]
+    unknown = [name for name in tree if name not in readable]
+    if unknown:
+        raise serializers.ValidationError({
+            FIELDS_PARAM: f"Campos inválidos: {', '.join(prefix + name for name in unknown)}. "
+                          f"Use: {', '.join(prefix + name for name in readable)}."
+        })
+
+    for name in readable:
+        if name not in tree:
+            del serializer.fields[name]
+    for name, subtree in tree.items():
+        if subtree is None:
+            continue
+        nested = _nested(serializer.fields[name])
+        if nested is None:
+            raise serializers.ValidationError({FIELDS_PARAM: f"{prefix}{name} não tem subcampos."})
+        prune_fields(nested, subtree, f'{prefix}{name}.')
+
+
+def check_expand(serializer, params):
+    """Cada caminho de ?expand= deve apontar para um objeto aninhado."""
+    for path in _split(params.get(EXPAND_PARAM, '')):
+        field = serializer
+        for name in path.split('.'):
+            field = _nested(field)
+            field = field.fields.get(name) if field is not None else None
+            if field is None:
+                break
+        if field is None or _nested(field) is None:
+            raise serializers.ValidationError({EXPAND_PARAM: f"{path} não é um objeto aninhado."})
+
+
+class SparseFieldsMixin:
+    """
+    Mixin para viewsets com ?fields= e ?expand= nas leituras (list e
+    retrieve). Deve vir antes do EagerLoadingMixin, para que o plano de
+    carregamento seja o do serializer reduzido.
+    """
+    sparse_fields_actions = ('list', 'retrieve')
+
+    def get_sparse_fields(self):
+        if self.action not in self.sparse_fields_actions:
+            return None
+        return parse_sparse_fields(self.request.query_params)
+
+    def get_serializer(self, *args, **kwargs):
+        serializer = super().get_serializer(*args, **kwargs)
+        tree = self.get_sparse_fields()
+        if tree is not None:
+            # Com many=True, os campos ficam no serializer de cada item
+            item_serializer = getattr(serializer, 'child', serializer)
+            check_expand(item_serializer, self.request.query_params)
+            prune_fields(item_serializer, tree)
+        return serializer
+
+    def get_eager_serializer(self):
+        if self.get_sparse_fields() is None:
+            return super().get_eager_serializer()
+        return self.get_serializer()
+
+    def filter_queryset(self, queryset):
+        queryset = super().filter_queryset(queryset)
+        if self.get_sparse_fields() is None:
+            return queryset
+
+        columns = get_load_only(self.get_serializer())
+        if columns is None:
+            return queryset
+        # Colunas da ordenação da paginação (o cursor é lido do último item)
+        model = queryset.model
+        for name in getattr(self, 'pagination_ordering', None) or ():
+            name = name.lstrip('-')
+            if any(field.name == name for field in model._meta.concrete_fields):
+                columns.add(name)
+        return queryset.only(*columns)
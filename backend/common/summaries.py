@@ -0,0 +1,161 @@
+from collections import defaultdict
+
+from django.db import connection, transaction
+from django.db.models import Count
+
+from .models import Book, BookRequest, User, UserSummary
+
+
+# Status do livro -> contador do dono
+BOOK_COLUMNS = {
+    'available': 'books_available',
+    'requested': 'books_requested',
+    'unavailable': 'books_unavailable',
+}
+
+# Status da solicitação -> contador do doador (dono do livro)
+DONOR_COLUMNS = {
+    'pending': 'incoming_pending',
+    'awaiting_pickup': 'incoming_awaiting_pickup',
+    'delivered': 'books_donated',
+}
+
+# Status da solicitação -> contador do solicitante
+REQUESTER_COLUMNS = {
+    'pending': 'outgoing_pending',
+    'awaiting_pickup': 'outgoing_awaiting_pickup',
+    'delivered': 'books_received',
+}
+
+# Assim como as facetas do catálogo, os contadores são mantidos por gatilhos:
+# toda escrita em livros e solicitações (workflow, serializers, update(),
+# bulk_create, admin...) ajusta o resumo na mesma transação. Os gatilhos são
+# reinstalados após cada migrate.
+_TRIGGER_NAMES = (
+    'common_usersummary_user_ai', 'common_usersummary_user_ad',
+    'common_usersummary_book_ai', 'common_usersummary_book_ad', 'common_usersummary_book_au',
+    'common_usersummary_request_ai', 'common_usersummary_request_ad', 'common_usersummary_request_au',
+)
+
+
+def _adjust(user, status, columns, delta):
+    return '\n'.join(
+        f"INSERT INTO {{summary}}(user_id, {column}) SELECT {user}, {delta} "
+        f"WHERE {status} = '{value}' AND {user} IS NOT NULL "
+        f"ON CONFLICT(user_id) DO UPDATE SET {column} = {column} + {delta};"
+        for value, column in columns.items()
+    )
+
+
+def _book_owner(row):
+    return f"(SELECT user_id FROM {{book}} WHERE id = {row}.book_id)"
+
+
+def _request_adjust(row, delta):
+    return '\n'.join([
+        _adjust(f'{row}.user_id', f'{row}.status', REQUESTER_COLUMNS, delta),
+        _adjust(_book_owner(row), f'{row}.status', DONOR_COLUMNS, delta),
+    ])
+
+
+def _triggers():
+    names = iter(_TRIGGER_NAMES)
+    triggers = (
+        f"CREATE TRIGGER IF NOT EXISTS {next(names)} AFTER INSERT ON {{user}} BEGIN\n"
+        f"INSERT INTO {{summary}}(user_id) VALUES (new.id) ON CONFLICT(user_id) DO NOTHING;\nEND",
+        f"CREATE TRIGGER IF NOT EXISTS {next(names)} AFTER DELETE ON {{user}} BEGIN\n"
+        f"DELETE FROM {{summary}} WHERE user_id = old.id;\nEND",
+
+        f"CREATE TRIGGER IF NOT EXISTS {next(names)} AFTER INSERT ON {{book}} BEGIN\n"
+        f"{_adjust('new.user_id', 'new.status', BOOK_COLUMNS, 1)}\nEND",
+        f"CREATE TRIGGER IF NOT EXISTS {next(names)} AFTER DELETE ON {{book}} BEGIN\n"
+        f"{_adjust('old.user_id', 'old.status', BOOK_COLUMNS, -1)}\nEND",
+        f"CREATE TRIGGER IF NOT EXISTS {next(names)} AFTER UPDATE OF status, user_id ON {{book}} "
+        f"WHEN old.status IS NOT new.status OR old.user_id IS NOT new.user_id BEGIN\n"
+        f"{_adjust('old.user_id', 'old.status', BOOK_COLUMNS, -1)}\n"
+        f"{_adjust('new.user_id', 'new.status', BOOK_COLUMNS, 1)}\nEND",
+
+        f"CREATE TRIGGER IF NOT EXISTS {next(names)} AFTER INSERT ON {{request}} BEGIN\n"
+        f"{_request_adjust('new', 1)}\nEND",
+        f"CREATE TRIGGER IF NOT EXISTS {next(names)} AFTER DELETE ON {{request}} BEGIN\n"
+        f"{_request_adjust('old', -1)}\nEND",
+        f"CREATE TRIGGER IF NOT EXISTS {next(names)} AFTER UPDATE OF status, user_id, book_id ON {{request}} "
+        f"WHEN old.status IS NOT new.status OR old.user_id IS NOT new.user_id "
+        f"OR old.book_id IS NOT new.book_id BEGIN\n"
+        f"{_request_adjust('old', -1)}\n{_request_adjust('new', 1)}\nEND",
+    )
+    tables = {
+        'summary': UserSummary._meta.db_table,
+        'user': User._meta.db_table,
+        'book': Book._meta.db_table,
+        'request': BookRequest._meta.db_table,
+    }
+    return [sql.format(**tables) for sql in triggers]
+
+
+def install_summary_triggers(conn=None):
+    """
+    Cria os gatilhos dos contadores, caso não existam. Se algum precisou ser
+    (re)criado, os resumos são recalculados.
+    """
+    conn = conn or connection
+    if conn.vendor != 'sqlite':
+        return
+
+    with conn.cursor() as cursor:
+        cursor.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'trigger' AND name IN (%s)"
+            % ', '.join(['%s'] * len(_TRIGGER_NAMES)),
+            list(_TRIGGER_NAMES),
+        )
+        if len(cursor.fetchall()) == len(_TRIGGER_NAMES):
+            return
+        for sql in _triggers():
+            cursor.execute(sql)
+    rebuild_user_summaries(using=conn.alias)
+
+
+def _compute_summaries(using):
+    counters = defaultdict(dict)
+    groups = (
+        (Book.objects.using(using).values('user_id', 'status'), 'user_id', BOOK_COLUMNS),
+        (BookRequest.objects.using(using).values('user_id', 'status'), 'user_id', REQUESTER_COLUMNS),
+        (BookRequest.objects.using(using).values('book__user_id', 'status'), 'book__user_id', DONOR_COLUMNS),
+    )
+    for queryset, user_field, columns in groups:
+        for row in queryset.annotate(total=Count('id')).order_by():
+            column = columns.get(row['status'])
+            if column:
+                counters[row[user_field]][column] = row['total']
+
+    fields = [*BOOK_COLUMNS.values(), *DONOR_COLUMNS.values(), *REQUESTER_COLUMNS.values()]
+    return {
+        user_id: UserSummary(user_id=user_id, **{field: counters[user_id].get(field, 0) for field in fields})
+        for user_id in User.objects.using(using).values_list('id', flat=True)
+    }, fields
+
+
+def rebuild_user_summaries(using='default'):
+    """
+    Recalcula os resumos de todos os usuários a partir dos livros e
+    solicitações. Devolve quantos resumos estavam divergentes (incluindo os
+    ausentes e os de usuários que não existem mais).
+    """
+    with transaction.atomic(using=using):
+        expected, fields = _compute_summaries(using)
+        current = {
+            row['user_id']: row
+            for row in UserSummary.objects.using(using).values('user_id', *fields)
+        }
+        repaired = len(set(current) - set(expected)) + sum(
+            1 for user_id, summary in expected.items()
+            if current.get(user_id) != {'user_id': user_id, **{field: getattr(summary, field) for field in fields}}
+        )
+        UserSummary.objects.using(using).all().delete()
+        UserSummary.objects.using(using).bulk_create(expected.values(), batch_size=1000)
+    return repaired
+
+
+def user_summary(user_id):
+    """Resumo do usuário, com uma busca pela chave primária."""
+    return UserSummary.objects.filter(pk=user_id).first() or UserSummary(user_id=user_id)
@@ -0,0 +1,1109 @@
+import codecs
+import csv
+import io
+import json
+import random
+import threading
+import zlib
+from datetime import datetime, timezone as dt_timezone
+from types import SimpleNamespace
+from unittest import mock
+
+from asgiref.sync import async_to_sync
+from django.core.cache import caches
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection, connections, transaction
+from django.test import AsyncClient, TestCase, TransactionTestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework import serializers
+from rest_framework.exceptions import ParseError
+from rest_framework.parsers import JSONParser
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIClient, APIRequestFactory
+from rest_framework_simplejwt.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.tokens import AccessToken
+
+from . import catalog_cache, exports, workflow
+from .apps import install_database_objects
+from .authentication import StatelessJWTAuthentication
+from .database import ReadReplicaRouter
+from .eager_loading import eager_load
+from .facets import FACET_COLUMNS, catalog_facets
+from .fast_serialization import serialize_many
+from .geo import haversine_km
+from .management.commands.explain_queries import hot_queries
+from .models import Address, Book, BookRequest, PickupPoint, User, UserSummary
+from .pagination import KeysetPagination
+from .renderers import FastJSONParser, dumps
+from .seeding import drop_triggers
+from .serializers import (
+    BookRequestSerializer, BookSerializer, CatalogBookSerializer, UserSerializer, UserTokenObtainPairSerializer,
+)
+from .summaries import rebuild_user_summaries
+
+
+def create_user(email, name="Usuário"):
+    return User.objects.create_user(email=email, name=name, password='senha123')
+
+
+def create_pickup_point(name="Ponto de Coleta", **kwargs):
+    return PickupPoint.objects.create(
+        name=name, street="Rua A", number="1", city="Bauru", state="SP", zip="17000000", **kwargs,
+    )
+
+
+def create_books(user, pickup_point, count, **kwargs):
+    fields = {
+        'author': "Autor", 'description': "Descrição", 'category': 'fantasy', 'classification': 'all_ages',
+        **kwargs,
+    }
+    return Book.objects.bulk_create([
+        Book(title=f"Livro {i}", user=user, pickup_point=pickup_point, **fields) for i in range(count)
+    ])
+
+
+def create_requests(books, requester, status='pending'):
+    """Uma solicitação por livro, com o livro apontando para ela."""
+    requests = BookRequest.objects.bulk_create([
+        BookRequest(book=book, user=requester, status=status) for book in books
+    ])
+    for book, book_request in zip(books, requests):
+        book.book_request = book_request
+        book.status = 'requested' if status == 'pending' else 'unavailable'
+    Book.objects.bulk_update(books, ['book_request', 'status'])
+    return requests
+
+
+class APITestCase(TestCase):
+    def setUp(self):
+        for cache in caches.all():
+            cache.clear()
+        self.client = APIClient()
+
+    def get(self, url, user=None, **extra):
+        if user is not None:
+            self.client.force_authenticate(user)
+        return self.client.get(url, **extra)
+
+
+class ListQueryCountTests(APITestCase):
+    """
+    As listagens fazem o mesmo número de consultas com poucos ou muitos
+    itens na página (relações carregadas com select_related, sem N+1).
+    """
+    def setUp(self):
+        super().setUp()
+        self.donor = create_user('doador@exemplo.com', "Doador")
+        self.requester = create_user('solicitante@exemplo.com', "Solicitante")
+        self.pickup_points = [create_pickup_point(f"Ponto {i}") for i in range(3)]
+
+    def add_books(self, count, **kwargs):
+        books = []
+        for i in range(count):
+            books += create_books(self.donor, self.pickup_points[i % 3], 1, **kwargs)
+        return books
+
+    def assertListQueries(self, num, url, user=None, grow=None):
+        for size in (2, 15):
+            grow(size)
+            for cache in caches.all():
+                cache.clear()
+            with self.assertNumQueries(num):
+                response = self.get(url, user)
+            self.assertEqual(response.status_code, 200)
+            self.assertGreaterEqual(len(response.data['results']), size)
+
+    def test_catalog(self):
+        def grow(size):
+            self.add_books(size)
+            create_requests(self.add_books(size), self.requester, status='cancelled')
+            Book.objects.filter(status='unavailable').update(status='available')
+
+        # Versão do catálogo para a ETag (3), página com as relações e facetas
+        self.assertListQueries(5, '/api/catalog/', grow=grow)
+
+    def test_my_books(self):
+        def grow(size):
+            create_requests(self.add_books(size), self.requester)
+
+        self.assertListQueries(1, '/api/my-books/', self.donor, grow=grow)
+
+    def test_book_requests(self):
+        def grow(size):
+            create_requests(self.add_books(size), self.requester)
+
+        self.assertListQueries(1, '/api/book_requests/', self.requester, grow=grow)
+
+    def test_users_as_admin(self):
+        admin = create_user('admin@exemplo.com', "Admin")
+        admin.is_staff = True
+        admin.save()
+
+        def grow(size):
+            users = User.objects.bulk_create([
+                User(email=f'usuario{size}-{i}@exemplo.com', name="Usuário") for i in range(size)
+            ])
+            Address.objects.bulk_create([
+                Address(user=user, street="Rua B", number="2", city="Bauru", zip="17000000") for user in users
+            ])
+
+        # Usuários e endereços em uma única consulta
+        self.assertListQueries(1, '/api/users/', admin, grow=grow)
+
+    def test_donor_requests(self):
+        def grow(size):
+            create_requests(self.add_books(size), self.requester)
+
+        self.assertListQueries(1, '/api/donor-requests/', self.donor, grow=grow)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.get('/api/donor-requests/?mode=compact', self.donor)
+        self.assertEqual(len(queries), 1)
+        self.assertEqual(list(response.data['results'][0]), ['id', 'requester_name', 'status'])
+        # Só as colunas do formato compacto, sem as do livro e do ponto de coleta
+        self.assertNotIn('"common_pickuppoint"', queries[0]['sql'])
+        self.assertNotIn('"common_book"."title"', queries[0]['sql'])
+
+
+class UserUpdateTests(APITestCase):
+    """A edição grava só as colunas enviadas, sem sobrescrever as demais com valores antigos."""
+    def setUp(self):
+        super().setUp()
+        self.user = create_user('usuario@exemplo.com', "Usuário")
+        Address.objects.create(user=self.user, street="Rua A", number="1", city="Bauru", zip="17000000")
+
+    def test_only_sent_columns_are_written(self):
+        user = User.objects.select_related('address').get(pk=self.user.pk)
+        # Escritas concorrentes em outras colunas, depois de o usuário ser lido
+        User.objects.filter(pk=user.pk).update(phone='14999990000')
+        Address.objects.filter(user=user).update(street="Rua Nova")
+
+        serializer = UserSerializer(user, data={'name': "Novo Nome", 'city': "Marília"}, partial=True)
+        self.assertTrue(serializer.is_valid(), serializer.errors)
+        with CaptureQueriesContext(connection) as queries:
+            serializer.save()
+        updates = [query['sql'] for query in queries if query['sql'].startswith('UPDATE')]
+        self.assertEqual(len(updates), 2)
+        self.assertNotIn('"email"', updates[0])
+        self.assertNotIn('"street"', updates[1])
+
+        user = User.objects.select_related('address').get(pk=user.pk)
+        self.assertEqual((user.name, user.phone), ("Novo Nome", '14999990000'))
+        self.assertEqual((user.address.street, user.address.city), ("Rua Nova", "Marília"))
+
+    def test_password_change(self):
+        response = self.client.patch(
+            f'/api/users/{self.user.id}/', {'password': 'outrasenha'}, format='json',
+            **{'HTTP_AUTHORIZATION': f'Bearer {UserTokenObtainPairSerializer.get_token(self.user).access_token}'},
+        )
+        self.assertEqual(response.status_code, 200)
+        self.user.refresh_from_db()
+        self.assertTrue(self.user.check_password('outrasenha'))
+        self.assertEqual(self.user.address.city, "Bauru")
+
+
+class DonorRequestFilterTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.donor = create_user('doador@exemplo.com', "Doador")
+        requester = create_user('solicitante@exemplo.com', "Solicitante")
+        books = create_books(self.donor, create_pickup_point(), 6)
+        self.requests = {
+            status: create_requests(books[i * 2:i * 2 + 2], requester, status=status)
+            for i, status in enumerate(('pending', 'awaiting_pickup', 'delivered'))
+        }
+        # Pedido de outro doador: nunca aparece
+        create_requests(create_books(requester, create_pickup_point(), 1), self.donor)
+
+    def ids(self, query):
+        response = self.get(f'/api/donor-requests/?{query}', self.donor)
+        self.assertEqual(response.status_code, 200)
+        return {item['id'] for item in response.data['results']}
+
+    def test_status_filter(self):
+        def expected(*statuses):
+            return {book_request.id for status in statuses for book_request in self.requests[status]}
+
+        self.assertEqual(self.ids(''), expected('pending', 'awaiting_pickup', 'delivered'))
+        self.assertEqual(self.ids('status=pending'), expected('pending'))
+        self.assertEqual(self.ids('status=pending,awaiting_pickup'), expected('pending', 'awaiting_pickup'))
+        self.assertEqual(self.ids('status=delivered&mode=compact'), expected('delivered'))
+        self.assertEqual(self.ids('status=cancelled'), set())
+
+    def test_invalid_parameters(self):
+        for query in ('status=pending,requested', 'status=unknown', 'mode=tiny'):
+            response = self.get(f'/api/donor-requests/?{query}', self.donor)
+            self.assertEqual(response.status_code, 400)
+            self.assertIn(query.split('=')[0], response.data)
+
+
+class ExportTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        self.admin = create_user('admin@exemplo.com', "Admin")
+        self.admin.is_staff = True
+        self.admin.save()
+        donor = create_user('doador@exemplo.com', "Doador")
+        self.old_books = create_books(donor, create_pickup_point(), 3)
+        self.new_books = create_books(donor, create_pickup_point(), 2, category='horror')
+        Book.objects.filter(pk__in=[book.pk for book in self.old_books]).update(
+            updated_at=datetime(2024, 1, 1, tzinfo=dt_timezone.utc),
+        )
+
+    def export(self, url):
+        response = self.get(url, self.admin)
+        self.assertEqual(response.status_code, 200)
+        return response, b''.join(response.streaming_content).decode()
+
+    def test_admin_only(self):
+        self.assertEqual(self.client.get('/api/export/books/').status_code, 401)
+        self.assertEqual(self.get('/api/export/books/', create_user('leitor@exemplo.com')).status_code, 403)
+        self.assertEqual(self.get('/api/export/books/', self.admin).status_code, 200)
+
+    def test_ndjson(self):
+        response, content = self.export('/api/export/books/')
+        self.assertTrue(response['Content-Type'].startswith('application/x-ndjson'))
+        rows = [json.loads(line) for line in content.splitlines()]
+        self.assertEqual([row['id'] for row in rows], [book.id for book in self.old_books + self.new_books])
+        self.assertEqual(list(rows[0]), exports.EXPORTS['books'][1])
+        self.assertEqual(rows[-1]['category'], 'horror')
+
+    def test_csv(self):
+        response, content = self.export('/api/export/users/?output=csv')
+        self.assertEqual(response['Content-Disposition'], 'attachment; filename="users.csv"')
+        rows = list(csv.reader(io.StringIO(content)))
+        self.assertEqual(rows[0], exports.EXPORTS['users'][1])
+        self.assertEqual([row[2] for row in rows[1:]], ['admin@exemplo.com', 'doador@exemplo.com'])
+
+    def test_since(self):
+        _, content = self.export('/api/export/books/?since=2025-01-01')
+        self.assertEqual([json.loads(line)['id'] for line in content.splitlines()], [book.id for book in self.new_books])
+        _, content = self.export('/api/export/books/?since=2023-12-31T23:00:00Z&output=csv')
+        self.assertEqual(len(content.splitlines()), 6)
+
+    def test_invalid_parameters(self):
+        self.assertEqual(self.get('/api/export/books/?since=ontem', self.admin).status_code, 400)
+        self.assertEqual(self.get('/api/export/books/?output=xml', self.admin).status_code, 400)
+        self.assertEqual(self.get('/api/export/livros/', self.admin).status_code, 404)
+
+
+class SparseFieldsTests(APITestCase):
+    """?fields= reduz a resposta e também as colunas e os JOINs da consulta."""
+    def setUp(self):
+        super().setUp()
+        self.donor = create_user('doador@exemplo.com', "Doador")
+        self.requester = create_user('solicitante@exemplo.com', "Solicitante")
+        create_requests(create_books(self.donor, create_pickup_point(), 3), self.requester)
+
+    def get_sql(self, url, user):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.get(url, user)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(queries), 1)
+        return response.data['results'], queries[0]['sql']
+
+    def test_columns_and_joins(self):
+        results, sql = self.get_sql('/api/my-books/?fields=id,title', self.donor)
+        self.assertEqual(list(results[0]), ['id', 'title'])
+        self.assertIn('"common_book"."title"', sql)
+        self.assertNotIn('"common_book"."description"', sql)
+        self.assertNotIn('JOIN', sql)
+
+        results, sql = self.get_sql('/api/my-books/?fields=id,pickup_point.city', self.donor)
+        self.assertEqual(results[0]['pickup_point'], {'city': "Bauru"})
+        self.assertIn('JOIN "common_pickuppoint"', sql)
+        self.assertIn('"common_pickuppoint"."city"', sql)
+        self.assertNotIn('"common_pickuppoint"."street"', sql)
+        self.assertNotIn('"common_user"', sql)
+
+        results, sql = self.get_sql('/api/book_requests/?fields=id,status', self.requester)
+        self.assertEqual(list(results[0]), ['id', 'status'])
+        self.assertNotIn('JOIN', sql)
+
+        results, sql = self.get_sql('/api/book_requests/?fields=id&expand=pickup_point', self.requester)
+        self.assertEqual(list(results[0]), ['id', 'pickup_point'])
+        self.assertIn('"common_pickuppoint"."street"', sql)
+        self.assertNotIn('"common_book"."description"', sql)
+
+    def test_unknown_fields(self):
+        for url, param in (
+            ('/api/my-books/?fields=id,isbn', 'fields'),
+            ('/api/my-books/?fields=id,title.text', 'fields'),
+            ('/api/my-books/?fields=id,pickup_point.country', 'fields'),
+            ('/api/book_requests/?fields=id&expand=status', 'expand'),
+            ('/api/catalog/?fields=id,password', 'fields'),
+        ):
+            with self.subTest(url=url):
+                response = self.get(url, self.donor)
+                self.assertEqual(response.status_code, 400)
+                self.assertIn(param, response.data)
+
+
+class KeysetPaginationTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        donor = create_user('doador@exemplo.com', "Doador")
+        pickup_point = create_pickup_point()
+        for category in ('romance', 'fantasy', 'horror'):
+            create_books(donor, pickup_point, 5, category=category)
+
+    def paginate(self, ordering, url):
+        paginator = KeysetPagination()
+        request = Request(APIRequestFactory().get(url))
+        view = SimpleNamespace(pagination_ordering=ordering, page_size=4)
+        with CaptureQueriesContext(connection) as queries:
+            page = paginator.paginate_queryset(Book.objects.all(), request, view)
+        self.assertNotIn('OFFSET', queries[0]['sql'])
+        return [book.id for book in page], paginator.get_next_link(), paginator.get_previous_link()
+
+    def test_composite_ordering(self):
+        for ordering in (('category', 'id'), ('category', '-id'), ('-category', 'id')):
+            expected = list(Book.objects.order_by(*ordering).values_list('id', flat=True))
+            pages, url = [], '/api/catalog/'
+            while url:
+                ids, url, previous = self.paginate(ordering, url)
+                pages.append((ids, previous))
+            self.assertEqual([book_id for ids, _ in pages for book_id in ids], expected)
+
+            # Voltando da última página, a anterior é a mesma da ida
+            self.assertEqual(self.paginate(ordering, pages[-1][1])[0], pages[-2][0])
+
+    def test_invalid_cursor(self):
+        cursor = 'cD1bMV0%3D'  # p=[1]: só o id
+        self.assertEqual(self.get(f'/api/catalog/?cursor={cursor}').status_code, 200)
+        # Com busca, a ordenação é (search_rank, id) e o cursor precisa dos dois
+        self.assertEqual(self.get(f'/api/catalog/?q=livro&cursor={cursor}').status_code, 404)
+        self.assertEqual(self.get('/api/catalog/?cursor=cD14').status_code, 404)  # p=x
+
+
+class CatalogSearchTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        donor = create_user('doador@exemplo.com', "Doador")
+        pickup_point = create_pickup_point()
+        create_books(donor, pickup_point, 3)
+        create_books(donor, pickup_point, 1, author="Machado de Assis")
+
+    def test_search(self):
+        for url in ('/api/catalog/', '/api/async/catalog/'):
+            response = self.client.get(url, {'q': 'machado'})
+            self.assertEqual(response.status_code, 200)
+            self.assertEqual([book['author'] for book in response.json()['results']], ["Machado de Assis"])
+
+    def test_query_without_words(self):
+        for url in ('/api/catalog/', '/api/async/catalog/'):
+            for query in ('!!', ' ', '"*'):
+                response = self.client.get(url, {'q': query})
+                self.assertEqual(response.status_code, 200, (url, query))
+                self.assertEqual(response.json()['results'], [])
+
+
+class PickupPointPayloadTests(APITestCase):
+    fields = ['id', 'name', 'street', 'number', 'city', 'state', 'zip', 'latitude', 'longitude']
+
+    def test_internal_fields_are_not_exposed(self):
+        donor = create_user('doador@exemplo.com', "Doador")
+        create_books(donor, create_pickup_point(), 1)
+
+        pickup_point = self.get('/api/pickup-points/').data['results'][0]
+        self.assertEqual(list(pickup_point), self.fields)
+        book = self.get('/api/catalog/').data['results'][0]
+        self.assertEqual(list(book['pickup_point']), self.fields)
+
+
+class CatalogShapeTests(APITestCase):
+    def test_normalized_shape(self):
+        pickup_points = [create_pickup_point(f"Ponto {i}") for i in range(2)]
+        donors = [create_user(f'doador{i}@exemplo.com', f"Doador {i}") for i in range(2)]
+        for donor in donors:
+            for pickup_point in pickup_points:
+                create_books(donor, pickup_point, 3)
+
+        data = self.get('/api/catalog/?shape=normalized').json()
+        self.assertEqual(len(data['results']), 12)
+        for book in data['results']:
+            self.assertNotIn('pickup_point', book)
+            self.assertNotIn('user', book)
+            self.assertIn(str(book['pickup_point_id']), data['pickup_points'])
+            self.assertIn(str(book['user_id']), data['donors'])
+        self.assertEqual(sorted(data['pickup_points']), sorted(str(point.id) for point in pickup_points))
+        self.assertEqual(
+            data['donors'][str(donors[0].id)], {'id': donors[0].id, 'name': "Doador 0", 'email': 'doador0@exemplo.com'},
+        )
+
+        response = self.get('/api/catalog/?shape=tree')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('shape', response.data)
+
+
+class CompressionTests(APITestCase):
+    def setUp(self):
+        super().setUp()
+        # Um ponto de coleta cabe abaixo do limite; a página do catálogo, não
+        create_books(create_user('doador@exemplo.com', "Doador"), create_pickup_point(), 20)
+
+    def test_small_responses_are_not_compressed(self):
+        response = self.get('/api/pickup-points/', HTTP_ACCEPT_ENCODING='gzip')
+        self.assertLess(len(response.content), 1024)
+        self.assertFalse(response.has_header('Content-Encoding'))
+
+        response = self.get('/api/catalog/', HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+
+    def test_compressed_etag_is_weak(self):
+        response = self.get('/api/catalog/', HTTP_ACCEPT_ENCODING='gzip')
+        self.assertTrue(response['ETag'].startswith('W/"'))
+        response = self.get('/api/catalog/', HTTP_ACCEPT_ENCODING='gzip', HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
+
+    def test_brotli_only_for_anonymous_reads(self):
+        fake_brotli = SimpleNamespace(compress=lambda data, quality: zlib.compress(data))
+        token = UserTokenObtainPairSerializer.get_token(create_user('leitor@exemplo.com')).access_token
+        with mock.patch('config.middleware.brotli', fake_brotli):
+            response = self.get('/api/catalog/', HTTP_ACCEPT_ENCODING='br, gzip')
+            self.assertEqual(response['Content-Encoding'], 'br')
+            # Com credenciais, o gzip e seus bytes aleatórios contra o BREACH
+            response = self.get('/api/catalog/', HTTP_ACCEPT_ENCODING='br, gzip', HTTP_AUTHORIZATION=f'Bearer {token}')
+            self.assertEqual(response['Content-Encoding'], 'gzip')
+
+
+class CatalogFacetTests(APITestCase):
+    """Os contadores das facetas acompanham as escritas e os filtros usam os mesmos valores."""
+    def setUp(self):
+        super().setUp()
+        self.donor = create_user('doador@exemplo.com', "Doador")
+        self.pickup_points = [create_pickup_point(f"Ponto {i}") for i in range(2)]
+        self.books = (
+            create_books(self.donor, self.pickup_points[0], 3)
+            + create_books(self.donor, self.pickup_points[0], 2, category='horror', classification='18_and_up')
+            + create_books(self.donor, self.pickup_points[1], 4, category='romance')
+        )
+
+    def assertFacetsMatchBooks(self):
+        expected = {facet: {} for facet in FACET_COLUMNS}
+        for book in Book.objects.filter(status='available'):
+            for facet, column in FACET_COLUMNS.items():
+                value = str(getattr(book, column))
+                expected[facet][value] = expected[facet].get(value, 0) + 1
+        self.assertEqual(catalog_facets(), expected)
+        self.assertEqual(self.get('/api/catalog/').data['facets'], expected)
+
+    def test_counts_follow_writes(self):
+        self.assertFacetsMatchBooks()
+        self.assertEqual(catalog_facets()['category'], {'fantasy': 3, 'horror': 2, 'romance': 4})
+
+        requester = create_user('solicitante@exemplo.com')
+        with self.captureOnCommitCallbacks(execute=True):
+            workflow.request_book(self.books[0].id, requester.id)
+        self.assertFacetsMatchBooks()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.books[5].category = 'fantasy'
+            self.books[5].pickup_point = self.pickup_points[0]
+            self.books[5].save()
+        self.assertFacetsMatchBooks()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.books[3].delete()
+        self.assertFacetsMatchBooks()
+        self.assertEqual(catalog_facets()['category'], {'fantasy': 3, 'horror': 1, 'romance': 3})
+
+    def test_filters(self):
+        def ids(query):
+            response = self.get(f'/api/catalog/?{query}&page_size=100')
+            self.assertEqual(response.status_code, 200)
+            return {book['id'] for book in response.data['results']}
+
+        def expected(**filters):
+            return set(Book.objects.filter(**filters).values_list('id', flat=True))
+
+        self.assertEqual(ids('category=horror,romance'), expected(category__in=['horror', 'romance']))
+        self.assertEqual(ids('classification=18_and_up'), expected(classification='18_and_up'))
+        self.assertEqual(ids(f'pickup_point={self.pickup_points[1].id}'), expected(pickup_point=self.pickup_points[1]))
+        self.assertEqual(
+            ids(f'category=fantasy,horror&pickup_point={self.pickup_points[0].id},{self.pickup_points[1].id}'),
+            expected(category__in=['fantasy', 'horror']),
+        )
+        self.assertEqual(self.get('/api/catalog/?pickup_point=abc').status_code, 400)
+
+
+class GeoSearchTests(APITestCase):
+    """As buscas pela R*Tree devolvem o mesmo que a distância calculada ponto a ponto."""
+    origin = (-22.31, -49.06)
+
+    def setUp(self):
+        super().setUp()
+        rng = random.Random(0)
+        self.points = [
+            create_pickup_point(
+                f"Ponto {i}", latitude=self.origin[0] + rng.uniform(-1.5, 1.5),
+                longitude=self.origin[1] + rng.uniform(-1.5, 1.5),
+            )
+            for i in range(60)
+        ]
+        # Sem coordenadas: nunca aparece nas buscas
+        create_pickup_point("Sem localização")
+        donor = create_user('doador@exemplo.com', "Doador")
+        for point in self.points:
+            create_books(donor, point, 1)
+
+    def by_distance(self, lat, lng):
+        return sorted((haversine_km(lat, lng, p.latitude, p.longitude), p.id) for p in self.points)
+
+    def test_nearest_matches_brute_force(self):
+        for lat, lng in (self.origin, (-21.5, -48.2), (-23.9, -50.5)):
+            response = self.get(f'/api/pickup-points/nearest/?lat={lat}&lng={lng}&limit=7')
+            self.assertEqual(response.status_code, 200)
+            expected = self.by_distance(lat, lng)[:7]
+            self.assertEqual([point['id'] for point in response.data], [point_id for _, point_id in expected])
+            self.assertEqual([point['distance_km'] for point in response.data], [round(d, 3) for d, _ in expected])
+
+    def test_radius_filter(self):
+        lat, lng = self.origin
+        expected = {point_id for distance, point_id in self.by_distance(lat, lng) if distance <= 60}
+        self.assertTrue(0 < len(expected) < len(self.points))
+
+        response = self.get(f'/api/pickup-points/?lat={lat}&lng={lng}&radius_km=60&page_size=100')
+        self.assertEqual({point['id'] for point in response.data['results']}, expected)
+        response = self.get(f'/api/catalog/?lat={lat}&lng={lng}&radius_km=60&page_size=100')
+        self.assertEqual({book['pickup_point']['id'] for book in response.data['results']}, expected)
+
+    def test_invalid_parameters(self):
+        for url in (
+            '/api/pickup-points/?lat=abc&lng=-49&radius_km=10',
+            '/api/pickup-points/?lat=-22&radius_km=10',
+            '/api/pickup-points/?lat=95&lng=-49&radius_km=10',
+            '/api/pickup-points/?lat=-22&lng=-49',
+            '/api/pickup-points/?lat=-22&lng=-49&radius_km=0',
+            '/api/catalog/?lat=-22&lng=-190&radius_km=10',
+            '/api/pickup-points/nearest/',
+            '/api/pickup-points/nearest/?lat=-22&lng=-49&limit=abc',
+            '/api/pickup-points/nearest/?lat=-22&lng=-49&limit=0',
+        ):
+            with self.subTest(url=url):
+                self.assertEqual(self.get(url).status_code, 400)
+
+
+class CatalogCacheInvalidationTests(APITestCase):
+    """Escritas fora das views (admin, shell) também invalidam o cache do catálogo."""
+    def setUp(self):
+        super().setUp()
+        self.pickup_point = create_pickup_point()
+        self.book = create_books(create_user('doador@exemplo.com', "Doador"), self.pickup_point, 1)[0]
+
+    def assertRefreshed(self, url, change, read):
+        response = self.get(url)
+        self.assertEqual(response.status_code, 200)
+        with self.captureOnCommitCallbacks(execute=True):
+            change()
+        response = self.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 200)
+        return read(response.json())
+
+    def test_book_save(self):
+        def change():
+            self.book.title = "Novo título"
+            self.book.save()
+
+        for url, read in (
+            ('/api/catalog/', lambda data: data['results'][0]['title']),
+            (f'/api/catalog/{self.book.id}/', lambda data: data['title']),
+        ):
+            self.assertEqual(self.assertRefreshed(url, change, read), "Novo título")
+            self.book.title = "Livro 0"
+            self.book.save()
+
+    def test_book_delete(self):
+        results = self.assertRefreshed('/api/catalog/', self.book.delete, lambda data: data['results'])
+        self.assertEqual(results, [])
+
+    def test_pickup_point_save(self):
+        def change():
+            self.pickup_point.city = "Marília"
+            self.pickup_point.save()
+
+        city = self.assertRefreshed(
+            f'/api/catalog/{self.book.id}/', change, lambda data: data['pickup_point']['city'],
+        )
+        self.assertEqual(city, "Marília")
+
+    def test_donor_save(self):
+        def change():
+            self.book.user.name = "Doadora"
+            self.book.user.save()
+
+        for url, read in (
+            ('/api/catalog/', lambda data: data['results'][0]['user']),
+            (f'/api/catalog/{self.book.id}/', lambda data: data['user']),
+        ):
+            self.assertEqual(self.assertRefreshed(url, change, read), "Doadora")
+            self.book.user.name = "Doador"
+            self.book.user.save()
+
+
+class CatalogVersionTests(APITestCase):
+    """A versão do catálogo (ETag) acompanha os dados do doador embutidos nos livros."""
+    def test_donor_rename_changes_etag(self):
+        donor = create_user('doador@exemplo.com', "Doador")
+        book = create_books(donor, create_pickup_point(), 1)[0]
+
+        for url, read in (
+            ('/api/catalog/', lambda data: data['results'][0]['user']),
+            (f'/api/catalog/{book.id}/', lambda data: data['user']),
+        ):
+            etag = self.get(url)['ETag']
+            self.client.force_authenticate(donor)
+            name = f"Doador {url}"
+            self.assertEqual(self.client.patch(f'/api/users/{donor.id}/', {'name': name}).status_code, 200)
+            self.client.force_authenticate(None)
+            # Só a versão calculada do banco, sem o que estava em cache
+            for cache in caches.all():
+                cache.clear()
+
+            response = self.get(url, HTTP_IF_NONE_MATCH=etag)
+            self.assertEqual(response.status_code, 200, url)
+            self.assertEqual(read(response.json()), name)
+
+
+class BookRequestCreateTests(APITestCase):
+    def test_create_query_count(self):
+        donor = create_user('doador@exemplo.com', "Doador")
+        requester = create_user('solicitante@exemplo.com', "Solicitante")
+        book = create_books(donor, create_pickup_point(), 1)[0]
+        self.client.force_authenticate(requester)
+
+        # Livro validado, solicitação e reserva (com savepoint) e a releitura
+        with self.assertNumQueries(6):
+            response = self.client.post('/api/book_requests/', {'book_id': book.id}, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['book']['id'], book.id)
+        self.assertEqual(response.data['book']['donated_by']['email'], donor.email)
+
+
+class BookRequestUpdateTests(APITestCase):
+    """O PUT/PATCH do solicitante passa pelas transições do fluxo."""
+    def setUp(self):
+        super().setUp()
+        donor = create_user('doador@exemplo.com', "Doador")
+        self.requester = create_user('solicitante@exemplo.com', "Solicitante")
+        self.book, self.other_book = create_books(donor, create_pickup_point(), 2)
+        self.book_request = create_requests([self.book], self.requester)[0]
+        self.client.force_authenticate(self.requester)
+        self.url = f'/api/book_requests/{self.book_request.id}/'
+
+    def test_cancel_releases_book(self):
+        book_key = catalog_cache.book_state_key(self.book.id)
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.patch(self.url, {'status': 'cancelled', 'book_id': self.other_book.id}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['status'], 'cancelled')
+        # O livro da solicitação não muda
+        self.assertEqual(response.data['book']['id'], self.book.id)
+
+        self.book.refresh_from_db()
+        self.assertEqual((self.book.status, self.book.book_request_id), ('available', None))
+        # A versão do livro devolvido mudou: o detalhe em cache não é mais lido
+        self.assertNotEqual(catalog_cache.book_state_key(self.book.id), book_key)
+
+    def test_invalid_transitions(self):
+        for data in ({}, {'status': 'awaiting_pickup'}, {'book_id': self.other_book.id}):
+            response = self.client.patch(self.url, data, format='json')
+            self.assertEqual(response.status_code, 400)
+            self.assertIn('status', response.data)
+
+        # Ainda não aprovada pelo doador
+        response = self.client.patch(self.url, {'status': 'delivered'}, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.book_request.refresh_from_db()
+        self.assertEqual((self.book_request.status, self.book_request.book_id), ('pending', self.book.id))
+
+
+class ConcurrentRequestTests(TransactionTestCase):
+    """Vários usuários pedindo o mesmo livro ao mesmo tempo, cada um em sua conexão."""
+    requesters = 8
+
+    def test_only_one_request_wins(self):
+        book = create_books(create_user('doador@exemplo.com', "Doador"), create_pickup_point(), 1)[0]
+        users = [create_user(f'solicitante{i}@exemplo.com') for i in range(self.requesters)]
+        barrier = threading.Barrier(len(users))
+        results = []
+
+        def request(user):
+            try:
+                barrier.wait()
+                workflow.request_book(book.id, user.id)
+                results.append('ok')
+            except serializers.ValidationError:
+                results.append('conflict')
+            except Exception as exc:
+                results.append(exc)
+            finally:
+                connection.close()
+
+        threads = [threading.Thread(target=request, args=(user,)) for user in users]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(sorted(results, key=str), ['conflict'] * (len(users) - 1) + ['ok'])
+        book.refresh_from_db()
+        self.assertEqual(book.status, 'requested')
+        self.assertEqual(BookRequest.objects.count(), 1)
+        self.assertEqual(book.book_request.user_id, BookRequest.objects.get().user_id)
+
+
+class QueryPlanTests(TestCase):
+    """As consultas mais frequentes usam os índices da migração 0013, sem varrer tabelas."""
+    expected_indexes = {
+        'catalogo': 'book_available_idx',
+        'catalogo_pagina_seguinte': 'book_available_idx',
+        'exclusao_livros_disponiveis': 'book_user_status_idx',
+        'pedido_pendente_do_livro': 'bookrequest_book_status_idx',
+        'pedidos_abertos_do_solicitante': 'bookrequest_user_status_idx',
+    }
+
+    def test_hot_queries_use_indexes(self):
+        for name, queryset in hot_queries().items():
+            plan = queryset.explain()
+            with self.subTest(query=name, plan=plan):
+                if name in self.expected_indexes:
+                    self.assertIn(f"USING INDEX {self.expected_indexes[name]}", plan)
+                for line in plan.splitlines():
+                    if ' SCAN ' in f' {line} ':
+                        self.assertIn('USING', line)
+
+
+class SQLiteConnectionTests(TransactionTestCase):
+    @override_settings(SQLITE_PRAGMAS={
+        'journal_mode': 'WAL', 'synchronous': 'OFF', 'cache_size': -1234, 'busy_timeout': 1500,
+    })
+    def test_pragmas_applied_on_new_connections(self):
+        conn = connections.create_connection('default')
+        try:
+            with conn.cursor() as cursor:
+                values = {}
+                for pragma in ('journal_mode', 'synchronous', 'cache_size', 'busy_timeout'):
+                    cursor.execute(f"PRAGMA {pragma}")
+                    values[pragma] = cursor.fetchone()[0]
+        finally:
+            conn.close()
+        # synchronous=OFF é lido como 0
+        self.assertEqual(values, {'journal_mode': 'wal', 'synchronous': 0, 'cache_size': -1234, 'busy_timeout': 1500})
+
+    def test_router_reads_from_replica_outside_transactions(self):
+        router = ReadReplicaRouter()
+        self.assertEqual(router.db_for_read(Book), 'replica')
+        with transaction.atomic():
+            self.assertEqual(router.db_for_read(Book), 'default')
+        self.assertEqual(router.db_for_write(Book), 'default')
+        self.assertFalse(router.allow_migrate('replica', 'common'))
+
+
+class DropTriggersTests(TestCase):
+    def trigger_names(self):
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT name FROM sqlite_master WHERE type = 'trigger'")
+            return {name for (name,) in cursor.fetchall()}
+
+    def test_only_installed_triggers_are_dropped(self):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "CREATE TRIGGER audit_book_delete AFTER DELETE ON common_book BEGIN SELECT 1; END"
+            )
+        installed = self.trigger_names() - {'audit_book_delete'}
+
+        drop_triggers()
+        self.assertEqual(self.trigger_names(), {'audit_book_delete'})
+        install_database_objects(sender=None, using='default')
+        self.assertEqual(self.trigger_names(), installed | {'audit_book_delete'})
+
+
+class MalformedImportTests(APITestCase):
+    """Arquivos malformados viram erros por linha, sem derrubar a importação."""
+    def setUp(self):
+        super().setUp()
+        self.donor = create_user('doador@exemplo.com', "Doador")
+        self.pickup_point = create_pickup_point()
+        self.client.force_authenticate(self.donor)
+
+    def upload(self, name, content):
+        response = self.client.post(
+            '/api/my-books/import/', {'file': SimpleUploadedFile(name, content)}, format='multipart',
+        )
+        self.assertEqual(response.status_code, 200)
+        return response.data
+
+    def csv_row(self, title):
+        return f"{title},Autor,Descrição,fantasy,all_ages,{self.pickup_point.id}\n".encode()
+
+    def json_row(self, **fields):
+        book = {
+            'title': "Livro", 'author': "Autor", 'description': "Descrição", 'category': 'fantasy',
+            'classification': 'all_ages', 'pickup_point_id': self.pickup_point.id, **fields,
+        }
+        return json.dumps(book).encode() + b'\n'
+
+    def test_csv(self):
+        header = b'title,author,description,category,classification,pickup_point_id\n'
+        for broken in (b'\xff\xfe inv\xe1lido,,,,,\n', b'"' + b'x' * 200000 + b'",,,,,\n'):
+            with self.subTest(broken=broken[:10]):
+                report = self.upload('livros.csv', header + self.csv_row("Primeiro") + broken + self.csv_row("Depois"))
+                self.assertEqual(report['created'], 1)
+                self.assertEqual(len(report['errors']), 1)
+                self.assertIn("CSV inválido", report['errors'][0]['errors']['non_field_errors'][0])
+
+    def test_ndjson(self):
+        report = self.upload('livros.ndjson', b''.join([
+            codecs.BOM_UTF8 + self.json_row(title="Primeiro"),
+            b'{"title": "inv\xe1lido"}\n',
+            b'{"title": \n',
+            b'[1, 2]\n',
+            b'[' * 100000 + b'\n',
+            self.json_row(pickup_point_id=[self.pickup_point.id]),
+            self.json_row(pickup_point_id=10 ** 30),
+            self.json_row(pickup_point_id="²"),
+            self.json_row(title="Último"),
+        ]))
+        self.assertEqual(report['created'], 2)
+        self.assertEqual([error['row'] for error in report['errors']], [2, 3, 4, 5, 6, 7, 8])
+        self.assertEqual(
+            sorted(Book.objects.values_list('title', flat=True)), ["Primeiro", "Último"],
+        )
+
+
+class DeactivateUserTests(APITestCase):
+    def test_constant_query_count(self):
+        requester = create_user('solicitante@exemplo.com', "Solicitante")
+        pickup_point = create_pickup_point()
+        for number, count in enumerate((3, 1200)):
+            donor = create_user(f'doador{number}@exemplo.com', "Doador")
+            books = create_books(donor, pickup_point, count)
+            # Histórico de pedidos cancelados e um livro reservado, que fica
+            create_requests(books[:2], requester, status='cancelled')
+            Book.objects.filter(pk__in=[book.pk for book in books[:2]]).update(status='available', book_request=None)
+            create_requests(books[-1:], requester)
+
+            with self.assertNumQueries(9):
+                workflow.deactivate_user(donor.id)
+
+            self.assertEqual(list(Book.objects.filter(user=donor).values_list('id', flat=True)), [books[-1].id])
+            self.assertEqual(BookRequest.objects.filter(book__user=donor).get().status, 'cancelled')
+        self.assertFalse(User.objects.filter(books__isnull=False, is_active=True).exists())
+
+
+class UserSummaryTests(APITestCase):
+    """Os contadores mantidos pelos gatilhos acompanham o fluxo de doação."""
+    def setUp(self):
+        super().setUp()
+        self.donor = create_user('doador@exemplo.com', "Doador")
+        self.requester = create_user('solicitante@exemplo.com', "Solicitante")
+        self.book, self.other_book = create_books(self.donor, create_pickup_point(), 2)
+
+    def summary(self, user):
+        response = self.get('/api/users/me/summary/', user=user)
+        self.assertEqual(response.status_code, 200)
+        return {name: value for name, value in response.data.items() if value}
+
+    def assertSummaries(self, donor, requester):
+        self.assertEqual(self.summary(self.donor), donor)
+        self.assertEqual(self.summary(self.requester), requester)
+
+    def test_counters_follow_workflow(self):
+        self.assertSummaries({'books_available': 2}, {})
+
+        book_request = workflow.request_book(self.book.id, self.requester.id)
+        self.assertSummaries(
+            {'books_available': 1, 'books_requested': 1, 'incoming_pending': 1},
+            {'outgoing_pending': 1},
+        )
+
+        workflow.approve_request(book_request.id, self.donor.id)
+        self.assertSummaries(
+            {'books_available': 1, 'books_unavailable': 1, 'incoming_awaiting_pickup': 1},
+            {'outgoing_awaiting_pickup': 1},
+        )
+
+        workflow.confirm_pickup(book_request.id, self.requester.id)
+        self.assertSummaries(
+            {'books_available': 1, 'books_unavailable': 1, 'books_donated': 1},
+            {'books_received': 1},
+        )
+
+        book_request = workflow.request_book(self.other_book.id, self.requester.id)
+        workflow.cancel_request(book_request.id, self.requester.id)
+        self.assertSummaries(
+            {'books_available': 1, 'books_unavailable': 1, 'books_donated': 1},
+            {'books_received': 1},
+        )
+
+    def test_rebuild_repairs_divergent_summaries(self):
+        workflow.request_book(self.book.id, self.requester.id)
+        self.assertEqual(rebuild_user_summaries(), 0)
+
+        UserSummary.objects.filter(pk=self.donor.id).update(books_available=5, incoming_pending=0)
+        UserSummary.objects.filter(pk=self.requester.id).delete()
+        out = io.StringIO()
+        call_command('rebuild_user_summaries', stdout=out)
+        self.assertIn("2 resumos divergentes corrigidos", out.getvalue())
+        self.assertSummaries(
+            {'books_available': 1, 'books_requested': 1, 'incoming_pending': 1},
+            {'outgoing_pending': 1},
+        )
+
+
+class StatelessAuthenticationTests(APITestCase):
+    """O usuário autenticado sai das claims do token e do status da conta em cache."""
+    def setUp(self):
+        super().setUp()
+        self.user = create_user('leitor@exemplo.com', "Leitor")
+
+    def authenticate(self, token):
+        request = APIRequestFactory().get('/', HTTP_AUTHORIZATION=f'Bearer {token}')
+        user, _ = StatelessJWTAuthentication().authenticate(request)
+        return user
+
+    def test_claims_without_user_queries(self):
+        token = UserTokenObtainPairSerializer.get_token(self.user).access_token
+        # Só o status da conta, na primeira requisição
+        with self.assertNumQueries(1):
+            user = self.authenticate(token)
+        with self.assertNumQueries(0):
+            user = self.authenticate(token)
+            self.assertEqual((user.id, user.name, user.is_staff), (self.user.id, "Leitor", False))
+
+    def test_old_token_loads_user_lazily(self):
+        token = AccessToken.for_user(self.user)
+        self.assertNotIn('name', token)
+        user = self.authenticate(token)
+        with self.assertNumQueries(1):
+            self.assertEqual(user.name, "Leitor")
+            self.assertEqual(user.email, 'leitor@exemplo.com')
+
+    def test_deactivated_user_is_rejected(self):
+        token = UserTokenObtainPairSerializer.get_token(self.user).access_token
+        self.authenticate(token)
+        with self.captureOnCommitCallbacks(execute=True):
+            workflow.deactivate_user(self.user.id)
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate(token)
+
+    def test_admin_changes_apply_before_token_expires(self):
+        token = UserTokenObtainPairSerializer.get_token(self.user).access_token
+        self.assertFalse(self.authenticate(token).is_staff)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.is_staff = True
+            self.user.save()
+        self.assertTrue(self.authenticate(token).is_staff)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.is_active = False
+            self.user.save()
+        with self.assertRaises(AuthenticationFailed):
+            self.authenticate(token)
+
+
+@override_settings(METRICS_SAMPLE_RATE=1.0)
+class PerformanceMetricsTests(APITestCase):
+    def test_serialization_is_measured_apart_from_rendering(self):
+        from config.middleware import metrics
+
+        requester = create_user('solicitante@exemplo.com', "Solicitante")
+        create_requests(create_books(create_user('doador@exemplo.com'), create_pickup_point(), 5), requester)
+        client = APIClient()
+        client.force_authenticate(requester)
+        self.assertEqual(client.get('/api/book_requests/').status_code, 200)
+        self.assertEqual(async_to_sync(AsyncClient().get)('/api/async/catalog/').status_code, 200)
+
+        totals = metrics.snapshot()[0]
+        for view in ('BookRequestViewSet.list', 'async-catalog-list'):
+            self.assertGreater(totals[view]['serialize_time'], 0, view)
+        self.assertGreater(totals['BookRequestViewSet.list']['render_time'], 0)
+
+
+class AsyncCatalogTests(APITestCase):
+    """As rotas assíncronas aceitam ?fields= e ?shape= e respondem a requisições condicionais."""
+    def setUp(self):
+        super().setUp()
+        self.book = create_books(create_user('doador@exemplo.com', "Doador"), create_pickup_point(), 3)[0]
+
+    def test_same_payload_as_sync_routes(self):
+        for query in ('', '?fields=id,title,pickup_point.city', '?shape=normalized&fields=id,pickup_point_id'):
+            sync = self.client.get(f'/api/catalog/{query}').json()
+            async_ = self.client.get(f'/api/async/catalog/{query}').json()
+            self.assertEqual(async_['results'], sync['results'], query)
+            self.assertEqual(async_.get('pickup_points'), sync.get('pickup_points'), query)
+
+        for sync_url, async_url, fields in (
+            (f'/api/catalog/{self.book.id}/', f'/api/async/catalog/{self.book.id}/', 'id,title'),
+            ('/api/pickup-points/', '/api/async/pickup-points/', 'id,city'),
+        ):
+            self.assertEqual(
+                self.client.get(async_url, {'fields': fields}).json(),
+                self.client.get(sync_url, {'fields': fields}).json(),
+            )
+        self.assertEqual(self.client.get('/api/async/catalog/', {'fields': 'nope'}).status_code, 400)
+
+    def test_conditional_get(self):
+        for url in ('/api/async/catalog/', f'/api/async/catalog/{self.book.id}/', '/api/async/pickup-points/'):
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+            self.assertEqual(response.status_code, 304, url)
+
+
+class TimestampedBookRequestSerializer(BookRequestSerializer):
+    """Com uma data e uma relação que pode ser nula no caminho, para a comparação abaixo."""
+    updated_at = serializers.DateTimeField(read_only=True)
+    book_request_status = serializers.CharField(source='book.book_request.status', read_only=True)
+
+    class Meta(BookRequestSerializer.Meta):
+        fields = BookRequestSerializer.Meta.fields + ['updated_at', 'book_request_status']
+
+
+class FastSerializationParityTests(TestCase):
+    """serialize_many gera exatamente o JSON de Serializer(many=True).data."""
+    def setUp(self):
+        donor = create_user('doador@exemplo.com', "Doador")
+        requester = create_user('solicitante@exemplo.com', "Solicitante")
+        located = create_pickup_point("Com coordenadas")
+        PickupPoint.objects.filter(pk=located.pk).update(latitude=-22.3145, longitude=-49.0587)
+        books = create_books(donor, create_pickup_point("Sem coordenadas"), 2) + create_books(donor, located, 2)
+        # Um pedido pendente (livro com book_request) e um cancelado (sem)
+        create_requests(books[:1], requester)
+        create_requests(books[1:2], requester, status='cancelled')
+        Book.objects.filter(pk=books[1].pk).update(status='available', book_request=None)
+        BookRequest.objects.filter(pk=books[0].book_request.pk).update(
+            updated_at=datetime(2024, 3, 10, 23, 30, 15, 123456, tzinfo=dt_timezone.utc),
+        )
+
+    def assertParity(self, serializer_class, queryset):
+        instances = list(eager_load(queryset, serializer_class).order_by('id'))
+        expected = dumps(serializer_class(instances, many=True).data)
+        self.assertEqual(dumps(serialize_many(serializer_class(), instances)), expected)
+
+    def test_books(self):
+        for serializer_class in (BookSerializer, CatalogBookSerializer):
+            self.assertParity(serializer_class, Book.objects.all())
+
+    def test_book_requests(self):
+        for zone in ('UTC', 'America/Sao_Paulo', 'Asia/Kolkata'):
+            with self.subTest(zone=zone), timezone.override(zone):
+                self.assertParity(TimestampedBookRequestSerializer, BookRequest.objects.all())
+                self.assertParity(BookRequestSerializer, BookRequest.objects.all())
+
+
+class FastJSONTests(TestCase):
+    def test_same_as_drf(self):
+        for data in ({'id': 2 ** 64, 'title': "Dom Casmurro\u2028"}, [-(2 ** 70), 1.5, None]):
+            content = JSONRenderer().render(data)
+            self.assertEqual(dumps(data), content)
+            self.assertEqual(FastJSONParser().parse(io.BytesIO(content)), data)
+
+        content = b'{"title": "\\ud800"}'
+        self.assertEqual(FastJSONParser().parse(io.BytesIO(content)), JSONParser().parse(io.BytesIO(content)))
+        with self.assertRaises(ParseError):
+            FastJSONParser().parse(io.BytesIO(b'{"title": '))
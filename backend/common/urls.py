@@ -1,6 +1,7 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from .views import UserViewSet, BookViewSet, BookRequestViewSet, DonorBookRequestViewSet, PickupPointViewSet, CatalogViewSet
+from . import async_views
+from .views import UserViewSet, BookViewSet, BookRequestViewSet, DonorBookRequestViewSet, PickupPointViewSet, CatalogViewSet, ExportViewSet
 from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
 
 router = DefaultRouter()
@@ -9,12 +10,18 @@ router.register(r'book_requests', BookRequestViewSet)
 router.register(r'donor-requests', DonorBookRequestViewSet, basename='donor-requests')
 router.register(r'pickup-points', PickupPointViewSet, basename='pickup-point')
 router.register(r'catalog', CatalogViewSet, basename='catalog')
+router.register(r'export', ExportViewSet, basename='export')
 
 urlpatterns = [
     path('api/', include(router.urls)),
     path('api/login/', TokenObtainPairView.as_view(), name='token_obtain_pair'),
     path('api/login/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
     path('api/my-books/', BookViewSet.as_view({'get': 'list', 'post': 'create'}), name='my-books'),
+    path('api/my-books/import/', BookViewSet.as_view({'post': 'bulk_import'}), name='my-books-import'),
     path('api/my-books/<int:pk>/', BookViewSet.as_view({'get': 'retrieve', 'put': 'update', 'patch': 'partial_update', 'delete': 'destroy'}), name='my-book-details'),
     path('api/book_requests/<int:pk>/cancel/', BookRequestViewSet.as_view({'post': 'cancel'}), name='bookrequest-cancel'),
+    # Leituras públicas assíncronas, para servidores ASGI
+    path('api/async/catalog/', async_views.catalog_list, name='async-catalog-list'),
+    path('api/async/catalog/<int:pk>/', async_views.catalog_detail, name='async-catalog-detail'),
+    path('api/async/pickup-points/', async_views.pickup_point_list, name='async-pickup-point-list'),
 ]
\ No newline at end of file
@@ -1,22 +1,25 @@
+from django.http import StreamingHttpResponse
 from django.shortcuts import render
 from rest_framework import viewsets, serializers, status
 from .models import User, Book, BookRequest, PickupPoint
-from .serializers import UserSerializer, BookSerializer, BookRequestSerializer, PickupPointSerializer
-from rest_framework.permissions import IsAuthenticated, IsAuthenticatedOrReadOnly, AllowAny
+from .serializers import UserSerializer, BookSerializer, BookRequestSerializer, PickupPointSerializer, SimplifiedBookRequestSerializer, UserSummarySerializer, CatalogBookSerializer
+from rest_framework.permissions import IsAuthenticated, IsAuthenticatedOrReadOnly, AllowAny, IsAdminUser
 from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.exceptions import APIException
 from rest_framework.viewsets import ReadOnlyModelViewSet
-
-
-def update_book_status(book, status, clear_request=False):
-    """Atualiza o status do livro e limpa o campo book_request, se necessário."""
-    book.status = status
-    if clear_request:
-        book.book_request = None
-    book.save()
-
-class UserViewSet(viewsets.ModelViewSet):
+from . import catalog_cache, exports, importers, workflow
+from .eager_loading import EagerLoadingMixin, eager_load
+from .fast_serialization import FastListMixin, serialize_many
+from .facets import catalog_facets
+from .geo import nearest_points, points_within
+from .http_cache import catalog_book_state, catalog_state, conditional_get, pickup_points_state
+from .search import search_books
+from .sparse_fields import SparseFieldsMixin
+from .summaries import user_summary
+
+
+class UserViewSet(EagerLoadingMixin, viewsets.ModelViewSet):
     queryset = User.objects.filter(is_active=True)
     serializer_class = UserSerializer
     permission_classes = [IsAuthenticated]
@@ -30,69 +33,161 @@ class UserViewSet(viewsets.ModelViewSet):
         return [IsAuthenticated()]
     
     def perform_destroy(self, instance):
-        # Verificar se o usuário possui solicitações pendentes como solicitante
-        open_requests_as_requester = BookRequest.objects.filter(
-            user=instance, status__in=['pending', 'awaiting_pickup']
-        )
+        confirm = self.request.query_params.get('confirm', 'false').lower()
 
-        # Verificar se o usuário possui solicitações pendentes como doador
-        open_requests_as_donor = BookRequest.objects.filter(
-            book__user=instance, status__in=['pending', 'awaiting_pickup']
-        )
-
-        # Se houver solicitações pendentes, solicitar confirmação antes de excluir
-        if open_requests_as_requester.exists() or open_requests_as_donor.exists():
-            confirm = self.request.query_params.get('confirm', 'false').lower()
-            if confirm != 'true':
-                # Retornar mensagem com detalhes das solicitações pendentes
+        # Se houver solicitações em aberto (como solicitante ou doador), pedir
+        # confirmação antes de excluir, com os detalhes buscados em uma consulta
+        if confirm != 'true':
+            as_requester, as_donor = workflow.open_requests_preview(instance.id)
+            if as_requester or as_donor:
                 response = {
                     "detail": "Você possui solicitações de livros em aberto. Deseja continuar e cancelar essas solicitações?",
-                    "open_requests_as_requester": [
-                        {"id": req.id, "book_title": req.book.title} for req in open_requests_as_requester
-                    ],
-                    "open_requests_as_donor": [
-                        {"id": req.id, "book_title": req.book.title, "requester": req.user.name} for req in open_requests_as_donor
-                    ]
+                    "open_requests_as_requester": as_requester,
+                    "open_requests_as_donor": as_donor,
                 }
                 raise serializers.ValidationError(response)
 
-            # Caso o cliente confirme a exclusão, cancelar as solicitações pendentes
-            for request in open_requests_as_requester:
-                update_book_status(request.book, 'available', clear_request=True)
-                request.status = 'cancelled'
-                request.save()
-
-            for request in open_requests_as_donor:
-                request.status = 'cancelled'
-                request.save()
+        # Cancela as solicitações, exclui os livros disponíveis e desativa o
+        # usuário (soft delete) em poucas instruções, numa única transação
+        workflow.deactivate_user(instance.id)
 
-        # Excluir todos os livros disponíveis do usuário
-        instance.books.filter(status='available').delete()
+    @action(detail=False, methods=['get'], url_path='me/summary')
+    def summary(self, request):
+        """Contadores do painel: meus livros por status e solicitações enviadas/recebidas."""
+        return Response(UserSummarySerializer(user_summary(request.user.id)).data)
 
-        # Desativar o usuário (soft delete)
-        instance.is_active = False
-        instance.save()
-    
     def get_queryset(self):
         if not self.request.user.is_staff:
             return User.objects.filter(id=self.request.user.id)
         return super().get_queryset()
 
-class PickupPointViewSet(viewsets.ReadOnlyModelViewSet):
+def location_params(params, radius_required=True):
+    """
+    Lê ?lat=&lng=&radius_km= da query string. Devolve None quando nenhuma
+    coordenada foi informada.
+    """
+    if not params.get('lat') and not params.get('lng'):
+        return None
+    try:
+        lat, lng = float(params['lat']), float(params['lng'])
+    except (KeyError, ValueError):
+        raise serializers.ValidationError({"lat": "Informe latitude e longitude numéricas (lat e lng)."})
+    if not (-90 <= lat <= 90 and -180 <= lng <= 180):
+        raise serializers.ValidationError({"lat": "Coordenadas fora do intervalo válido."})
+
+    radius_km = None
+    if params.get('radius_km') or radius_required:
+        try:
+            radius_km = float(params['radius_km'])
+        except (KeyError, ValueError):
+            raise serializers.ValidationError({"radius_km": "Informe o raio de busca em km."})
+        if radius_km <= 0:
+            raise serializers.ValidationError({"radius_km": "O raio deve ser maior que zero."})
+    return lat, lng, radius_km
+
+def filter_catalog(queryset, params):
+    """Aplica ao catálogo os filtros da query string (facetas, raio e busca textual)."""
+    # Filtros por faceta; aceitam vários valores separados por vírgula
+    for facet in ('category', 'classification'):
+        if params.get(facet):
+            queryset = queryset.filter(**{f'{facet}__in': params[facet].split(',')})
+    if params.get('pickup_point'):
+        try:
+            pickup_points = [int(value) for value in params['pickup_point'].split(',')]
+        except ValueError:
+            raise serializers.ValidationError({"pickup_point": "Informe ids numéricos de pontos de coleta."})
+        queryset = queryset.filter(pickup_point_id__in=pickup_points)
+    # Livros em pontos de coleta a até radius_km km de ?lat=&lng=
+    location = location_params(params)
+    if location:
+        queryset = queryset.filter(pickup_point_id__in=[point_id for _, point_id in points_within(*location)])
+
+    query = params.get('q')
+    if query:
+        queryset = search_books(queryset, query)
+    return queryset
+
+# Formatos da listagem do catálogo (?shape=): cada livro com o ponto de coleta
+# e o doador aninhados, ou só com os ids e as tabelas pickup_points e donors
+CATALOG_SHAPES = {
+    'nested': BookSerializer,
+    'normalized': CatalogBookSerializer,
+}
+
+
+def catalog_shape(params):
+    shape = params.get('shape', 'nested')
+    if shape not in CATALOG_SHAPES:
+        raise serializers.ValidationError({"shape": f"Use um destes valores: {', '.join(CATALOG_SHAPES)}."})
+    return shape
+
+
+def catalog_side_tables(books, context=None):
+    """
+    Tabelas do formato normalizado do catálogo: os pontos de coleta e os
+    doadores dos livros da página, cada um uma única vez, indexados pelo id.
+    """
+    # Com ?fields= sem os ids, as tabelas ficam vazias
+    pickup_point_ids = {book['pickup_point_id'] for book in books if 'pickup_point_id' in book}
+    user_ids = {book['user_id'] for book in books if 'user_id' in book}
+    pickup_points = PickupPoint.objects.filter(id__in=pickup_point_ids).order_by('id')
+    donors = User.objects.filter(id__in=user_ids).order_by('id').values('id', 'name', 'email')
+    return {
+        'pickup_points': {
+            point['id']: point for point in serialize_many(PickupPointSerializer(context=context), pickup_points)
+        },
+        'donors': {donor['id']: donor for donor in donors},
+    }
+
+class PickupPointViewSet(SparseFieldsMixin, viewsets.ReadOnlyModelViewSet):
     queryset = PickupPoint.objects.all()
     serializer_class = PickupPointSerializer
 
-class BookViewSet(viewsets.ModelViewSet):
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        location = location_params(self.request.query_params) if self.action == 'list' else None
+        if location:
+            queryset = queryset.filter(id__in=[point_id for _, point_id in points_within(*location)])
+        return queryset
+
+    @conditional_get(pickup_points_state)
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
+    @conditional_get(pickup_points_state)
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
+
+    @action(detail=False, methods=['get'])
+    def nearest(self, request):
+        """Pontos de coleta mais próximos de ?lat=&lng=, com a distância em km."""
+        lat, lng, radius_km = location_params(request.query_params, radius_required=False) or (None, None, None)
+        if lat is None:
+            raise serializers.ValidationError({"lat": "Informe latitude e longitude (lat e lng)."})
+        try:
+            limit = min(int(request.query_params.get('limit', 5)), 50)
+        except ValueError:
+            raise serializers.ValidationError({"limit": "Informe um número inteiro."})
+        if limit < 1:
+            raise serializers.ValidationError({"limit": "Informe um número maior que zero."})
+
+        matches = nearest_points(lat, lng, limit, max_radius_km=radius_km)
+        points = PickupPoint.objects.in_bulk([point_id for _, point_id in matches])
+        return Response([
+            {**PickupPointSerializer(points[point_id]).data, 'distance_km': round(distance, 3)}
+            for distance, point_id in matches if point_id in points
+        ])
+
+class BookViewSet(SparseFieldsMixin, EagerLoadingMixin, viewsets.ModelViewSet):
     queryset = Book.objects.all()
     serializer_class = BookSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
 
     def get_queryset(self): 
-        user = self.request.user
-        return Book.objects.filter(user=user)
+        return Book.objects.filter(user_id=self.request.user.id)
 
     def perform_create(self, serializer):
-        serializer.save(user=self.request.user)
+        serializer.save(user_id=self.request.user.id)
 
     def perform_update(self, serializer):
         book = self.get_object()
@@ -100,153 +195,268 @@ class BookViewSet(viewsets.ModelViewSet):
             raise serializers.ValidationError("Apenas livros disponíveis podem ser editados.")
         serializer.save()
 
-class BookRequestViewSet(viewsets.ModelViewSet):
+    @action(detail=False, methods=['post'], url_path='import')
+    def bulk_import(self, request):
+        """
+        Importa livros em lote: um array JSON no corpo ou um arquivo CSV/NDJSON
+        enviado no campo `file` (multipart). O formato do arquivo vem de
+        `?file_format=` ou da extensão. Responde com o total criado e os erros por linha.
+        """
+        try:
+            batch_size = int(request.query_params.get('batch_size', importers.DEFAULT_BATCH_SIZE))
+        except ValueError:
+            raise serializers.ValidationError({"batch_size": "Informe um número inteiro."})
+
+        upload = request.FILES.get('file')
+        if upload is not None:
+            fmt = request.query_params.get('file_format') or upload.name.rsplit('.', 1)[-1].lower()
+            if fmt not in importers.IMPORT_FORMATS:
+                raise serializers.ValidationError({"file": "Formato não suportado. Use CSV ou NDJSON."})
+            rows = importers.parse_upload(upload.file, fmt)
+        elif isinstance(request.data, list):
+            rows = request.data
+        else:
+            raise serializers.ValidationError("Envie um array JSON de livros ou um arquivo no campo 'file'.")
+
+        report = importers.import_books(rows, request.user.id, batch_size=batch_size)
+        return Response(report, status=status.HTTP_200_OK)
+
+class BookRequestViewSet(FastListMixin, SparseFieldsMixin, EagerLoadingMixin, viewsets.ModelViewSet):
     queryset = BookRequest.objects.all()
     serializer_class = BookRequestSerializer
     permission_classes = [IsAuthenticated]
 
     def get_queryset(self):
         # Filtra os pedidos apenas do usuário autenticado
-        return BookRequest.objects.filter(user=self.request.user)
+        return BookRequest.objects.filter(user_id=self.request.user.id)
 
     def perform_create(self, serializer):
         book = serializer.validated_data['book_id']
-        user = self.request.user 
-
-        if book.user == user:
-            raise serializers.ValidationError("Você não pode solicitar um livro que você mesmo cadastrou.")
-
-        # Verificar se já existe uma solicitação pendente para o livro
-        existing_request = BookRequest.objects.filter(book=book, status='pending').first()
-        if existing_request:
-            raise serializers.ValidationError("Este livro já tem um pedido pendente.")
-
-        # Verificar se o livro está disponível
-        if book.status != 'available':
-            raise serializers.ValidationError("Este livro não está disponível para doação")
-
-        update_book_status(book, 'requested')
-        book_request = serializer.save(user=self.request.user)
-
-        book.book_request = book_request
-        book.save()
-
-    def perform_update(self, serializer):
-        instance = serializer.save()
-        book = instance.book
-
-        # Atualizar o status do livro com base no status da solicitação
-        if instance.status == 'awaiting_pickup':
-            update_book_status(book, 'unavailable', clear_request=False)
-        elif instance.status == 'delivered':
-            update_book_status(book, 'unavailable', clear_request=True)
-        elif instance.status == 'cancelled':
-            update_book_status(book, 'available', clear_request=True)
+        # Reserva o livro e cria a solicitação de forma atômica
+        book_request = workflow.request_book(book.id, self.request.user.id)
+        # Relida com as relações da resposta carregadas em uma única consulta
+        serializer.instance = eager_load(self.get_queryset(), self.get_serializer_class()).get(pk=book_request.pk)
+
+    # Status aceitos no PUT/PATCH do solicitante e a transição de cada um
+    STATUS_TRANSITIONS = {
+        'delivered': (workflow.confirm_pickup, "Esta solicitação não está aguardando retirada."),
+        'cancelled': (workflow.cancel_request, "Esta solicitação não pode mais ser cancelada."),
+    }
+
+    def update(self, request, *args, **kwargs):
+        """
+        PUT/PATCH com {"status": ...}: a troca passa pelas mesmas transições
+        atômicas das ações; o livro de uma solicitação não pode ser trocado.
+        """
+        pk = kwargs['pk']
+        new_status = request.data.get('status') if isinstance(request.data, dict) else None
+        if new_status not in self.STATUS_TRANSITIONS:
+            raise serializers.ValidationError({"status": "Use 'delivered' ou 'cancelled'."})
+
+        transition, message = self.STATUS_TRANSITIONS[new_status]
+        if not transition(pk, request.user.id):
+            return self._transition_failed(pk, message)
+
+        book_request = eager_load(self.get_queryset(), self.get_serializer_class()).get(pk=pk)
+        return Response(self.get_serializer(book_request).data)
+
+    def _transition_failed(self, pk, message):
+        # A transição não afetou nenhuma linha: o pedido não existe para este
+        # usuário ou já está em outro estado
+        if not BookRequest.objects.filter(pk=pk, user_id=self.request.user.id).exists():
+            return Response({"detail": "Solicitação não encontrada."}, status=status.HTTP_404_NOT_FOUND)
+        return Response({"detail": message}, status=status.HTTP_400_BAD_REQUEST)
 
     @action(detail=True, methods=['patch'], url_path='confirm-pickup')
     def confirm_pickup(self, request, pk=None):
-        book_request = self.get_object()
-
-        # Verifica se o usuário é o solicitante
-        if book_request.user != request.user:
-            return Response({"detail": "Você não tem permissão para confirmar a retirada deste pedido."}, status=status.HTTP_403_FORBIDDEN)
-
-        # Atualizar o status da solicitação para 'delivered'
-        book_request.status = 'delivered'
-        book_request.save()
-
-        # Atualizar o status do livro para 'unavailable' e limpar o campo book_request
-        update_book_status(book_request.book, 'unavailable', clear_request=True)
+        # Marca o pedido como entregue e o livro como indisponível
+        if not workflow.confirm_pickup(pk, request.user.id):
+            return self._transition_failed(pk, "Esta solicitação não está aguardando retirada.")
 
         return Response({"detail": "Retirada confirmada com sucesso. O livro foi marcado como entregue."}, status=status.HTTP_200_OK)
 
     @action(detail=True, methods=['patch'], url_path='cancel-request')
     def cancel_request(self, request, pk=None):
         """Cancela a solicitação pelo solicitante."""
-        book_request = self.get_object()
-
-        # Verifica se o usuário é o solicitante
-        if book_request.user != request.user:
-            return Response({"detail": "Você não tem permissão para cancelar este pedido."}, status=status.HTTP_403_FORBIDDEN)
-
-        # Atualizar o status da solicitação para 'cancelled'
-        book_request.status = 'cancelled'
-        book_request.save()
-
-        # Atualizar o status do livro para 'available' e limpar o campo book_request
-        update_book_status(book_request.book, 'available', clear_request=True)
+        # Cancela o pedido e devolve o livro ao catálogo
+        if not workflow.cancel_request(pk, request.user.id):
+            return self._transition_failed(pk, "Esta solicitação não pode mais ser cancelada.")
 
         return Response({"detail": "Solicitação cancelada com sucesso. O livro voltou a ficar disponível no catálogo."}, status=status.HTTP_200_OK)
 
     @action(detail=True, methods=['post'], url_path='cancel')
     def cancel(self, request, pk=None):
-        book_request = self.get_object()
+        if not workflow.cancel_request(pk, request.user.id):
+            return self._transition_failed(pk, "Esta solicitação não pode mais ser cancelada.")
 
-        # Verifica se o usuário é o dono da solicitação
-        if book_request.user != request.user:
-            return Response({"detail": "Você não tem permissão para cancelar este pedido."}, status=status.HTTP_403_FORBIDDEN)
+        return Response({"detail": "Pedido cancelado com sucesso."}, status=status.HTTP_200_OK)
+
+class DonorBookRequestViewSet(FastListMixin, SparseFieldsMixin, EagerLoadingMixin, viewsets.GenericViewSet):
+    serializer_class = BookRequestSerializer
+    permission_classes = [IsAuthenticated]
 
-        # Atualiza o status do pedido para 'cancelled'
-        book_request.status = 'cancelled'
-        book_request.save()
+    # Formatos da listagem (?mode=): completo ou apenas id, solicitante e status
+    list_modes = {
+        'full': BookRequestSerializer,
+        'compact': SimplifiedBookRequestSerializer,
+    }
 
-        # Atualiza o status do livro para 'available' e limpa o campo book_request
-        update_book_status(book_request.book, 'available', clear_request=True)
+    def get_list_mode(self):
+        mode = self.request.query_params.get('mode', 'full')
+        if mode not in self.list_modes:
+            raise serializers.ValidationError({"mode": f"Use um destes valores: {', '.join(self.list_modes)}."})
+        return mode
 
-        return Response({"detail": "Pedido cancelado com sucesso."}, status=status.HTTP_200_OK)
+    def get_serializer_class(self):
+        if self.action == 'list':
+            return self.list_modes[self.get_list_mode()]
+        return super().get_serializer_class()
 
-class DonorBookRequestViewSet(viewsets.ViewSet):
-    permission_classes = [IsAuthenticated]
+    def get_queryset(self):
+        queryset = BookRequest.objects.filter(book__user_id=self.request.user.id)
+        if self.action != 'list':
+            return queryset
+
+        # Filtro por status; aceita vários valores separados por vírgula
+        statuses = self.request.query_params.get('status')
+        if statuses:
+            statuses = statuses.split(',')
+            valid = dict(BookRequest.STATUS_CHOICES)
+            if any(value not in valid for value in statuses):
+                raise serializers.ValidationError({"status": f"Use um destes valores: {', '.join(valid)}."})
+            queryset = queryset.filter(status__in=statuses)
+
+        if self.get_list_mode() == 'compact':
+            # Lê só as colunas usadas pelo formato compacto
+            queryset = queryset.only('id', 'status', 'user__name')
+        return queryset
 
     def list(self, request):
-        """Lista as solicitações associadas aos livros do usuário logado."""
-        user = request.user
-        book_requests = BookRequest.objects.filter(book__user=user)
-        serializer = BookRequestSerializer(book_requests, many=True)
-        return Response(serializer.data)
+        """
+        Lista as solicitações associadas aos livros do usuário logado.
+        Aceita ?status=pending,awaiting_pickup e ?mode=compact.
+        """
+        return super().list(request)
+
+    def _transition_failed(self, pk, not_found_message, message):
+        if not self.get_queryset().filter(pk=pk).exists():
+            return Response({"detail": not_found_message}, status=status.HTTP_404_NOT_FOUND)
+        return Response({"detail": message}, status=status.HTTP_400_BAD_REQUEST)
 
     @action(detail=True, methods=['patch'], url_path='approve')
     def approve_request(self, request, pk=None):
         """Aprova uma solicitação de livro."""
-        try:
-            book_request = BookRequest.objects.get(pk=pk, book__user=request.user)
-        except BookRequest.DoesNotExist:
-            return Response({"detail": "Solicitação não encontrada ou você não tem permissão para aprová-la."}, status=status.HTTP_404_NOT_FOUND)
-
-        # Atualizar o status da solicitação para 'awaiting_pickup'
-        book_request.status = 'awaiting_pickup'
-        book_request.save()
-
-        # Atualizar o status do livro para 'unavailable'
-        book_request.book.status = 'unavailable'
-        book_request.book.save()
+        # pending -> awaiting_pickup; o livro fica indisponível
+        if not workflow.approve_request(pk, request.user.id):
+            return self._transition_failed(
+                pk,
+                "Solicitação não encontrada ou você não tem permissão para aprová-la.",
+                "Apenas solicitações pendentes podem ser aprovadas.",
+            )
 
         return Response({"detail": "Solicitação aprovada com sucesso. O livro está aguardando retirada."}, status=status.HTTP_200_OK)
 
     @action(detail=True, methods=['patch'], url_path='deny')
     def deny_request(self, request, pk=None):
         """Nega uma solicitação de livro."""
-        try:
-            book_request = BookRequest.objects.get(pk=pk, book__user=request.user)
-        except BookRequest.DoesNotExist:
-            return Response({"detail": "Solicitação não encontrada ou você não tem permissão para negá-la."}, status=status.HTTP_404_NOT_FOUND)
-
-        # Atualizar o status da solicitação para 'cancelled'
-        book_request.status = 'cancelled'
-        book_request.save()
-
-        # Atualizar o status do livro para 'available' e limpar o campo book_request
-        book = book_request.book
-        book.status = 'available'
-        book.book_request = None  # Limpa o campo book_request
-        book.save()
+        # pending -> cancelled; o livro volta ao catálogo
+        if not workflow.deny_request(pk, request.user.id):
+            return self._transition_failed(
+                pk,
+                "Solicitação não encontrada ou você não tem permissão para negá-la.",
+                "Apenas solicitações pendentes podem ser negadas.",
+            )
 
         return Response({"detail": "Solicitação negada com sucesso. O livro está disponível no catálogo."}, status=status.HTTP_200_OK)
 
-class CatalogViewSet(ReadOnlyModelViewSet):
+class CatalogViewSet(FastListMixin, SparseFieldsMixin, EagerLoadingMixin, ReadOnlyModelViewSet):
     """
     ViewSet para listar livros disponíveis publicamente e exibir detalhes de um livro.
     """
     queryset = Book.objects.filter(status='available')
     permission_classes = [AllowAny]
-    serializer_class = BookSerializer
\ No newline at end of file
+    serializer_class = BookSerializer
+
+    catalog_shapes = CATALOG_SHAPES
+
+    @property
+    def pagination_ordering(self):
+        # Com busca textual, os resultados são ordenados pela relevância
+        if self.request.query_params.get('q'):
+            return ('search_rank', 'id')
+        return ('id',)
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if self.action != 'list':
+            return queryset
+
+        return filter_catalog(queryset, self.request.query_params)
+
+    def get_catalog_shape(self):
+        return catalog_shape(self.request.query_params)
+
+    def get_serializer_class(self):
+        if self.action == 'list':
+            return self.catalog_shapes[self.get_catalog_shape()]
+        return super().get_serializer_class()
+
+    @conditional_get(catalog_state)
+    def list(self, request, *args, **kwargs):
+        # Páginas já serializadas são servidas direto do cache
+        cache_key = catalog_cache.list_key(request)
+        data = catalog_cache.fetch(cache_key)
+        if data is not None:
+            return Response(data)
+
+        response = super().list(request, *args, **kwargs)
+        if self.get_catalog_shape() == 'normalized':
+            response.data.update(catalog_side_tables(response.data['results'], self.get_serializer_context()))
+        # Contagens por faceta de todo o catálogo, lidas da tabela de contadores
+        response.data['facets'] = catalog_facets()
+        catalog_cache.store(cache_key, response.data)
+        return response
+
+    @conditional_get(catalog_book_state)
+    def retrieve(self, request, *args, **kwargs):
+        cache_key = catalog_cache.detail_key(request, kwargs['pk'])
+        data = catalog_cache.fetch(cache_key)
+        if data is not None:
+            return Response(data)
+
+        response = super().retrieve(request, *args, **kwargs)
+        catalog_cache.store(cache_key, response.data)
+        return response
+
+class ExportViewSet(viewsets.ViewSet):
+    """
+    Exportação completa (ou incremental, com ?since=) de livros, solicitações
+    e usuários para relatórios. A resposta é transmitida em streaming, então o
+    uso de memória não cresce com o tamanho da tabela.
+    """
+    permission_classes = [IsAdminUser]
+    lookup_value_regex = '[a-z-]+'
+
+    def retrieve(self, request, pk=None):
+        if pk not in exports.EXPORTS:
+            return Response({"detail": "Exportação não encontrada."}, status=status.HTTP_404_NOT_FOUND)
+
+        # "?format=" é reservado pelo DRF para a escolha do renderer
+        fmt = request.query_params.get('output', 'ndjson')
+        if fmt not in exports.EXPORT_FORMATS:
+            raise serializers.ValidationError({"output": "Use 'ndjson' ou 'csv'."})
+
+        since = None
+        if request.query_params.get('since'):
+            since = exports.parse_since(request.query_params['since'])
+            if since is None:
+                raise serializers.ValidationError({"since": "Informe uma data ISO 8601, ex.: 2025-04-01T00:00:00Z."})
+
+        content_type = 'text/csv' if fmt == 'csv' else 'application/x-ndjson'
+        response = StreamingHttpResponse(
+            exports.export_lines(pk, fmt, since=since),
+            content_type=f'{content_type}; charset=utf-8',
+        )
+        response['Content-Disposition'] = f'attachment; filename="{pk}.{fmt}"'
+        return response
+
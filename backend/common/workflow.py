@@ -0,0 +1,165 @@
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+from rest_framework import serializers
+
+from . import catalog_cache
+from .authentication import forget_user
+from .models import Book, BookRequest, User
+
+
+# Transições do fluxo de doação. Cada uma é um UPDATE condicional
+# ("... WHERE status = <estado esperado>") dentro de transaction.atomic: se
+# outro pedido mudou o estado antes, nenhuma linha é afetada e a transição
+# falha sem escrever nada, em vez de sobrescrever o estado alheio.
+
+OPEN_STATUSES = ('pending', 'awaiting_pickup')
+
+
+def request_book(book_id, user_id):
+    """
+    Cria a solicitação e reserva o livro, se ele estiver disponível e não for
+    do próprio solicitante. Custa duas consultas no caminho feliz.
+    """
+    try:
+        with transaction.atomic():
+            book_request = BookRequest.objects.create(book_id=book_id, user_id=user_id)
+            reserved = Book.objects.filter(
+                pk=book_id, status='available'
+            ).exclude(user_id=user_id).update(
+                status='requested', book_request=book_request, updated_at=timezone.now()
+            )
+            if not reserved:
+                # Desfaz a criação da solicitação
+                raise _Conflict()
+    except _Conflict:
+        book = Book.objects.filter(pk=book_id).values('user_id', 'status').first()
+        if book and book['user_id'] == user_id:
+            raise serializers.ValidationError("Você não pode solicitar um livro que você mesmo cadastrou.")
+        if book and book['status'] == 'requested':
+            raise serializers.ValidationError("Este livro já tem um pedido pendente.")
+        raise serializers.ValidationError("Este livro não está disponível para doação")
+
+    catalog_cache.invalidate_books(book_id)
+    return book_request
+
+
+def approve_request(request_id, donor_id):
+    """pending -> awaiting_pickup; o livro fica indisponível."""
+    with transaction.atomic():
+        changed = BookRequest.objects.filter(
+            pk=request_id, book__user_id=donor_id, status='pending'
+        ).update(status='awaiting_pickup', updated_at=timezone.now())
+        if changed:
+            # O livro já estava fora do catálogo (status 'requested')
+            Book.objects.filter(book_request_id=request_id).update(
+                status='unavailable', updated_at=timezone.now()
+            )
+    return bool(changed)
+
+
+def deny_request(request_id, donor_id):
+    """pending -> cancelled; o livro volta ao catálogo."""
+    return _release_book(
+        request_id, BookRequest.objects.filter(book__user_id=donor_id, status='pending')
+    )
+
+
+def cancel_request(request_id, requester_id):
+    """pending/awaiting_pickup -> cancelled; o livro volta ao catálogo."""
+    return _release_book(
+        request_id, BookRequest.objects.filter(user_id=requester_id, status__in=OPEN_STATUSES)
+    )
+
+
+def confirm_pickup(request_id, requester_id):
+    """awaiting_pickup -> delivered; o livro fica indisponível."""
+    with transaction.atomic():
+        changed = BookRequest.objects.filter(
+            pk=request_id, user_id=requester_id, status='awaiting_pickup'
+        ).update(status='delivered', updated_at=timezone.now())
+        if changed:
+            Book.objects.filter(book_request_id=request_id).update(
+                status='unavailable', book_request=None, updated_at=timezone.now()
+            )
+    return bool(changed)
+
+
+def open_requests_preview(user_id):
+    """
+    Solicitações em aberto do usuário como solicitante e como doador, em uma
+    única consulta com os títulos e nomes já juntados.
+    """
+    rows = BookRequest.objects.filter(
+        Q(user_id=user_id) | Q(book__user_id=user_id), status__in=OPEN_STATUSES
+    ).values('id', 'user_id', 'user__name', 'book__title').order_by('id')
+
+    as_requester, as_donor = [], []
+    for row in rows:
+        if row['user_id'] == user_id:
+            as_requester.append({"id": row['id'], "book_title": row['book__title']})
+        else:
+            as_donor.append({"id": row['id'], "book_title": row['book__title'], "requester": row['user__name']})
+    return as_requester, as_donor
+
+
+def deactivate_user(user_id):
+    """
+    Desativa a conta: cancela as solicitações em aberto (devolvendo ao
+    catálogo os livros que o usuário tinha pedido), exclui os livros
+    disponíveis dele e marca o usuário como inativo. Tudo com instruções
+    em conjunto, independentemente da quantidade de livros e pedidos.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        # Livros pedidos pelo usuário voltam ao catálogo
+        released_books = Book.objects.filter(
+            book_request__user_id=user_id, book_request__status__in=OPEN_STATUSES
+        )
+        changed_ids = list(released_books.values_list('id', flat=True))
+        released_books.update(status='available', book_request=None, updated_at=now)
+
+        BookRequest.objects.filter(
+            Q(user_id=user_id) | Q(book__user_id=user_id), status__in=OPEN_STATUSES
+        ).update(status='cancelled', updated_at=now)
+
+        # Os livros disponíveis são excluídos junto com o histórico de pedidos,
+        # com um DELETE por tabela: o delete() do ORM leria as linhas para
+        # fazer o CASCADE em lotes, com mais consultas quanto mais livros.
+        # Fazer o CASCADE à mão é seguro porque só BookRequest.book aponta para
+        # Book com CASCADE (o histórico sai primeiro) e Book.book_request, o
+        # único SET_NULL para BookRequest, já é nulo nos livros disponíveis.
+        # Os gatilhos do banco mantêm busca, facetas e resumos em dia.
+        changed_ids += Book.objects.filter(user_id=user_id, status='available').values_list('id', flat=True)
+        books_table = connection.ops.quote_name(Book._meta.db_table)
+        requests_table = connection.ops.quote_name(BookRequest._meta.db_table)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"DELETE FROM {requests_table} WHERE book_id IN "
+                f"(SELECT id FROM {books_table} WHERE user_id = %s AND status = 'available')",
+                [user_id],
+            )
+            cursor.execute(f"DELETE FROM {books_table} WHERE user_id = %s AND status = 'available'", [user_id])
+
+        User.objects.filter(pk=user_id).update(is_active=False, updated_at=now)
+        # Tokens já emitidos deixam de valer na próxima requisição
+        forget_user(user_id)
+
+    catalog_cache.invalidate_books(*changed_ids)
+
+
+def _release_book(request_id, book_requests):
+    with transaction.atomic():
+        changed = book_requests.filter(pk=request_id).update(status='cancelled', updated_at=timezone.now())
+        if changed:
+            # update() não dispara sinais: os livros devolvidos são invalidados aqui
+            released_ids = list(Book.objects.filter(book_request_id=request_id).values_list('id', flat=True))
+            Book.objects.filter(pk__in=released_ids).update(
+                status='available', book_request=None, updated_at=timezone.now()
+            )
+            catalog_cache.invalidate_books(*released_ids)
+    return bool(changed)
+
+
+class _Conflict(Exception):
+    pass
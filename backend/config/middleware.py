@@ -0,0 +1,308 @@
+import logging
+import random
+import threading
+import time
+from collections import deque
+from contextlib import ExitStack
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connections
+from django.middleware.gzip import GZipMiddleware
+from django.utils.cache import patch_vary_headers
+from django.utils.regex_helper import _lazy_re_compile
+
+from common.fast_serialization import measure_serialization
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - brotli é opcional
+    brotli = None
+
+
+logger = logging.getLogger('config.performance')
+
+QUANTILES = (0.5, 0.9, 0.99)
+
+re_accepts_brotli = _lazy_re_compile(r"\bbr\b")
+
+
+class _QueryRecorder:
+    """execute_wrapper que conta as consultas e soma o tempo gasto no banco."""
+
+    def __init__(self, keep_sql):
+        self.count = 0
+        self.time = 0.0
+        self.keep_sql = keep_sql
+        self.statements = []
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - start
+            self.count += 1
+            self.time += elapsed
+            if self.keep_sql:
+                self.statements.append((elapsed, sql))
+
+
+class MetricsRegistry:
+    """
+    Amostras das últimas requisições (buffer circular) e totais acumulados
+    por view. Os percentis são calculados sobre o buffer no momento da coleta.
+    """
+    fields = ('latency', 'queries', 'db_time', 'serialize_time', 'render_time')
+
+    def __init__(self, size):
+        self.lock = threading.Lock()
+        self.samples = deque(maxlen=size)
+        self.totals = {}
+        self.slow_requests = 0
+
+    def record(self, view, status, sample, slow):
+        with self.lock:
+            self.samples.append((view, sample))
+            totals = self.totals.setdefault(view, {'count': 0, 'errors': 0, **{field: 0.0 for field in self.fields}})
+            totals['count'] += 1
+            totals['errors'] += status >= 500
+            for field in self.fields:
+                totals[field] += sample[field]
+            self.slow_requests += slow
+
+    def snapshot(self):
+        with self.lock:
+            samples = list(self.samples)
+            totals = {view: dict(values) for view, values in self.totals.items()}
+            slow_requests = self.slow_requests
+
+        by_view = {}
+        for view, sample in samples:
+            by_view.setdefault(view, []).append(sample)
+
+        quantiles = {}
+        for view, view_samples in by_view.items():
+            for field in self.fields:
+                values = sorted(sample[field] for sample in view_samples)
+                quantiles[view, field] = [
+                    (q, values[min(len(values) - 1, int(q * len(values)))]) for q in QUANTILES
+                ]
+        return totals, quantiles, slow_requests
+
+
+metrics = MetricsRegistry(getattr(settings, 'METRICS_BUFFER_SIZE', 5000))
+
+
+def view_label(request):
+    """Nome do viewset e da ação (ex.: CatalogViewSet.list) ou da rota."""
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return 'unresolved'
+    view_class = getattr(match.func, 'cls', None)
+    if view_class is None:
+        return match.view_name or match.func.__name__
+    action = (getattr(match.func, 'actions', None) or {}).get(request.method.lower(), request.method.lower())
+    return f"{view_class.__name__}.{action}"
+
+
+class PerformanceMetricsMiddleware:
+    """
+    Mede, por requisição amostrada, a latência total, a quantidade e o tempo
+    das consultas, o tempo de serialização dos objetos (serialize_many, usado
+    pelas listagens com FastListMixin e pelas rotas assíncronas; as demais
+    respostas serializadas pelo DRF ficam só na latência) e o tempo de
+    renderização (codificação do payload já serializado em JSON pelo
+    renderer). Requisições não amostradas (METRICS_SAMPLE_RATE) passam direto,
+    sem nenhum custo extra. As que passam de METRICS_SLOW_REQUEST_MS são
+    registradas no log com o SQL executado.
+
+    Funciona tanto em WSGI quanto em ASGI, sem forçar as views assíncronas a
+    rodar em uma thread.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.sample_rate = getattr(settings, 'METRICS_SAMPLE_RATE', 0)
+        self.slow_threshold = getattr(settings, 'METRICS_SLOW_REQUEST_MS', 500) / 1000
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def _sampled(self):
+        return self.sample_rate and random.random() < self.sample_rate
+
+    def _start(self, request):
+        request._metrics_render_time = 0.0
+        return _QueryRecorder(keep_sql=self.slow_threshold > 0)
+
+    @staticmethod
+    def _wrap_connections(stack, recorder):
+        for alias in connections:
+            stack.enter_context(connections[alias].execute_wrapper(recorder))
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.__acall__(request)
+        if not self._sampled():
+            return self.get_response(request)
+
+        recorder = self._start(request)
+        start = time.perf_counter()
+        with ExitStack() as stack:
+            self._wrap_connections(stack, recorder)
+            timer = stack.enter_context(measure_serialization())
+            response = self.get_response(request)
+        self._record(request, response, recorder, timer[0], time.perf_counter() - start)
+        return response
+
+    async def __acall__(self, request):
+        if not self._sampled():
+            return await self.get_response(request)
+
+        recorder = self._start(request)
+        start = time.perf_counter()
+        # As conexões são por thread: o ORM assíncrono consulta o banco na
+        # thread de sync_to_async da requisição, então os wrappers são
+        # registrados (e removidos) lá
+        stack = ExitStack()
+        await sync_to_async(self._wrap_connections)(stack, recorder)
+        try:
+            with measure_serialization() as timer:
+                response = await self.get_response(request)
+        finally:
+            await sync_to_async(stack.close)()
+        self._record(request, response, recorder, timer[0], time.perf_counter() - start)
+        return response
+
+    def _record(self, request, response, recorder, serialize_time, latency):
+        view = view_label(request)
+        slow = 0 < self.slow_threshold <= latency
+        metrics.record(view, response.status_code, {
+            'latency': latency,
+            'queries': recorder.count,
+            'db_time': recorder.time,
+            'serialize_time': serialize_time,
+            'render_time': request._metrics_render_time,
+        }, slow)
+
+        if slow:
+            logger.warning(
+                "Requisição lenta: %s %s (%s) em %.0f ms, %d consultas (%.0f ms no banco)\n%s",
+                request.method, request.get_full_path(), view, latency * 1000,
+                recorder.count, recorder.time * 1000,
+                '\n'.join(f"  [{elapsed * 1000:.1f} ms] {sql}" for elapsed, sql in recorder.statements),
+            )
+
+    def process_template_response(self, request, response):
+        # Respostas do DRF são renderizadas depois deste ponto; o callback
+        # marca o fim da renderização
+        if hasattr(request, '_metrics_render_time'):
+            start = time.perf_counter()
+
+            def finished(response):
+                request._metrics_render_time = time.perf_counter() - start
+
+            response.add_post_render_callback(finished)
+        return response
+
+
+class CompressionMiddleware(GZipMiddleware):
+    """
+    Comprime as respostas a partir de COMPRESSION_MIN_SIZE bytes: com brotli
+    quando o pacote está instalado e o cliente aceita (Accept-Encoding: br),
+    senão com gzip (incluindo respostas em streaming, como as exportações).
+    Abaixo do limite, o custo de comprimir não compensa a economia.
+
+    O brotli não tem onde levar os bytes aleatórios que o GZipMiddleware
+    acrescenta contra o BREACH, por isso fica restrito às leituras anônimas,
+    cujas respostas não carregam tokens de autenticação nem CSRF.
+    """
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        self.min_size = getattr(settings, 'COMPRESSION_MIN_SIZE', 1024)
+        self.brotli_quality = getattr(settings, 'COMPRESSION_BROTLI_QUALITY', 4)
+
+    def process_response(self, request, response):
+        if response.has_header('Content-Encoding'):
+            return response
+        if not response.streaming and len(response.content) < self.min_size:
+            return response
+
+        accept_encoding = request.META.get('HTTP_ACCEPT_ENCODING', '')
+        if (
+            brotli is None or response.streaming or not re_accepts_brotli.search(accept_encoding)
+            or not _is_anonymous_read(request, response)
+        ):
+            return super().process_response(request, response)
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+        compressed = brotli.compress(response.content, quality=self.brotli_quality)
+        if len(compressed) >= len(response.content):
+            return response
+        response.content = compressed
+        response.headers['Content-Length'] = str(len(compressed))
+        # Como no GZipMiddleware: a ETag passa a ser fraca, e continua valendo
+        # para as requisições condicionais
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response.headers['ETag'] = 'W/' + etag
+        response.headers['Content-Encoding'] = 'br'
+        return response
+
+
+def _is_anonymous_read(request, response):
+    """GET/HEAD sem credenciais nem cookies, e sem token CSRF na resposta."""
+    return (
+        request.method in ('GET', 'HEAD')
+        and 'HTTP_AUTHORIZATION' not in request.META
+        and not request.COOKIES
+        # get_token() guarda o token aqui quando a resposta o usa
+        and 'CSRF_COOKIE' not in request.META
+        and not response.cookies
+    )
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def render_prometheus(extra_counters=None):
+    """
+    Métricas no formato texto do Prometheus: um summary por medida (percentis
+    do buffer, _sum e _count acumulados), total de erros e de requisições
+    lentas, além de contadores extras ({nome: valor}).
+    """
+    totals, quantiles, slow_requests = metrics.snapshot()
+    summaries = (
+        ('latency', 'http_request_duration_seconds', 'Latência total da requisição'),
+        ('queries', 'http_request_db_queries', 'Consultas ao banco por requisição'),
+        ('db_time', 'http_request_db_duration_seconds', 'Tempo gasto no banco por requisição'),
+        ('serialize_time', 'http_request_serialize_duration_seconds', 'Tempo de serialização dos objetos (serialize_many)'),
+        ('render_time', 'http_request_render_duration_seconds', 'Tempo de codificação da resposta em JSON (renderer)'),
+    )
+
+    lines = []
+    for field, name, help_text in summaries:
+        lines += [f"# HELP {name} {help_text}", f"# TYPE {name} summary"]
+        for view in sorted(totals):
+            label = f'view="{_escape(view)}"'
+            for q, value in quantiles.get((view, field), ()):
+                lines.append(f'{name}{{{label},quantile="{q}"}} {value:.6g}')
+            lines.append(f"{name}_sum{{{label}}} {totals[view][field]:.6g}")
+            lines.append(f"{name}_count{{{label}}} {totals[view]['count']}")
+
+    lines += ["# HELP http_request_errors_total Respostas 5xx", "# TYPE http_request_errors_total counter"]
+    for view in sorted(totals):
+        lines.append(f'http_request_errors_total{{view="{_escape(view)}"}} {totals[view]["errors"]}')
+
+    lines += [
+        "# HELP http_slow_requests_total Requisições acima do limite de lentidão",
+        "# TYPE http_slow_requests_total counter",
+        f"http_slow_requests_total {slow_requests}",
+    ]
+    for name, value in (extra_counters or {}).items():
+        lines += [f"# TYPE {name} counter", f"{name} {value}"]
+    return '\n'.join(lines) + '\n'
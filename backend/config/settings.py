@@ -25,7 +25,8 @@ BASE_DIR = Path(__file__).resolve().parent.parent
 SECRET_KEY = 'django-insecure-!tae^*ir2j8q3oj1+3oe2tnx0$vyzh1g*whi1b0t%2^d&1bf=a'
 
 # SECURITY WARNING: don't run with debug turned on in production!
-DEBUG = True
+# Em produção, desligue com DJANGO_DEBUG=0 (também remove a API navegável)
+DEBUG = os.environ.get('DJANGO_DEBUG', 'true').lower() in ('1', 'true', 'yes')
 
 ALLOWED_HOSTS = ['biblioteca-solidaria.onrender.com', 'localhost', '127.0.0.1']
 
@@ -45,6 +46,10 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # Primeiro da lista, para medir também o tempo dos demais middlewares
+    'config.middleware.PerformanceMetricsMiddleware',
+    # Antes dos demais, para comprimir a resposta já pronta
+    'config.middleware.CompressionMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -79,13 +84,52 @@ WSGI_APPLICATION = 'config.wsgi.application'
 # Database
 # https://docs.djangoproject.com/en/5.1/ref/settings/#databases
 
+# Caminho do arquivo do banco (o benchmark aponta o servidor ASGI para o banco temporário)
+DATABASE_PATH = os.environ.get('DATABASE_PATH', os.path.join(BASE_DIR, 'data', 'db.sqlite3'))
+
 DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': os.path.join(BASE_DIR, 'data', 'db.sqlite3'),
+        'NAME': DATABASE_PATH,
+        # Conexões persistentes: reaproveitadas entre requisições por até
+        # CONN_MAX_AGE segundos e verificadas antes do reuso
+        'CONN_MAX_AGE': int(os.environ.get('DB_CONN_MAX_AGE', 60)),
+        'CONN_HEALTH_CHECKS': True,
+        'OPTIONS': {
+            # BEGIN IMMEDIATE: a transação pega o lock de escrita logo no
+            # início, em vez de falhar com "database is locked" ao promover
+            # uma leitura para escrita com outra conexão escrevendo
+            'transaction_mode': 'IMMEDIATE',
+        },
+        # Banco de testes em arquivo, com os mesmos PRAGMAs (WAL, busy_timeout)
+        # da produção: o banco em memória compartilhado entre threads falha com
+        # "database table is locked" em vez de esperar pelo lock
+        'TEST': {'NAME': os.path.join(BASE_DIR, 'test_db.sqlite3')},
     }
 }
 
+# PRAGMAs aplicados a cada nova conexão SQLite (ver common/database.py).
+# WAL permite leituras simultâneas a uma escrita; synchronous=NORMAL é seguro
+# em WAL e evita um fsync por commit; cache_size negativo é em KiB.
+SQLITE_PRAGMAS = {
+    'journal_mode': os.environ.get('SQLITE_JOURNAL_MODE', 'WAL'),
+    'synchronous': os.environ.get('SQLITE_SYNCHRONOUS', 'NORMAL'),
+    'mmap_size': int(os.environ.get('SQLITE_MMAP_SIZE', 128 * 1024 * 1024)),
+    'cache_size': int(os.environ.get('SQLITE_CACHE_SIZE', -20000)),
+    'busy_timeout': int(os.environ.get('SQLITE_BUSY_TIMEOUT', 5000)),
+}
+
+# Réplica de leitura opcional: uma segunda conexão somente leitura (mode=ro)
+# ao mesmo arquivo, usada pelas consultas fora de transações
+if os.environ.get('SQLITE_READ_REPLICA', '').lower() in ('1', 'true', 'yes'):
+    DATABASES['replica'] = {
+        **DATABASES['default'],
+        'NAME': f"file:{DATABASE_PATH}?mode=ro",
+        'OPTIONS': {**DATABASES['default']['OPTIONS'], 'uri': True},
+        'TEST': {'MIRROR': 'default'},
+    }
+    DATABASE_ROUTERS = ['common.database.ReadReplicaRouter']
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.1/ref/settings/#auth-password-validators
@@ -133,13 +177,92 @@ AUTH_USER_MODEL = 'common.User'  # Aqui você define que o modelo de usuário se
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        # Monta o request.user a partir do token, sem consultar o banco
+        'common.authentication.StatelessJWTAuthentication',
     ),
+    # Paginação por cursor em todas as listagens (ver common/pagination.py)
+    'DEFAULT_PAGINATION_CLASS': 'common.pagination.KeysetPagination',
+    'PAGE_SIZE': 20,
+    # JSON pelo orjson quando instalado (ver common/renderers.py); a API
+    # navegável só em desenvolvimento
+    'DEFAULT_RENDERER_CLASSES': [
+        'common.renderers.FastJSONRenderer',
+        *(['rest_framework.renderers.BrowsableAPIRenderer'] if DEBUG else []),
+    ],
+    'DEFAULT_PARSER_CLASSES': [
+        'common.renderers.FastJSONParser',
+        'rest_framework.parsers.FormParser',
+        'rest_framework.parsers.MultiPartParser',
+    ],
 }
 
+# Com 0, o renderer e o parser JSON usam o json da biblioteca padrão mesmo
+# com o orjson instalado
+USE_ORJSON = os.environ.get('USE_ORJSON', 'true').lower() in ('1', 'true', 'yes')
+
 SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(minutes=30),  
     "REFRESH_TOKEN_LIFETIME": timedelta(days=1),   
+    "TOKEN_OBTAIN_SERIALIZER": "common.serializers.UserTokenObtainPairSerializer",
+    "TOKEN_USER_CLASS": "common.authentication.TokenUser",
+}
+
+# Segundos que o status da conta de um usuário autenticado (ativo e is_staff)
+# fica em cache (ver common/authentication.py). save() e deactivate_user
+# descartam o cache do processo que fez a escrita; nos demais processos, e após
+# um update() direto no banco, a conta desativada ou a permissão retirada só
+# valem depois deste prazo
+AUTH_ACTIVE_CACHE_TTL = int(os.environ.get('AUTH_ACTIVE_CACHE_TTL', 60))
+
+# Cache
+# https://docs.djangoproject.com/en/5.1/topics/cache/
+
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    },
+    # Páginas e detalhes serializados do catálogo (ver common/catalog_cache.py).
+    # O LocMemCache é de cada processo: a invalidação não alcança os outros
+    # workers, que veem as mudanças após CATALOG_CACHE_TIMEOUT segundos.
+    # O LocMemCache descarta as entradas usadas há mais tempo ao atingir
+    # MAX_ENTRIES; CULL_FREQUENCY=10 remove 10% delas por vez.
+    'catalog': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'catalog',
+        'TIMEOUT': int(os.environ.get('CATALOG_CACHE_TIMEOUT', 300)),
+        'OPTIONS': {
+            'MAX_ENTRIES': int(os.environ.get('CATALOG_CACHE_MAX_ENTRIES', 2000)),
+            'CULL_FREQUENCY': 10,
+        },
+    },
+}
+
+# Tempo (segundos) que navegadores e CDNs podem reaproveitar respostas do
+# catálogo e dos pontos de coleta antes de revalidar com ETag/Last-Modified
+HTTP_CACHE_MAX_AGE = int(os.environ.get('HTTP_CACHE_MAX_AGE', 30))
+
+# Métricas de desempenho (ver config/middleware.py e /api/_metrics/).
+# METRICS_SAMPLE_RATE é a fração das requisições medidas (0 desliga);
+# requisições medidas acima de METRICS_SLOW_REQUEST_MS vão para o log com o SQL.
+METRICS_SAMPLE_RATE = float(os.environ.get('METRICS_SAMPLE_RATE', 0.1))
+METRICS_SLOW_REQUEST_MS = int(os.environ.get('METRICS_SLOW_REQUEST_MS', 500))
+METRICS_BUFFER_SIZE = int(os.environ.get('METRICS_BUFFER_SIZE', 5000))
+
+# Compressão das respostas (gzip, ou brotli se o pacote estiver instalado):
+# só a partir deste tamanho, em bytes
+COMPRESSION_MIN_SIZE = int(os.environ.get('COMPRESSION_MIN_SIZE', 1024))
+# Qualidade do brotli (0 a 11); acima de ~5 fica lento para respostas dinâmicas
+COMPRESSION_BROTLI_QUALITY = int(os.environ.get('COMPRESSION_BROTLI_QUALITY', 4))
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'config.performance': {'handlers': ['console'], 'level': 'WARNING'},
+    },
 }
 
 CORS_ALLOWED_ORIGINS = [
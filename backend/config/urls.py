@@ -17,7 +17,10 @@ Including another URLconf
 from django.contrib import admin
 from django.urls import path, include
 
+from .views import MetricsView
+
 urlpatterns = [
     path('admin/', admin.site.urls),
+    path('api/_metrics/', MetricsView.as_view(), name='metrics'),
     path('', include('common.urls')),
 ]
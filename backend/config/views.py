@@ -0,0 +1,21 @@
+from django.http import HttpResponse
+from rest_framework.permissions import IsAdminUser
+from rest_framework.views import APIView
+
+from common import catalog_cache
+
+from .middleware import render_prometheus
+
+
+class MetricsView(APIView):
+    """Métricas de desempenho no formato do Prometheus (somente administradores)."""
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        cache_counters = {
+            f'catalog_cache_{name}_total': value for name, value in catalog_cache.stats().items()
+        }
+        return HttpResponse(
+            render_prometheus(cache_counters),
+            content_type='text/plain; version=0.0.4; charset=utf-8',
+        )